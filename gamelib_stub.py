@@ -0,0 +1,313 @@
+"""Minimal stand-in for the Terminal starter kit's gamelib package.
+
+Implements only the surface realpython_algo.py touches (AlgoCore,
+GameState, GameMap, GameUnit, debug_write, util.send_command) with the
+same spawn, upgrade and affordability rules, so recorded games can be
+replayed without the live engine. replay_bench.py installs it as
+`gamelib` before importing the algo; submit_turn and send_command keep
+the commands instead of writing them to stdout.
+"""
+import json
+import math
+import sys
+import types
+
+TOP_RIGHT, TOP_LEFT, BOTTOM_LEFT, BOTTOM_RIGHT = 0, 1, 2, 3
+SP, MP = 0, 1
+REMOVE_INDEX, UPGRADE_INDEX = 6, 7
+
+
+def debug_write(*msg):
+    """Same as gamelib: comma-joined message to stderr"""
+    sys.stderr.write(', '.join(map(str, msg)).strip() + '\n')
+    sys.stderr.flush()
+
+
+def send_command(cmd):
+    """Keep the last commands instead of writing them to the engine"""
+    sent.append(cmd)
+    del sent[:-2]
+
+
+sent = []
+util = types.SimpleNamespace(send_command=send_command, debug_write=debug_write)
+
+
+def _unit_index(config, unit_type):
+    for i, info in enumerate(config['unitInformation']):
+        if info.get('shorthand') == unit_type:
+            return i
+    raise ValueError(f'Unknown unit type {unit_type}')
+
+
+def is_stationary(config, unit_type):
+    return _unit_index(config, unit_type) < 3
+
+
+class GameUnit:
+    """A unit's stats read from unitInformation, plus its position and health"""
+
+    def __init__(self, unit_type, config, player_index=None, health=None, x=-1, y=-1):
+        self.unit_type = unit_type
+        self.config = config
+        self.player_index = player_index
+        self.x = x
+        self.y = y
+        self.upgraded = False
+        self.pending_removal = False
+        self.info = config['unitInformation'][_unit_index(config, unit_type)]
+        self.stationary = is_stationary(config, unit_type)
+        self._load_stats(self.info)
+        self.health = self.max_health if health is None else health
+
+    def _load_stats(self, info):
+        self.speed = info.get('speed', 0)
+        self.damage_f = info.get('attackDamageTower', 0)
+        self.damage_i = info.get('attackDamageWalker', 0)
+        self.attackRange = info.get('attackRange', 0)
+        self.shieldRange = info.get('shieldRange', 0)
+        self.shieldPerUnit = info.get('shieldPerUnit', 0)
+        self.max_health = info.get('startHealth', 0)
+        self.cost = [info.get('cost1', 0), info.get('cost2', 0)]
+
+    def upgrade(self):
+        stats = dict(self.info)
+        stats.update(self.info.get('upgrade', {}))
+        self._load_stats(stats)
+        self.upgraded = True
+
+    def __repr__(self):
+        return f'{self.unit_type}@[{self.x},{self.y}] p{self.player_index} hp={self.health}'
+
+
+class GameMap:
+    """The 28x28 diamond arena holding the units on each cell"""
+
+    def __init__(self, config):
+        self.config = config
+        self.ARENA_SIZE = 28
+        self.HALF_ARENA = 14
+        self.TOP_RIGHT, self.TOP_LEFT, self.BOTTOM_LEFT, self.BOTTOM_RIGHT = TOP_RIGHT, TOP_LEFT, BOTTOM_LEFT, BOTTOM_RIGHT
+        self._map = [[[] for _ in range(self.ARENA_SIZE)] for _ in range(self.ARENA_SIZE)]
+
+    def __getitem__(self, location):
+        x, y = location
+        if self.in_arena_bounds([x, y]):
+            return self._map[x][y]
+        raise IndexError(f'{location} is out of bounds')
+
+    def __iter__(self):
+        for x in range(self.ARENA_SIZE):
+            for y in range(self.ARENA_SIZE):
+                if self.in_arena_bounds([x, y]):
+                    yield [x, y]
+
+    def in_arena_bounds(self, location):
+        x, y = location
+        half = self.HALF_ARENA
+        if not (0 <= x < self.ARENA_SIZE and 0 <= y < self.ARENA_SIZE):
+            return False
+        if y < half:
+            return half - 1 - y <= x <= half + y
+        return y - half <= x <= 3 * half - 1 - y
+
+    def get_edge_locations(self, quadrant_description):
+        return self.get_edges()[quadrant_description]
+
+    def get_edges(self):
+        half = self.HALF_ARENA
+        top_right = [[half + n, self.ARENA_SIZE - 1 - n] for n in range(half)]
+        top_left = [[half - 1 - n, self.ARENA_SIZE - 1 - n] for n in range(half)]
+        bottom_left = [[half - 1 - n, n] for n in range(half)]
+        bottom_right = [[half + n, n] for n in range(half)]
+        return [top_right, top_left, bottom_left, bottom_right]
+
+    def add_unit(self, unit_type, location, player_index=0):
+        x, y = location
+        unit = GameUnit(unit_type, self.config, player_index, None, x, y)
+        if unit.stationary:
+            self._map[x][y] = [unit]
+        else:
+            self._map[x][y].append(unit)
+        return unit
+
+    def remove_unit(self, location):
+        x, y = location
+        self._map[x][y] = []
+
+    def distance_between_locations(self, location_1, location_2):
+        return math.hypot(location_1[0] - location_2[0], location_1[1] - location_2[1])
+
+    def get_locations_in_range(self, location, radius):
+        x, y = location
+        reach = int(math.ceil(radius))
+        return [[i, j] for i in range(x - reach, x + reach + 1) for j in range(y - reach, y + reach + 1)
+                if self.in_arena_bounds([i, j]) and self.distance_between_locations(location, [i, j]) < radius + 0.51]
+
+
+class GameState:
+    """Parsed turn_state with gamelib's spawn/upgrade bookkeeping"""
+
+    def __init__(self, config, serialized_string):
+        self.config = config
+        self.serialized_string = serialized_string
+        state = json.loads(serialized_string) if isinstance(serialized_string, str) else serialized_string
+        self.ARENA_SIZE = 28
+        self.HALF_ARENA = 14
+        self.game_map = GameMap(config)
+        self._build_stack = []
+        self._deploy_stack = []
+        self._shorthands = [info.get('shorthand') for info in config['unitInformation']]
+        self.submitted = None
+        self.warnings = True
+
+        self.turn_number = int(state['turnInfo'][1])
+        p1 = state['p1Stats']
+        p2 = state['p2Stats']
+        self.my_health, self.my_time = p1[0], p1[3] if len(p1) > 3 else 0
+        self.enemy_health, self.enemy_time = p2[0], p2[3] if len(p2) > 3 else 0
+        self._player_resources = [
+            {'SP': float(p1[1]), 'MP': float(p1[2])},
+            {'SP': float(p2[1]), 'MP': float(p2[2])},
+        ]
+
+        for player_index, key in ((0, 'p1Units'), (1, 'p2Units')):
+            for index, units in enumerate(state.get(key, [])):
+                for unit in units:
+                    x, y = int(unit[0]), int(unit[1])
+                    if index == UPGRADE_INDEX:
+                        for placed in self.game_map[x, y]:
+                            placed.upgrade()
+                    elif index == REMOVE_INDEX:
+                        for placed in self.game_map[x, y]:
+                            placed.pending_removal = True
+                    else:
+                        placed = GameUnit(self._shorthands[index], config, player_index,
+                                          float(unit[2]), x, y)
+                        self.game_map[x, y].append(placed)
+
+    def suppress_warnings(self, suppress):
+        self.warnings = not suppress
+
+    def get_resource(self, resource_type, player_index=0):
+        key = 'SP' if resource_type == SP else 'MP'
+        return self._player_resources[player_index][key]
+
+    def get_resources(self, player_index=0):
+        return [self.get_resource(SP, player_index), self.get_resource(MP, player_index)]
+
+    def type_cost(self, unit_type, upgrade=False):
+        info = self.config['unitInformation'][_unit_index(self.config, unit_type)]
+        if upgrade:
+            info = dict(info, **info.get('upgrade', {}))
+        return [info.get('cost1', 0), info.get('cost2', 0)]
+
+    def number_affordable(self, unit_type):
+        costs = self.type_cost(unit_type)
+        sp, mp = self.get_resources()
+        counts = [math.floor(have / cost) for have, cost in ((sp, costs[SP]), (mp, costs[MP])) if cost > 0]
+        return min(counts) if counts else 0
+
+    def contains_stationary_unit(self, location):
+        for unit in self.game_map[location]:
+            if unit.stationary:
+                return unit
+        return False
+
+    def can_spawn(self, unit_type, location, num=1):
+        if not self.game_map.in_arena_bounds(location):
+            return False
+        stationary = is_stationary(self.config, unit_type)
+        affordable = self.number_affordable(unit_type) >= num
+        blocked = bool(self.contains_stationary_unit(location)) or (stationary and len(self.game_map[location]) > 0)
+        territory = location[1] < self.HALF_ARENA
+        edges = self.game_map.get_edge_locations(BOTTOM_LEFT) + self.game_map.get_edge_locations(BOTTOM_RIGHT)
+        on_edge = list(location) in edges
+        return affordable and territory and not blocked and (stationary or on_edge) and (not stationary or num == 1)
+
+    def attempt_spawn(self, unit_type, locations, num=1):
+        if locations and isinstance(locations[0], int):
+            locations = [locations]
+        spawned = 0
+        for location in locations:
+            for _ in range(num):
+                if not self.can_spawn(unit_type, location, 1):
+                    break
+                x, y = map(int, location)
+                costs = self.type_cost(unit_type)
+                self._player_resources[0]['SP'] -= costs[SP]
+                self._player_resources[0]['MP'] -= costs[MP]
+                self.game_map.add_unit(unit_type, [x, y], 0)
+                if is_stationary(self.config, unit_type):
+                    self._build_stack.append((unit_type, x, y))
+                else:
+                    self._deploy_stack.append((unit_type, x, y))
+                spawned += 1
+        return spawned
+
+    def attempt_upgrade(self, locations):
+        if locations and isinstance(locations[0], int):
+            locations = [locations]
+        upgraded = 0
+        for location in locations:
+            unit = self.contains_stationary_unit(location)
+            if not unit or unit.upgraded or unit.player_index != 0:
+                continue
+            costs = self.type_cost(unit.unit_type, upgrade=True)
+            resources = self._player_resources[0]
+            if resources['SP'] >= costs[SP] and resources['MP'] >= costs[MP]:
+                resources['SP'] -= costs[SP]
+                resources['MP'] -= costs[MP]
+                unit.upgrade()
+                self._build_stack.append((self._shorthands[UPGRADE_INDEX], unit.x, unit.y))
+                upgraded += 1
+        return upgraded
+
+    def attempt_remove(self, locations):
+        if locations and isinstance(locations[0], int):
+            locations = [locations]
+        removed = 0
+        for location in locations:
+            unit = self.contains_stationary_unit(location)
+            if unit and unit.player_index == 0:
+                self._build_stack.append((self._shorthands[REMOVE_INDEX], unit.x, unit.y))
+                removed += 1
+        return removed
+
+    def submit_turn(self):
+        """Keep the build and deploy stacks instead of sending them to the engine"""
+        self.submitted = (list(self._build_stack), list(self._deploy_stack))
+        return self.submitted
+
+
+class AlgoCore:
+    """Engine loop: config line first, then turn/action/end states on stdin"""
+
+    def __init__(self):
+        self.config = None
+
+    def on_game_start(self, config):
+        self.config = config
+
+    def on_turn(self, game_state):
+        pass
+
+    def on_action_frame(self, action_frame_game_state):
+        pass
+
+    def start(self):
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            state = json.loads(line)
+            if 'turnInfo' not in state:
+                self.on_game_start(state)
+                continue
+            state_type = int(state['turnInfo'][0])
+            if state_type == 0:
+                self.on_turn(line)
+            elif state_type == 1:
+                self.on_action_frame(line)
+            elif state_type == 2:
+                break
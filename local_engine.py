@@ -0,0 +1,366 @@
+"""Headless in-process stand-in for the Terminal game engine.
+
+Plays two AlgoStrategy instances against each other without a
+subprocess or JSON pipe. The rules follow the engine:
+
+- Resources: SP income every turn. MP decays by bitDecayPerRound, then
+  gains bitsPerRound plus bitGrowthRate for every
+  turnIntervalForBitSchedule turns played. MP is capped at maxBits.
+- Build phase: each player's build stack (structures, upgrades and
+  removals) and deploy stack are validated and paid for in order.
+- Action phase: resolved with realpython_algo.ActionSimulator using
+  both players' spawns, the same frame loop the algo uses to plan.
+- Scoring: every unit that reaches the far edge costs the defender
+  1 HP and pays the attacker coresForPlayerDamage SP. Removed
+  structures refund 75% of their cost, scaled by remaining health.
+
+Player 2 sees the board flipped, exactly like the real engine: its
+units arrive as p1Units and every coordinate is mirrored. Its commands
+are mirrored back before they are applied. The algo's on_turn receives
+the state dict directly, and its TurnView hands the build and deploy
+stacks to AlgoStrategy.command_sink instead of stdout.
+
+    python local_engine.py --games 20 --seed 1
+"""
+import argparse
+import copy
+import importlib
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+try:
+    import gamelib  # noqa: F401
+except ImportError:
+    sys.modules['gamelib'] = importlib.import_module('gamelib_stub')
+import gamelib_stub
+
+ARENA_SIZE = 28
+HALF_ARENA = 14
+REMOVE_INDEX, UPGRADE_INDEX = 6, 7
+REMOVE_REFUND = 0.75
+
+# Standard Terminal season config, used when no --config is given
+DEFAULT_CONFIG = {
+    'unitInformation': [
+        {'shorthand': 'FF', 'cost1': 1.0, 'startHealth': 60.0, 'unitCategory': 0,
+         'upgrade': {'startHealth': 120.0, 'cost1': 1.5}},
+        {'shorthand': 'EF', 'cost1': 4.0, 'startHealth': 30.0, 'shieldRange': 3.5, 'shieldPerUnit': 3.0,
+         'unitCategory': 0, 'upgrade': {'shieldRange': 7.0, 'shieldPerUnit': 4.0, 'cost1': 4.0}},
+        {'shorthand': 'DF', 'cost1': 2.0, 'startHealth': 75.0, 'attackRange': 2.5, 'attackDamageWalker': 6.0,
+         'unitCategory': 0, 'upgrade': {'attackDamageWalker': 16.0, 'attackRange': 3.5, 'cost1': 4.0}},
+        {'shorthand': 'PI', 'cost2': 1.0, 'startHealth': 15.0, 'speed': 1.0, 'attackDamageWalker': 2.0,
+         'attackDamageTower': 2.0, 'attackRange': 3.5, 'unitCategory': 1},
+        {'shorthand': 'EI', 'cost2': 3.0, 'startHealth': 5.0, 'speed': 0.5, 'attackDamageWalker': 8.0,
+         'attackDamageTower': 8.0, 'attackRange': 4.5, 'unitCategory': 1},
+        {'shorthand': 'SI', 'cost2': 1.0, 'startHealth': 40.0, 'speed': 0.25, 'attackDamageWalker': 20.0,
+         'attackDamageTower': 0.0, 'attackRange': 4.5, 'unitCategory': 1},
+        {'shorthand': 'RM'},
+        {'shorthand': 'UP'},
+    ],
+    'resources': {
+        'startingHP': 30.0, 'startingBits': 5.0, 'startingCores': 40.0,
+        'bitsPerRound': 5.0, 'coresPerRound': 5.0, 'bitDecayPerRound': 0.25,
+        'bitGrowthRate': 1.0, 'turnIntervalForBitSchedule': 10, 'maxBits': 150.0,
+        'coresForPlayerDamage': 1.0,
+    },
+}
+
+# Self-play defaults: no shared files, no workers, no output
+SELF_PLAY_OVERRIDES = {
+    'noPersistence': True,
+    'timingReport': False,
+    'rolloutWorkers': 0,
+    'logLevel': 'off',
+}
+
+
+def _flip(x, y):
+    return ARENA_SIZE - 1 - x, ARENA_SIZE - 1 - y
+
+
+def _in_arena(x, y):
+    if not (0 <= x < ARENA_SIZE and 0 <= y < ARENA_SIZE):
+        return False
+    if y < HALF_ARENA:
+        return HALF_ARENA - 1 - y <= x <= HALF_ARENA + y
+    return y - HALF_ARENA <= x <= 3 * HALF_ARENA - 1 - y
+
+
+def _edge_cells(player):
+    """Cells a player may deploy mobile units on, in absolute coordinates"""
+    if player == 0:
+        return {(HALF_ARENA - 1 - n, n) for n in range(HALF_ARENA)} | {(HALF_ARENA + n, n) for n in range(HALF_ARENA)}
+    return {_flip(x, y) for x, y in _edge_cells(0)}
+
+
+def _legacy_state(view):
+    """GameState for a TurnView's legacy reads, over the same state dict"""
+    return gamelib_stub.GameState(view.config, view.state)
+
+
+class Structure:
+    """A structure on the engine's board"""
+
+    __slots__ = ('owner', 'code', 'hp', 'upgraded', 'removing', 'uid')
+
+    def __init__(self, owner, code, hp, uid):
+        self.owner = owner
+        self.code = code
+        self.hp = hp
+        self.upgraded = False
+        self.removing = False
+        self.uid = uid
+
+
+class GameResult:
+    """Outcome of one local game; winner is 0, 1 or None for a draw"""
+
+    __slots__ = ('winner', 'turns', 'health', 'seconds')
+
+    def __init__(self, winner, turns, health, seconds):
+        self.winner = winner
+        self.turns = turns
+        self.health = health
+        self.seconds = seconds
+
+    def as_dict(self):
+        return {'winner': self.winner, 'turns': self.turns, 'health': list(self.health),
+                'seconds': round(self.seconds, 3)}
+
+
+class LocalGame:
+    """One game between two algo instances, advanced turn by turn"""
+
+    def __init__(self, algos, config=None, max_turns=100, algo_module='realpython_algo', overrides=None):
+        self.algos = algos
+        self.config = copy.deepcopy(config or DEFAULT_CONFIG)
+        self.overrides = overrides or ({}, {})
+        self.max_turns = max_turns
+        self.algo_module = importlib.import_module(algo_module)
+        resources = self.config['resources']
+        self.resources = resources
+        self.health = [float(resources['startingHP'])] * 2
+        self.sp = [float(resources['startingCores'])] * 2
+        self.mp = [float(resources['startingBits'])] * 2
+        self.shorthands = [info.get('shorthand') for info in self.config['unitInformation']]
+        self.codes = {name: i for i, name in enumerate(self.shorthands)}
+        self.specs = self.algo_module._unit_specs(self.config)
+        self.structures = {}
+        self.turn = 0
+        self.next_uid = 0
+        self.edges = (_edge_cells(0), _edge_cells(1))
+        self.pathfinder = self.algo_module.PathFinder(ARENA_SIZE, ARENA_SIZE)
+        self._sinks = [[], []]
+
+    # ─────────────── Setup ───────────────
+    def start(self):
+        for player, algo in enumerate(self.algos):
+            config = copy.deepcopy(self.config)
+            config.update(copy.deepcopy(self.overrides[player]))
+            for key, value in SELF_PLAY_OVERRIDES.items():
+                config.setdefault(key, value)
+            algo.on_game_start(config)
+            algo.fast_ingest = True
+            algo.legacy_factory = _legacy_state
+            algo.command_sink = self._sink(player)
+
+    def _sink(self, player):
+        """Command sink for a player's TurnView: keeps each submitted (build, deploy)"""
+        sinks = self._sinks[player]
+
+        def sink(build, deploy):
+            sinks.append((build, deploy))
+        return sink
+
+    # ─────────────── Turn loop ───────────────
+    def run(self):
+        started = time.perf_counter()
+        self.start()
+        while True:
+            self.play_turn()
+            winner = self.winner()
+            if winner is not False:
+                break
+            self.turn += 1
+            self._collect_income()
+        for algo in self.algos:
+            if hasattr(algo, 'on_game_end'):
+                algo.on_game_end()
+        return GameResult(winner, self.turn + 1, tuple(self.health), time.perf_counter() - started)
+
+    def play_turn(self):
+        commands = [self._commands(player) for player in (0, 1)]
+        plans = [[], []]
+        for player, (build, deploy) in enumerate(commands):
+            self._apply_builds(player, build)
+        for player, (build, deploy) in enumerate(commands):
+            plans[player] = self._apply_deploys(player, deploy)
+        self._action_phase(plans)
+        self._apply_removals()
+
+    def winner(self):
+        """0 or 1 when the game is over, None for a draw, False while it continues"""
+        dead = [hp <= 0 for hp in self.health]
+        if not any(dead) and self.turn + 1 < self.max_turns:
+            return False
+        if self.health[0] == self.health[1]:
+            return None
+        return 0 if self.health[0] > self.health[1] else 1
+
+    def _collect_income(self):
+        r = self.resources
+        income = r['bitsPerRound'] + r['bitGrowthRate'] * (self.turn // max(1, int(r['turnIntervalForBitSchedule'])))
+        for player in (0, 1):
+            self.sp[player] += r['coresPerRound']
+            mp = self.mp[player] * (1.0 - r['bitDecayPerRound']) + income
+            self.mp[player] = min(r['maxBits'], round(mp, 1))
+
+    # ─────────────── Algo I/O ───────────────
+    def state_for(self, player):
+        """turn_state dict as the engine would send it to player (flipped for player 2)"""
+        units = [[[] for _ in range(8)], [[] for _ in range(8)]]
+        for (x, y), s in self.structures.items():
+            side = 0 if s.owner == player else 1
+            fx, fy = (x, y) if player == 0 else _flip(x, y)
+            entry = [fx, fy, s.hp, str(s.uid)]
+            units[side][s.code].append(entry)
+            if s.upgraded:
+                units[side][UPGRADE_INDEX].append(entry)
+            if s.removing:
+                units[side][REMOVE_INDEX].append(entry)
+        other = 1 - player
+        return {
+            'p1Stats': [self.health[player], self.sp[player], self.mp[player], 0],
+            'p2Stats': [self.health[other], self.sp[other], self.mp[other], 0],
+            'p1Units': units[0],
+            'p2Units': units[1],
+            'turnInfo': [0, self.turn, -1, 0],
+        }
+
+    def _commands(self, player):
+        """(build stack, deploy stack) the player's algo submitted this turn"""
+        sinks = self._sinks[player]
+        sinks.clear()
+        self.algos[player].on_turn(self.state_for(player))
+        if not sinks:
+            return [], []
+        return sinks[-1]
+
+    def _absolute(self, player, x, y):
+        return (int(x), int(y)) if player == 0 else _flip(int(x), int(y))
+
+    # ─────────────── Build phase ───────────────
+    def _own_half(self, player, y):
+        return y < HALF_ARENA if player == 0 else y >= HALF_ARENA
+
+    def _apply_builds(self, player, build):
+        for shorthand, x, y in build:
+            code = self.codes.get(shorthand)
+            x, y = self._absolute(player, x, y)
+            existing = self.structures.get((x, y))
+            if code == UPGRADE_INDEX:
+                if existing and existing.owner == player and not existing.upgraded and existing.code < 3:
+                    spec = self.specs[existing.code]
+                    if self.sp[player] >= spec['upgraded_sp_cost']:
+                        self.sp[player] -= spec['upgraded_sp_cost']
+                        existing.upgraded = True
+                        existing.hp += spec['upgraded_hp'] - spec['hp']
+            elif code == REMOVE_INDEX:
+                if existing and existing.owner == player:
+                    existing.removing = True
+            elif code is not None and code < 3:
+                spec = self.specs[code]
+                if (existing is None and _in_arena(x, y) and self._own_half(player, y)
+                        and self.sp[player] >= spec['sp_cost']):
+                    self.sp[player] -= spec['sp_cost']
+                    self.structures[(x, y)] = Structure(player, code, spec['hp'], self.next_uid)
+                    self.next_uid += 1
+
+    def _apply_deploys(self, player, deploy):
+        """Pay for valid spawns and group them into a simulator plan"""
+        counts = {}
+        for shorthand, x, y in deploy:
+            code = self.codes.get(shorthand)
+            x, y = self._absolute(player, x, y)
+            if code is None or not 3 <= code < REMOVE_INDEX:
+                continue
+            cost = self.specs[code]['mp_cost']
+            if (x, y) not in self.edges[player] or (x, y) in self.structures or self.mp[player] < cost:
+                continue
+            self.mp[player] -= cost
+            counts[(shorthand, x, y)] = counts.get((shorthand, x, y), 0) + 1
+        return [(shorthand, [x, y], n) for (shorthand, x, y), n in counts.items()]
+
+    # ─────────────── Action phase ───────────────
+    def _action_phase(self, plans):
+        if not plans[0] and not plans[1]:
+            return
+        ra = self.algo_module
+        board = ra.BoardIndex.from_turn_state(self.state_for(0), self.specs, ARENA_SIZE, ARENA_SIZE)
+        self.pathfinder.set_board(board)
+        result = ra.ActionSimulator(board, self.specs, self.pathfinder).simulate(plans[0], plans[1])
+
+        reward = self.resources['coresForPlayerDamage']
+        for player in (0, 1):
+            self.health[1 - player] -= result.breaches[player]
+            self.sp[player] += result.breaches[player] * reward
+        for loc, hp in result.structure_hp.items():
+            if hp <= 0:
+                self.structures.pop(loc, None)
+            elif loc in self.structures:
+                self.structures[loc].hp = hp
+
+    def _apply_removals(self):
+        for loc, s in list(self.structures.items()):
+            if s.removing:
+                spec = self.specs[s.code]
+                max_hp = spec['upgraded_hp'] if s.upgraded else spec['hp']
+                cost = spec['sp_cost'] + (spec['upgraded_sp_cost'] if s.upgraded else 0.0)
+                self.sp[s.owner] += REMOVE_REFUND * cost * s.hp / max(1.0, max_hp)
+                del self.structures[loc]
+
+
+def play_game(factories=None, config=None, seed=None, max_turns=100, algo_module='realpython_algo', overrides=None):
+    """Play one game between two freshly built algos; factories default to AlgoStrategy.
+    overrides is a pair of per-player config dicts (forcedOpening, thresholdOverrides, ...)"""
+    if seed is not None:
+        random.seed(seed)
+    module = importlib.import_module(algo_module)
+    factories = factories or (module.AlgoStrategy, module.AlgoStrategy)
+    algos = [factory() for factory in factories]
+    return LocalGame(algos, config, max_turns, algo_module, overrides).run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Self-play games on the local engine')
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-turns', type=int, default=100)
+    parser.add_argument('--config', help='game config JSON (defaults to the standard season config)')
+    parser.add_argument('--module', default='realpython_algo', help='module that defines AlgoStrategy')
+    args = parser.parse_args(argv)
+
+    config = None
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    # AlgoStrategy banners are logged before on_game_start applies logLevel
+    os.environ.setdefault('ALGO_LOG_LEVEL', 'off')
+
+    wins = [0, 0, 0]
+    started = time.perf_counter()
+    for game in range(args.games):
+        result = play_game(config=config, seed=args.seed + game, max_turns=args.max_turns, algo_module=args.module)
+        wins[2 if result.winner is None else result.winner] += 1
+        print(json.dumps(dict(result.as_dict(), game=game)))
+    elapsed = time.perf_counter() - started
+    print(f'p1 {wins[0]} / p2 {wins[1]} / draw {wins[2]} in {elapsed:.1f}s '
+          f'({args.games / max(elapsed, 1e-9) * 3600:.0f} games/hour)')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,13 +4,144 @@ import math
 import json
 import os
 import csv
+import hashlib
+import heapq
+import time
+import multiprocessing
+import threading
+import sqlite3
+import numpy as np
+from functools import wraps
 from sys import maxsize
-from collections import defaultdict, deque
+from contextlib import contextmanager
+from collections import defaultdict, deque, OrderedDict
 
 # Persistence files
-MEMORY_FILE = 'strategy_memory.json'
+MEMORY_FILE = 'strategy_memory.json'  # legacy format, migrated into MEMORY_DB
+MEMORY_DB = 'strategy_memory.db'
+MEMORY_LIST_LIMIT = 50  # cap on per-record outcome/variance lists
 REPORT_CSV = 'strategy_report.csv'
 REPORT_HTML = 'strategy_memory_report.html'
+TIMINGS_JSON = os.path.join(os.path.dirname(REPORT_CSV), 'strategy_timings.json')
+TIMINGS_CSV = os.path.join(os.path.dirname(REPORT_CSV), 'strategy_timings.csv')
+OPENING_RATES_FILE = 'opening_win_rates.json'  # written by tournament.py
+THRESHOLD_PROFILE_FILE = 'tuned_thresholds.json'  # written by tune_thresholds.py
+GEOMETRY_CACHE = 'map_geometry_{}.npz'  # formatted with the map key
+
+
+# ═══════════════════════════════════════════════════════════════
+# DEBUG OUTPUT & TIMING
+# ═══════════════════════════════════════════════════════════════
+
+class TurnLog:
+    """Leveled debug output, buffered per turn and written in one flush.
+    
+    Messages take str.format placeholders with the values as arguments,
+    so nothing is formatted below the active level. Level 'off' is the
+    headless mode for batch self-play: every call returns immediately.
+    """
+
+    DEBUG, INFO, WARN, ERROR, OFF = 10, 20, 30, 40, 100
+    LEVELS = {'debug': DEBUG, 'info': INFO, 'warn': WARN, 'error': ERROR, 'off': OFF}
+
+    def __init__(self, level='debug'):
+        self.level = self.DEBUG
+        self.buffer = []
+        self.set_level(level)
+
+    def set_level(self, level):
+        if isinstance(level, str):
+            level = self.LEVELS.get(level.lower(), self.DEBUG)
+        self.level = int(level)
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def debug(self, msg, *args):
+        if self.level <= self.DEBUG:
+            self.buffer.append(msg.format(*args) if args else msg)
+
+    def info(self, msg, *args):
+        if self.level <= self.INFO:
+            self.buffer.append(msg.format(*args) if args else msg)
+
+    def warn(self, msg, *args):
+        if self.level <= self.WARN:
+            self.buffer.append(msg.format(*args) if args else msg)
+
+    def error(self, msg, *args):
+        if self.level <= self.ERROR:
+            self.buffer.append(msg.format(*args) if args else msg)
+
+    def flush(self):
+        """Write everything buffered since the last flush to stderr"""
+        if self.buffer:
+            lines, self.buffer = self.buffer, []
+            gamelib.debug_write('\n'.join(lines))
+
+
+class StageTimings:
+    """Per-game latency samples for turn stages and controller calls.
+    
+    Samples are monotonic perf_counter durations appended to a list per
+    name, cheap enough to leave on; percentiles are only computed when
+    the summary is dumped at game end.
+    """
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def add(self, name, seconds):
+        self.samples[name].append(seconds)
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - start)
+
+    def summary(self):
+        """{name: {count, p50, p95, max, total}} in milliseconds"""
+        out = {}
+        for name, values in self.samples.items():
+            ordered = sorted(values)
+            n = len(ordered)
+            out[name] = {
+                'count': n,
+                'p50': round(ordered[max(0, math.ceil(0.50 * n) - 1)] * 1000, 3),
+                'p95': round(ordered[max(0, math.ceil(0.95 * n) - 1)] * 1000, 3),
+                'max': round(ordered[-1] * 1000, 3),
+                'total': round(sum(ordered) * 1000, 3)
+            }
+        return out
+
+    def dump(self, json_path, csv_path):
+        """Write the summary as compact JSON and CSV"""
+        summary = self.summary()
+        _atomic_write(json_path, json.dumps(summary, separators=(',', ':'), sort_keys=True))
+        with _atomic_open(csv_path, newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['stage', 'count', 'p50_ms', 'p95_ms', 'max_ms', 'total_ms'])
+            for name in sorted(summary):
+                row = summary[name]
+                writer.writerow([name, row['count'], row['p50'], row['p95'], row['max'], row['total']])
+        return summary
+
+
+def _timed(fn):
+    """Record each call of a strategy or controller method in its game's timings"""
+    name = fn.__qualname__
+    
+    @wraps(fn)
+    def timed(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            getattr(self, 's', self).timings.add(name, time.perf_counter() - start)
+    return timed
 
 
 class AlgoStrategy(gamelib.AlgoCore):
@@ -27,25 +158,22 @@ class AlgoStrategy(gamelib.AlgoCore):
     def __init__(self):
         super().__init__()
         random.seed(random.randrange(maxsize))
-        gamelib.debug_write('═'*80)
-        gamelib.debug_write('🏆 TERMINAL AI v7.0 - ULTIMATE CHAMPIONSHIP EDITION')
-        gamelib.debug_write('   Elite Strategy • Micro Control • Path Dynamics • ML Learning')
-        gamelib.debug_write('═'*80)
+        self.log = TurnLog(os.environ.get('ALGO_LOG_LEVEL', 'debug'))
         
         # ═══════════════ ENHANCED NEURAL SYSTEMS ═══════════════
         self.breach_analytics = defaultdict(lambda: {
             'frequency': 0, 'total_damage': 0, 'avg_damage': 0.0,
             'last_turn': -1, 'success_rate': 0.0, 'threat_level': 0,
-            'path_efficiency': 0.0, 'damage_variance': [],
+            'path_efficiency': 0.0, 'damage_variance': deque(maxlen=MEMORY_LIST_LIMIT),
             'unit_composition': defaultdict(int), 'timing_score': 0.0,
-            'outcomes': []
+            'outcomes': deque(maxlen=MEMORY_LIST_LIMIT)
         })
         
         self.attack_history = defaultdict(lambda: {
             'attempts': 0, 'successes': 0, 'total_damage': 0,
             'avg_damage': 0.0, 'cost_efficiency': 0.0, 'optimal_timing': [],
             'counter_effectiveness': {}, 'synergy_scores': {},
-            'outcomes': []
+            'outcomes': deque(maxlen=MEMORY_LIST_LIMIT)
         })
         
         self.opponent_model = {
@@ -105,7 +233,7 @@ class AlgoStrategy(gamelib.AlgoCore):
         # ═══════════════ DYNAMIC THRESHOLDS ═══════════════
         self.thresholds = {
             'attack_min_mp': 8,
-            'attack_min_ev': 12,
+            'attack_min_ev': 3.0,  # SimResult.value scale: 2 per breach + structure damage / 25
             'defense_sp_ratio': 0.75,
             'economy_sp_ratio': 0.12,
             'upgrade_priority': 0.70,
@@ -117,6 +245,13 @@ class AlgoStrategy(gamelib.AlgoCore):
             'reinforce_threshold': 0.65,
             'rush_defense_mp': 18
         }
+        # Per-mode values _adapt_thresholds applies; all_in uses press, others balanced
+        self.mode_thresholds = {
+            'desperate': {'defense_sp_ratio': 0.90, 'attack_min_mp': 12, 'attack_min_ev': 2.5},
+            'defensive': {'defense_sp_ratio': 0.85, 'attack_min_mp': 10, 'attack_min_ev': 3.0},
+            'press': {'defense_sp_ratio': 0.60, 'attack_min_mp': 7, 'attack_min_ev': 2.5},
+            'balanced': {'defense_sp_ratio': 0.75, 'attack_min_mp': 8, 'attack_min_ev': 3.0},
+        }
         
         # ═══════════════ MAP CONFIGURATION ═══════════════
         self.map_width = 28
@@ -136,6 +271,26 @@ class AlgoStrategy(gamelib.AlgoCore):
             'best_attack': None, 'weak_zones': [],
             'valid_turn': -1
         }
+        self.board = None  # BoardIndex, rebuilt every turn
+        self.ledger = None  # SpawnLedger, rebuilt every turn
+        self.regions = None  # RegionSums, rebuilt every turn
+        self.geometry = None  # MapGeometry, built in on_game_start
+        self.board_tracker = BoardTracker(self.map_width, self.map_height)
+        self.board_events = []
+        self.simulator = None  # ActionSimulator, built lazily each turn
+        # Keyed by board hash, so _clear_caches leaves them alone
+        self.transpositions = {
+            'fields': TranspositionCache(8),
+            'tables': TranspositionCache(16),
+            'simulations': TranspositionCache(512),
+        }
+        self.rollout_pool = None  # RolloutPool, created in on_game_start
+        self.rollout_candidates = 3
+        self.timings = StageTimings()  # per-game latency histograms
+        self.scheduler = TurnScheduler(timings=self.timings)
+        self.fast_ingest = True  # Parse turn_state JSON straight into the board index
+        self.legacy_factory = None  # Optional TurnView -> GameState hook for legacy reads
+        self.command_sink = None  # Optional (build, deploy) hook replacing send_command (local engine)
         
         # ═══════════════ HISTORICAL DATA ═══════════════
         self.history = {
@@ -156,6 +311,13 @@ class AlgoStrategy(gamelib.AlgoCore):
         self.persistence_enabled = True
         self.report_enabled = True
         self.autosave_every = 30
+        self.memory_writer = None  # MemoryWriter, started in on_game_start
+        self.memory_store = None  # MemoryStore, opened in on_game_start
+        self.timing_report = True
+        self.recorder = None  # GameRecorder when recording is enabled
+        self.opponent_id = 'default'
+        self.forced_opening = None  # opening name pinned by config/env
+        self.threshold_overrides = {}  # applied on top of adapted thresholds
         
         # ═══════════════ STRATEGY LIBRARY ═══════════════
         self.strategies = self._init_strategy_library()
@@ -290,14 +452,29 @@ class AlgoStrategy(gamelib.AlgoCore):
 
     def on_game_start(self, config):
         """Initialize AI systems"""
-        gamelib.debug_write('🚀 Ultimate Championship AI Initializing...')
-        gamelib.debug_write('   ✓ Neural Networks: ONLINE')
-        gamelib.debug_write('   ✓ Microcontrollers: ACTIVE')
-        gamelib.debug_write('   ✓ Path Dynamics Engine: OPTIMIZED')
-        gamelib.debug_write('   ✓ Strategy Matrix: LOADED')
-        
         self.config = config or {}
         
+        # Per-run overrides (tournament entrants, tuned profiles) layered on the engine config
+        overrides_path = self.config.get('overridesPath', os.environ.get('ALGO_OVERRIDES'))
+        if overrides_path:
+            try:
+                with open(overrides_path) as f:
+                    self.config = dict(self.config, **json.load(f))
+            except Exception as e:
+                self.log.error('[CONFIG] Cannot read overrides {}: {}', overrides_path, e)
+        
+        # Debug output level, resolved before anything is logged; 'off' is headless
+        self.log.set_level(self.config.get('logLevel', os.environ.get('ALGO_LOG_LEVEL', self.log.level)))
+        self.log.info('═' * 80)
+        self.log.info('🏆 TERMINAL AI v7.0 - ULTIMATE CHAMPIONSHIP EDITION')
+        self.log.info('   Elite Strategy • Micro Control • Path Dynamics • ML Learning')
+        self.log.info('═' * 80)
+        self.log.info('🚀 Ultimate Championship AI Initializing...')
+        self.log.info('   ✓ Neural Networks: ONLINE')
+        self.log.info('   ✓ Microcontrollers: ACTIVE')
+        self.log.info('   ✓ Path Dynamics Engine: OPTIMIZED')
+        self.log.info('   ✓ Strategy Matrix: LOADED')
+        
         # Map configuration
         map_settings = self.config.get('mapSettings', {}) if isinstance(self.config, dict) else {}
         self.map_width = map_settings.get('width', self.map_width)
@@ -307,7 +484,22 @@ class AlgoStrategy(gamelib.AlgoCore):
         # Persistence settings
         if self.config.get('noPersistence', False) or os.environ.get('NO_PERSIST') == '1':
             self.persistence_enabled = False
-            gamelib.debug_write('[MEM] Persistence disabled by config/env')
+            self.log.info('[MEM] Persistence disabled by config/env')
+        
+        # Record config and turn states for offline replay
+        record_path = self.config.get('recordPath', os.environ.get('ALGO_RECORD'))
+        if record_path:
+            try:
+                self.recorder = GameRecorder(record_path)
+                self.recorder.record_config(config)
+            except Exception as e:
+                self.recorder = None
+                self.log.error('[RECORD] Cannot record to {}: {}', record_path, e)
+        
+        # Turn ingestion: raw JSON fast path unless disabled
+        if self.config.get('legacyIngest', False) or os.environ.get('LEGACY_INGEST') == '1':
+            self.fast_ingest = False
+            self.log.info('[INGEST] Using legacy GameState parsing')
         
         # Unit shorthand mapping
         global WALL, SUPPORT, TURRET, SCOUT, DEMOLISHER, INTERCEPTOR, MP, SP
@@ -334,6 +526,36 @@ class AlgoStrategy(gamelib.AlgoCore):
             DEMOLISHER: {'cost': 3, 'hp': 5, 'dmg': 8, 'speed': 0.25},
             INTERCEPTOR: {'cost': 1, 'hp': 40, 'dmg': 20, 'speed': 4}
         }
+        self.unit_specs = _unit_specs(self.config)
+        self.board_tracker.specs = self.unit_specs
+        
+        # Stage timing report written next to the CSV report at game end
+        if self.config.get('timingReport') is False or os.environ.get('TIMING_REPORT') == '0':
+            self.timing_report = False
+        
+        # Turn budget for the stage scheduler
+        budget = self.config.get('turnBudgetMs', os.environ.get('TURN_BUDGET_MS', 2000))
+        self.timings = StageTimings()
+        self.scheduler = TurnScheduler(float(budget) / 1000.0, timings=self.timings)
+        
+        # Rollout pool: worker count 0 keeps plan evaluation in-process
+        workers = self.config.get('rolloutWorkers', os.environ.get('ROLLOUT_WORKERS'))
+        workers = int(workers) if workers is not None else max(0, min(4, (os.cpu_count() or 1) - 1))
+        deadline = float(self.config.get('rolloutDeadlineMs', os.environ.get('ROLLOUT_DEADLINE_MS', 300))) / 1000.0
+        if workers > 0:
+            try:
+                self.rollout_pool = RolloutPool(workers, self.unit_specs, self.map_width, self.map_height, deadline)
+                warm = self.rollout_pool.warm()
+                self.log.info('[ROLLOUT] {} workers ({} warm), {:.0f}ms deadline', workers, warm, deadline * 1000)
+            except Exception as e:
+                if self.rollout_pool is not None:
+                    self.rollout_pool.close()
+                self.rollout_pool = None
+                self.log.warn('[ROLLOUT] Pool unavailable, evaluating in-process: {}', e)
+        
+        # Map lookup tables, cached on disk by map config
+        self.geometry = MapGeometry.get(self.map_width, self.map_height, MapGeometry.config_ranges(self.unit_specs),
+                                        GEOMETRY_CACHE if self.persistence_enabled else None)
         
         # Initialize micro systems
         self.path_engine = PathDynamicsEngine(self)
@@ -341,55 +563,119 @@ class AlgoStrategy(gamelib.AlgoCore):
         self.demolisher_escort = DemolisherEscortController(self, self.path_engine)
         self.interceptor_controller = InterceptorController(self, self.path_engine)
         
-        # Load memory
+        self.opponent_id = str(self.config.get('opponentId', os.environ.get('ALGO_OPPONENT', 'default')))
+        
+        # Opening choice and threshold overrides; opening weights refreshed from tournament results
+        self.forced_opening = self.config.get('forcedOpening', os.environ.get('ALGO_OPENING'))
+        self.threshold_overrides = dict(self.config.get('thresholdOverrides', {}))
+        self._load_threshold_profile(self.config.get('thresholdProfile',
+                                                     os.environ.get('ALGO_THRESHOLDS', THRESHOLD_PROFILE_FILE)))
+        self.thresholds.update(self.threshold_overrides)
+        self._load_opening_rates(self.config.get('openingRatesPath', OPENING_RATES_FILE))
+        
+        # Load memory; saves are written behind the turn loop
         self._load_memory()
+        if self.persistence_enabled:
+            self.memory_writer = MemoryWriter(self._write_memory_files, self.log)
         
-        gamelib.debug_write('✅ Initialization Complete - Battle Ready\n')
+        self.log.info('✅ Initialization Complete - Battle Ready\n')
+        self.log.flush()
 
     # ═══════════════ PERSISTENCE SYSTEM ═══════════════
     def _load_memory(self):
-        """Load historical data from disk"""
+        """Load this opponent's historical records from the memory store"""
         if not self.persistence_enabled:
             return
-        if not os.path.exists(MEMORY_FILE):
-            gamelib.debug_write('[MEM] No memory file to load')
+        try:
+            self.memory_store = MemoryStore(MEMORY_DB)
+            if self.memory_store.migrate_json(MEMORY_FILE, self.opponent_id):
+                self.log.info('[MEM] Migrated {} into {}', MEMORY_FILE, MEMORY_DB)
+            records = self.memory_store.load(self.opponent_id)
+            for k, v in records.get('attack_history', {}).items():
+                self.attack_history[k].update(_bounded_record(v))
+            for k, v in records.get('breach_analytics', {}).items():
+                self.breach_analytics[k].update(_bounded_record(v))
+            self.log.info('[MEM] Loaded {} records for {}', sum(map(len, records.values())), self.opponent_id)
+        except Exception as e:
+            self.log.error('[MEM] Failed to load memory: {}', e)
+
+    def _load_opening_rates(self, path):
+        """Replace the library's opening win rates with measured ones from tournament.py"""
+        if not path or not os.path.exists(path):
             return
         try:
-            with open(MEMORY_FILE, 'r') as f:
-                data = json.load(f)
-            for k, v in data.get('attack_history', {}).items():
-                self.attack_history[k].update(v)
-            for k, v in data.get('breach_analytics', {}).items():
-                self.breach_analytics[k].update(v)
-            gamelib.debug_write('[MEM] Memory loaded from disk')
+            with open(path) as f:
+                openings = json.load(f).get('openings', {})
+            for name, stats in openings.items():
+                if name in self.strategies and stats.get('games', 0) > 0:
+                    self.strategies[name]['win_rate'] = max(0.01, float(stats['win_rate']))
+            self.log.info('[OPENINGS] Win rates refreshed from {}', path)
         except Exception as e:
-            gamelib.debug_write(f'[MEM] Failed to load memory: {e}')
+            self.log.error('[OPENINGS] Cannot read {}: {}', path, e)
+
+    def _load_threshold_profile(self, profile):
+        """Apply a tuned threshold profile: a tune_thresholds.py output path or the dict itself"""
+        if isinstance(profile, str):
+            if not os.path.exists(profile):
+                return
+            try:
+                with open(profile) as f:
+                    profile = json.load(f)
+            except Exception as e:
+                self.log.error('[THRESHOLDS] Cannot read {}: {}', profile, e)
+                return
+        if not profile:
+            return
+        self.thresholds.update(profile.get('thresholds', {}))
+        for mode, values in profile.get('modes', {}).items():
+            self.mode_thresholds.setdefault(mode, {}).update(values)
+        self.log.info('[THRESHOLDS] Tuned profile applied ({} games)', profile.get('games', '?'))
 
     def _save_memory(self):
-        """Save learning data to disk"""
+        """Queue a save of learning data; the memory writer does the disk work"""
         if not self.persistence_enabled:
             return
         try:
-            out = {
-                'attack_history': {k: dict(v) for k, v in self.attack_history.items()},
-                'breach_analytics': {k: dict(v) for k, v in self.breach_analytics.items()}
-            }
-            with open(MEMORY_FILE, 'w') as f:
-                json.dump(out, f, indent=2)
-            if self.report_enabled:
-                self._write_csv_report()
-                self._write_html_report()
-            gamelib.debug_write('[MEM] Memory saved')
+            snapshot = self._memory_snapshot()
+            if self.memory_writer is not None:
+                self.memory_writer.submit(snapshot)
+            else:
+                self._write_memory_files(snapshot)
         except Exception as e:
-            gamelib.debug_write(f'[MEM] Failed to save memory: {e}')
+            self.log.error('[MEM] Failed to save memory: {}', e)
+
+    def _memory_snapshot(self):
+        """Copy everything a save needs, taken on the turn thread"""
+        return {
+            'attack_history': {k: _copy_record(v) for k, v in self.attack_history.items()},
+            'breach_analytics': {k: _copy_record(v) for k, v in self.breach_analytics.items()},
+            'metrics': {
+                'win_probability': self.metrics['win_probability'],
+                'total_breaches': self.metrics['offensive_breaches'],
+                'perfect_defenses': self.metrics['perfect_defenses']
+            },
+            'reports': self.report_enabled
+        }
+
+    def _write_memory_files(self, snapshot):
+        """Append changed records to the store and write reports (writer thread)"""
+        if self.memory_store is not None:
+            self.memory_store.append(self.opponent_id, {
+                'attack_history': snapshot['attack_history'],
+                'breach_analytics': snapshot['breach_analytics']
+            })
+        if snapshot['reports']:
+            self._write_csv_report(snapshot)
+            self._write_html_report(snapshot)
+        self.log.info('[MEM] Memory saved')
 
-    def _write_csv_report(self):
+    def _write_csv_report(self, snapshot):
         """Generate CSV performance report"""
         try:
-            with open(REPORT_CSV, 'w', newline='') as csvfile:
+            with _atomic_open(REPORT_CSV, newline='') as csvfile:
                 writer = csv.writer(csvfile)
                 writer.writerow(['play', 'attempts', 'successes', 'total_damage', 'avg_damage', 'efficiency'])
-                for play, rec in self.attack_history.items():
+                for play, rec in snapshot['attack_history'].items():
                     attempts = rec.get('attempts', 0)
                     successes = rec.get('successes', 0)
                     total_dmg = rec.get('total_damage', 0)
@@ -397,19 +683,15 @@ class AlgoStrategy(gamelib.AlgoCore):
                     efficiency = rec.get('cost_efficiency', 0)
                     writer.writerow([play, attempts, successes, total_dmg, f'{avg_dmg:.2f}', f'{efficiency:.2f}'])
         except Exception as e:
-            gamelib.debug_write(f'[REPORT] CSV error: {e}')
+            self.log.error('[REPORT] CSV error: {}', e)
 
-    def _write_html_report(self):
+    def _write_html_report(self, snapshot):
         """Generate HTML performance report"""
         try:
             data = {
-                'attack_history': {k: dict(v) for k, v in self.attack_history.items()},
-                'breach_analytics': {k: dict(v) for k, v in self.breach_analytics.items()},
-                'metrics': {
-                    'win_probability': self.metrics['win_probability'],
-                    'total_breaches': self.metrics['offensive_breaches'],
-                    'perfect_defenses': self.metrics['perfect_defenses']
-                }
+                'attack_history': snapshot['attack_history'],
+                'breach_analytics': snapshot['breach_analytics'],
+                'metrics': snapshot['metrics']
             }
             html = f"""
 <!doctype html>
@@ -424,92 +706,159 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
 <pre>{json.dumps(data, indent=2)}</pre>
 </body></html>
 """
-            with open(REPORT_HTML, 'w') as f:
-                f.write(html)
+            _atomic_write(REPORT_HTML, html)
         except Exception as e:
-            gamelib.debug_write(f'[REPORT] HTML error: {e}')
+            self.log.error('[REPORT] HTML error: {}', e)
+
+    def on_game_end(self):
+        """Final save and timing report, then stop background writers and workers"""
+        self._save_memory()
+        if self.timing_report:
+            try:
+                summary = self.timings.dump(TIMINGS_JSON, TIMINGS_CSV)
+                turn = summary.get('turn')
+                if turn:
+                    self.log.info('[TIMING] turn p50 {}ms p95 {}ms max {}ms', turn['p50'], turn['p95'], turn['max'])
+            except Exception as e:
+                self.log.error('[TIMING] Report error: {}', e)
+        if self.memory_writer is not None:
+            self.memory_writer.close()
+            self.memory_writer = None
+        if self.memory_store is not None:
+            self.memory_store.close()
+            self.memory_store = None
+        if self.rollout_pool is not None:
+            self.rollout_pool.close()
+            self.rollout_pool = None
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        self.log.flush()
 
     def on_turn(self, turn_state):
         """Master strategic orchestrator with micro control"""
-        game_state = gamelib.GameState(self.config, turn_state)
-        turn = game_state.turn_number
-        
-        self._display_analytics(game_state)
-        game_state.suppress_warnings(True)
-        
-        # Cache management
-        if self.cache['valid_turn'] != turn:
-            self._clear_caches()
-            self.cache['valid_turn'] = turn
-        
-        # Update path dynamics heatmap early
-        self.path_engine.update_heatmap(game_state)
-        
-        # ═══════════════ DEEP ANALYSIS PHASE ═══════════════
-        try:
-            self._analyze_game_state(game_state)
-            self._model_opponent_behavior(game_state)
-            self._assess_threats(game_state)
-            self._identify_opportunities(game_state)
-            self._update_game_phase(game_state)
-            self._adapt_strategy(game_state)
-            self._calculate_pressure(game_state)
-        except Exception as e:
-            gamelib.debug_write(f'[ERROR] Analysis error: {e}')
-        
-        # ═══════════════ STRATEGIC EXECUTION ═══════════════
+        self.scheduler.begin()
+        game_state = None
         try:
-            self._execute_master_strategy(game_state)
+            if self.recorder is not None:
+                self.recorder.record_turn(turn_state)
+            if self.fast_ingest:
+                game_state = TurnView(self.config, turn_state, self.unit_specs,
+                                      self.map_width, self.map_height, self.geometry)
+                game_state.legacy_factory = self.legacy_factory
+                game_state.command_sink = self.command_sink
+            else:
+                game_state = gamelib.GameState(self.config, turn_state)
+            turn = game_state.turn_number
+            
+            self._display_analytics(game_state)
+            game_state.suppress_warnings(True)
+            
+            # Cache management
+            if self.cache['valid_turn'] != turn:
+                self._clear_caches()
+                self.cache['valid_turn'] = turn
+            
+            # Single-pass board index shared by all analyzers
+            if self.fast_ingest:
+                self.board = game_state.board
+            else:
+                self.board = BoardIndex.from_game_state(game_state, self.map_width, self.map_height)
+            self.board_events = self.board_tracker.update(self.board)
+            self.regions = RegionSums(self.board)
+            self.ledger = SpawnLedger(game_state, self.board, self.unit_specs, self.geometry)
+            self.simulator = None
+            
+            # Update path dynamics heatmap early
+            self.scheduler.run('heatmap', self.path_engine.update_heatmap, game_state, essential=True)
+            
+            # ═══════════════ DEEP ANALYSIS PHASE ═══════════════
+            try:
+                self.scheduler.run('analysis', self._run_analysis, game_state, essential=True)
+            except Exception as e:
+                self.log.error('[ERROR] Analysis error: {}', e)
+            
+            # ═══════════════ STRATEGIC EXECUTION ═══════════════
+            try:
+                self.scheduler.run('execution', self._execute_master_strategy, game_state, essential=True)
+            except Exception as e:
+                self.log.error('[ERROR] Execution error: {}', e)
+            
+            # Record state
+            self.scheduler.run('record', self._record_turn_state, game_state, essential=True)
+            
+            # Autosave, and save on decisive moments
+            decisive = self.metrics['win_probability'] > 0.95 or self.metrics['win_probability'] < 0.05
+            if (self.persistence_enabled and turn % self.autosave_every == 0 and turn > 0) or decisive:
+                self.scheduler.run('save', self._save_memory)
         except Exception as e:
-            gamelib.debug_write(f'[ERROR] Execution error: {e}')
-        
-        # Record state
-        self._record_turn_state(game_state)
-        
-        # Autosave
-        if self.persistence_enabled and turn % self.autosave_every == 0 and turn > 0:
-            self._save_memory()
-        
-        # Save on decisive moments
-        if self.metrics['win_probability'] > 0.95 or self.metrics['win_probability'] < 0.05:
-            self._save_memory()
-        
-        game_state.submit_turn()
+            self.log.error('[ERROR] Turn error: {}', e)
+        finally:
+            if self.scheduler.skipped:
+                self.log.warn('[SCHED] Skipped over budget: {}', ", ".join(self.scheduler.skipped))
+            if game_state is not None:
+                game_state.submit_turn()
+            else:
+                self._submit_empty_turn()
+            self.timings.add('turn', time.monotonic() - self.scheduler.started)
+            self.log.flush()
+
+    def _submit_empty_turn(self):
+        """End the turn with no commands when no game state could be built"""
+        if self.command_sink is not None:
+            self.command_sink([], [])
+        else:
+            gamelib.util.send_command('[]')
+            gamelib.util.send_command('[]')
+
+    def _run_analysis(self, game_state):
+        """Analysis stages in dependency order; optional ones stop at the deadline"""
+        self._analyze_game_state(game_state)
+        for stage in (self._model_opponent_behavior, self._assess_threats,
+                      self._identify_opportunities, self._update_game_phase,
+                      self._adapt_strategy, self._calculate_pressure):
+            if self.scheduler.expired():
+                self.log.warn('[SCHED] Analysis cut short before {}', stage.__name__)
+                return
+            stage(game_state)
 
     def _display_analytics(self, game_state):
         """Enhanced analytics display"""
+        if not self.log.enabled(TurnLog.INFO):
+            return
         t = game_state.turn_number
         try:
             hdiff = game_state.my_health - game_state.enemy_health
         except:
             hdiff = 0
         
-        gamelib.debug_write(f'\n{"═"*80}')
-        gamelib.debug_write(f'🎮 TURN {t:3d} │ Phase: {self.game_phase:12s} │ Mode: {self.strategy_mode:12s}')
-        gamelib.debug_write(f'{"─"*80}')
+        self.log.info('\n{}', '═' * 80)
+        self.log.info('🎮 TURN {:3d} │ Phase: {:12s} │ Mode: {:12s}', t, self.game_phase, self.strategy_mode)
+        self.log.info('─' * 80)
         
         try:
-            gamelib.debug_write(f'💚 HP: {game_state.my_health:2d} vs {game_state.enemy_health:2d} (Δ{hdiff:+3d}) │ '
-                              f'💎 {game_state.get_resource(SP):3.0f}SP {game_state.get_resource(MP):3.1f}MP')
-            gamelib.debug_write(f'📊 Win%: {self.metrics["win_probability"]*100:5.1f} │ '
-                              f'Momentum: {self.metrics["momentum_score"]:+5.2f} │ '
-                              f'Pressure: {self.metrics["pressure_score"]:5.2f}')
+            self.log.info('💚 HP: {:2d} vs {:2d} (Δ{:+3d}) │ 💎 {:3.0f}SP {:3.1f}MP',
+                          game_state.my_health, game_state.enemy_health, hdiff,
+                          game_state.get_resource(SP), game_state.get_resource(MP))
+            self.log.info('📊 Win%: {:5.1f} │ Momentum: {:+5.2f} │ Pressure: {:5.2f}',
+                          self.metrics["win_probability"] * 100, self.metrics["momentum_score"],
+                          self.metrics["pressure_score"])
         except:
             pass
         
-        gamelib.debug_write(f'🎯 Enemy: {self.opponent_model["playstyle"]:12s} │ '
-                          f'Skill: {self.opponent_model["skill_estimate"]*100:4.1f}% │ '
-                          f'Predict: {self.opponent_model["predictability"]*100:4.1f}%')
+        self.log.info('🎯 Enemy: {:12s} │ Skill: {:4.1f}% │ Predict: {:4.1f}%',
+                      self.opponent_model["playstyle"], self.opponent_model["skill_estimate"] * 100,
+                      self.opponent_model["predictability"] * 100)
         
         if self.cache.get('threats'):
             threat_level = self.cache['threats'].get('level', 'low')
             try:
-                gamelib.debug_write(f'⚠️  Threat: {threat_level.upper():12s} │ '
-                                  f'Enemy MP: {game_state.get_resource(MP, 1):3.1f}')
+                self.log.info('⚠️  Threat: {:12s} │ Enemy MP: {:3.1f}',
+                              threat_level.upper(), game_state.get_resource(MP, 1))
             except:
                 pass
         
-        gamelib.debug_write(f'{"═"*80}')
+        self.log.info('═' * 80)
 
     def _clear_caches(self):
         """Clear all caches for new turn"""
@@ -521,6 +870,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
             else:
                 self.cache[key] = None
 
+    @_timed
     def _analyze_game_state(self, game_state):
         """Comprehensive state analysis"""
         # Structure analysis
@@ -554,78 +904,39 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         # Damage tracking
         self._track_damage(game_state)
         
+        # Enemy build/repair activity from the board diff
+        self._track_defense_patterns(game_state)
+        
         # Structure count history
         self.history['structure_counts'].append({
             'ours': our_structures.get('total', 0),
             'enemy': enemy_structures.get('total', 0)
         })
 
-    def _analyze_structures(self, game_state, player):
-        """Deep structure analysis with spatial mapping"""
-        structures = defaultdict(int)
-        structures['firepower'] = 0
-        structures['max_health'] = 0
-        structures['health'] = 0
-        positions = {'turrets': [], 'walls': [], 'supports': []}
-        
-        try:
-            y_range = range(14, min(self.map_height, 28)) if player == 1 else range(14)
-            
-            for x in range(min(self.map_width, 28)):
-                for y in y_range:
-                    try:
-                        if game_state.contains_stationary_unit([x, y]):
-                            for unit in game_state.game_map[[x, y]]:
-                                if getattr(unit, 'player_index', None) != player:
-                                    continue
-                                
-                                structures['total'] += 1
-                                structures['health'] += getattr(unit, 'health', 0)
-                                structures['max_health'] += getattr(unit, 'max_health', 0)
-                                
-                                if getattr(unit, 'upgraded', False):
-                                    structures['upgraded'] += 1
-                                
-                                unit_type = getattr(unit, 'unit_type', None)
-                                if unit_type == TURRET:
-                                    structures['turrets'] += 1
-                                    dps = getattr(unit, 'damage_i', 0) * (2 if getattr(unit, 'upgraded', False) else 1)
-                                    structures['firepower'] += dps
-                                    positions['turrets'].append((x, y, getattr(unit, 'upgraded', False)))
-                                elif unit_type == WALL:
-                                    structures['walls'] += 1
-                                    positions['walls'].append((x, y, getattr(unit, 'upgraded', False)))
-                                elif unit_type == SUPPORT:
-                                    structures['supports'] += 1
-                                    positions['supports'].append((x, y, getattr(unit, 'upgraded', False)))
-                                
-                                # Positional analysis
-                                if y >= 12:
-                                    structures['back'] += 1
-                                elif y >= 10:
-                                    structures['mid'] += 1
-                                else:
-                                    structures['front'] += 1
-                    except Exception:
-                        continue
-        except Exception:
-            pass
-        
-        # Calculate ratios
-        if structures['max_health'] > 0:
-            structures['health_pct'] = structures['health'] / structures['max_health']
-        else:
-            structures['health_pct'] = 1.0
+    def _track_defense_patterns(self, game_state):
+        """Summarize this turn's enemy structure events"""
+        enemy_events = [e for e in self.board_events if e[1] == 1]
+        if not enemy_events or game_state.turn_number == 0:
+            return
         
-        if structures['total'] > 0:
-            structures['upgrade_ratio'] = structures['upgraded'] / structures['total']
-            structures['density'] = structures['total'] / 28.0
-        else:
-            structures['upgrade_ratio'] = 0.0
-            structures['density'] = 0.0
+        pattern = {'turn': game_state.turn_number, 'added': defaultdict(int), 'removed': defaultdict(int),
+                   'damaged': defaultdict(int), 'upgraded': defaultdict(int), 'columns': defaultdict(int)}
+        names = {WALL_CODE: 'walls', SUPPORT_CODE: 'supports', TURRET_CODE: 'turrets'}
+        for kind, _, code, x, y in enemy_events:
+            pattern[kind][names[code]] += 1
+            if kind in ('added', 'upgraded'):
+                pattern['columns'][x] += 1
         
-        structures['positions'] = positions
-        return dict(structures)
+        self.opponent_model['defense_patterns'].append(
+            {k: dict(v) if isinstance(v, defaultdict) else v for k, v in pattern.items()})
+
+    def _analyze_structures(self, game_state, player):
+        """Deep structure analysis with spatial mapping"""
+        if self.board is None:
+            self.board = BoardIndex.from_game_state(game_state, self.map_width, self.map_height)
+        if self.board_tracker.previous is not self.board:
+            self.board_events = self.board_tracker.update(self.board)
+        return self.board_tracker.aggregates[player].summary()
 
     def _update_metrics(self, game_state, our_str, enemy_str):
         """Advanced metrics calculation"""
@@ -663,9 +974,9 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
                 
                 if game_state.my_health <= 10 and dmg_taken >= 5:
                     self.thresholds['emergency_threshold'] = 15
-                    gamelib.debug_write(f'🚨 CRITICAL BREACH: -{dmg_taken} HP (Health: {game_state.my_health})')
+                    self.log.warn('🚨 CRITICAL BREACH: -{} HP (Health: {})', dmg_taken, game_state.my_health)
                 else:
-                    gamelib.debug_write(f'⚠️  Breach: -{dmg_taken} HP')
+                    self.log.info('⚠️  Breach: -{} HP', dmg_taken)
             else:
                 self.metrics['perfect_defenses'] += 1
             
@@ -677,10 +988,10 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
                 if mp_spent > 0:
                     roi = dmg_dealt / mp_spent
                     self.metrics['attack_roi'].append(roi)
-                    gamelib.debug_write(f'✅ Attack Success: +{dmg_dealt} HP (ROI: {roi:.2f}x)')
+                    self.log.info('✅ Attack Success: +{} HP (ROI: {:.2f}x)', dmg_dealt, roi)
             elif self.last_mp_spent > 5:
                 self.metrics['failed_attacks'] += 1
-                gamelib.debug_write(f'❌ Attack Failed: {self.last_mp_spent} MP wasted')
+                self.log.info('❌ Attack Failed: {} MP wasted', self.last_mp_spent)
             
             self.prev_health = {
                 'ours': game_state.my_health,
@@ -762,6 +1073,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         except:
             pass
 
+    @_timed
     def _model_opponent_behavior(self, game_state):
         """Advanced opponent modeling with counter-strategy"""
         turn = game_state.turn_number
@@ -900,19 +1212,11 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         weaknesses = []
         enemy_str = self.cache['structures']['enemy']
         
-        # Analyze turret coverage
-        turret_positions = enemy_str.get('positions', {}).get('turrets', [])
-        
-        # Check coverage gaps
-        coverage_map = defaultdict(int)
-        for tx, ty, upgraded in turret_positions:
-            for x in range(max(0, tx-3), min(28, tx+4)):
-                coverage_map[x] += (2 if upgraded else 1)
-        
-        # Find weak zones
+        # Find weak zones: turrets within three columns either side
         for x in range(0, 28, 2):
-            if coverage_map[x] < 2:
-                weaknesses.append(('sparse_zone', x, coverage_map[x]))
+            coverage = self.regions.band((1, 'turrets'), x - 3, x + 3)
+            if coverage < 2:
+                weaknesses.append(('sparse_zone', x, coverage))
         
         # Check upgrade status
         if enemy_str.get('upgrade_ratio', 0) < 0.20:
@@ -929,9 +1233,9 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         # Check support exposure
         support_positions = enemy_str.get('positions', {}).get('supports', [])
+        walls = self.board.bitboard(1, WALL_CODE)
         for sx, sy, upgraded in support_positions:
-            nearby_walls = sum(1 for wx, wy, _ in enemy_str.get('positions', {}).get('walls', []) 
-                             if abs(wx-sx) + abs(wy-sy) <= 2)
+            nearby_walls = _popcount(walls & self.geometry.near_mask(sx, sy, 2))
             if nearby_walls < 2:
                 weaknesses.append(('exposed_support', sx, sy))
         
@@ -982,6 +1286,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         self.opponent_model['counter_strategy'] = counter_strategies.get(playstyle, counter_strategies['balanced'])
 
+    @_timed
     def _assess_threats(self, game_state):
         """Comprehensive threat assessment"""
         try:
@@ -1018,7 +1323,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
                     threats.append(('predicted_attack', turn, predicted_next))
                     if threat_level in ['low', 'none']:
                         threat_level = 'moderate'
-                    gamelib.debug_write(f'🔮 Attack Predicted: Turn {predicted_next:.0f}')
+                    self.log.debug('🔮 Attack Predicted: Turn {:.0f}', predicted_next)
         
         # Playstyle threats
         if self.opponent_model['playstyle'] == 'rush' and turn < 8:
@@ -1032,6 +1337,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
             'enemy_mp': enemy_mp
         }
 
+    @_timed
     def _identify_opportunities(self, game_state):
         """Identify offensive opportunities"""
         opportunities = []
@@ -1074,6 +1380,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         self.cache['opportunities'] = opportunities
 
+    @_timed
     def _calculate_pressure(self, game_state):
         """Calculate offensive pressure score"""
         pressure = 0.0
@@ -1100,6 +1407,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         self.metrics['pressure_score'] = pressure
 
+    @_timed
     def _update_game_phase(self, game_state):
         """Update game phase"""
         turn = game_state.turn_number
@@ -1125,6 +1433,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         elif total_health <= 30:
             self.game_phase = 'decisive'
 
+    @_timed
     def _adapt_strategy(self, game_state):
         """Adapt strategy based on situation"""
         # Get situation
@@ -1171,22 +1480,9 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
 
     def _adapt_thresholds(self, game_state):
         """Dynamically adapt decision thresholds"""
-        if self.strategy_mode == 'desperate':
-            self.thresholds['defense_sp_ratio'] = 0.90
-            self.thresholds['attack_min_mp'] = 12
-            self.thresholds['attack_min_ev'] = 10
-        elif self.strategy_mode == 'defensive':
-            self.thresholds['defense_sp_ratio'] = 0.85
-            self.thresholds['attack_min_mp'] = 10
-            self.thresholds['attack_min_ev'] = 12
-        elif self.strategy_mode in ['press', 'all_in']:
-            self.thresholds['defense_sp_ratio'] = 0.60
-            self.thresholds['attack_min_mp'] = 7
-            self.thresholds['attack_min_ev'] = 10
-        else:
-            self.thresholds['defense_sp_ratio'] = 0.75
-            self.thresholds['attack_min_mp'] = 8
-            self.thresholds['attack_min_ev'] = 12
+        mode = 'press' if self.strategy_mode == 'all_in' else self.strategy_mode
+        self.thresholds.update(self.mode_thresholds.get(mode, self.mode_thresholds['balanced']))
+        self.thresholds.update(self.threshold_overrides)
 
     def _execute_master_strategy(self, game_state):
         """Execute coordinated strategy with micro control"""
@@ -1199,7 +1495,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
             our_sp = 0
             our_mp = 0
         
-        gamelib.debug_write(f'\n🎯 Executing {self.strategy_mode.upper()} strategy...')
+        self.log.info('\n🎯 Executing {} strategy...', self.strategy_mode.upper())
         
         # Phase 1: Deploy opening
         if turn == 0:
@@ -1239,6 +1535,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         self.last_mp_spent = 0
 
+    @_timed
     def _deploy_opening(self, game_state):
         """Deploy optimized opening"""
         # Select best strategy
@@ -1249,60 +1546,55 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         normalized = [w/total for w in weights]
         
         choice = random.choices(strategies, weights=normalized)[0]
+        if self.forced_opening in self.strategies:
+            choice = self.forced_opening
         opening = self.strategies[choice]
         
-        gamelib.debug_write(f'📋 Deploying Opening: {choice} (WR: {opening["win_rate"]*100:.1f}%)')
+        self.log.info('📋 Deploying Opening: {} (WR: {:.1f}%)', choice, opening["win_rate"]*100)
         
         # Deploy turrets
         for loc in opening.get('turrets', []):
-            game_state.attempt_spawn(TURRET, loc)
+            self.ledger.spawn(TURRET, loc)
         
         # Deploy walls
         for loc in opening.get('walls', []):
-            game_state.attempt_spawn(WALL, loc)
+            self.ledger.spawn(WALL, loc)
         
         # Deploy supports
         for loc in opening.get('supports', []):
-            game_state.attempt_spawn(SUPPORT, loc)
+            self.ledger.spawn(SUPPORT, loc)
         
         # Upgrade priority structures
         for loc in opening.get('upgrades', []):
-            game_state.attempt_upgrade(loc)
+            self.ledger.upgrade(loc)
 
+    @_timed
     def _baseline_build(self, game_state):
         """Build baseline defensive structures"""
         try:
             for loc in [[13, 13], [14, 13], [0, 13], [27, 13]]:
-                if game_state.can_spawn(WALL, loc):
-                    game_state.attempt_spawn(WALL, loc)
-                if game_state.can_spawn(TURRET, loc):
-                    game_state.attempt_spawn(TURRET, loc)
+                self.ledger.spawn(WALL, loc)
+                self.ledger.spawn(TURRET, loc)
         except Exception:
             pass
 
+    @_timed
     def _repair_critical_structures(self, game_state):
         """Repair damaged critical structures"""
         repairs_made = 0
         
         try:
-            for x in range(28):
-                for y in range(14):
-                    if game_state.contains_stationary_unit([x, y]):
-                        for unit in game_state.game_map[[x, y]]:
-                            if getattr(unit, 'player_index', None) == 0:
-                                health_pct = getattr(unit, 'health', 0) / max(1, getattr(unit, 'max_health', 1))
-                                unit_type = getattr(unit, 'unit_type', None)
-                                
-                                if health_pct < 0.40 and unit_type in [TURRET, WALL]:
-                                    if game_state.attempt_spawn(unit_type, [x, y]):
-                                        repairs_made += 1
-                                        gamelib.debug_write(f'🔧 Repaired {unit_type} at [{x},{y}]')
+            for x, y, unit_type in self.board.damaged_structures(0, 0.40, [TURRET, WALL]):
+                if self.ledger.spawn(unit_type, [x, y]):
+                    repairs_made += 1
+                    self.log.debug('🔧 Repaired {} at [{},{}]', unit_type, x, y)
         except Exception:
             pass
         
         if repairs_made > 0:
-            gamelib.debug_write(f'✅ Completed {repairs_made} critical repairs')
+            self.log.info('✅ Completed {} critical repairs', repairs_made)
 
+    @_timed
     def _emergency_defense(self, game_state):
         """Emergency defensive reinforcement with micro"""
         try:
@@ -1312,13 +1604,13 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         except:
             return
         
-        gamelib.debug_write(f'🚨 EMERGENCY DEFENSE (Enemy MP: {enemy_mp:.1f})')
+        self.log.warn('🚨 EMERGENCY DEFENSE (Enemy MP: {:.1f})', enemy_mp)
         
         # Deploy defensive interceptors using micro controller
         if our_mp >= 5 and enemy_mp >= 15:
             spawn_plan = self.interceptor_controller.plan_defensive_interceptors(game_state, min(6, int(our_mp)))
             self._execute_spawn_plan(game_state, spawn_plan)
-            gamelib.debug_write(f'🛡️  Defensive interceptors deployed')
+            self.log.info('🛡️  Defensive interceptors deployed')
         
         # Reinforce weak zones
         if our_sp >= 4:
@@ -1327,18 +1619,18 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
                 if weakness[0] == 'sparse_zone':
                     x = weakness[1]
                     for y in [12, 11, 10]:
-                        if game_state.can_spawn(TURRET, [x, y]):
-                            if game_state.attempt_spawn(TURRET, [x, y]):
-                                game_state.attempt_upgrade([x, y])
-                                gamelib.debug_write(f'⚡ Emergency turret at [{x},{y}]')
-                                break
+                        if self.ledger.spawn(TURRET, [x, y]):
+                            self.ledger.upgrade([x, y])
+                            self.log.debug('⚡ Emergency turret at [{},{}]', x, y)
+                            break
 
+    @_timed
     def _build_adaptive_defense(self, game_state, sp_budget):
         """Build intelligent adaptive defense"""
         if sp_budget < 2:
             return
         
-        gamelib.debug_write(f'🏗️  Building defense (Budget: {sp_budget:.1f} SP)')
+        self.log.info('🏗️  Building defense (Budget: {:.1f} SP)', sp_budget)
         
         # Priority 1: Upgrade key turrets
         self._upgrade_priority_turrets(game_state, sp_budget * 0.4)
@@ -1358,23 +1650,22 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         ]
         
         try:
+            turrets = self.board.player_mask(0, TURRET_CODE) & ~self.board.upgraded
             for loc in priority_positions:
-                if game_state.contains_stationary_unit(loc):
-                    for unit in game_state.game_map[loc]:
-                        if getattr(unit, 'player_index', None) == 0 and getattr(unit, 'unit_type', None) == TURRET and not getattr(unit, 'upgraded', False):
-                            upgrade_targets.append(loc)
+                if turrets[loc[0], loc[1]]:
+                    upgrade_targets.append(loc)
         except:
             pass
         
         upgraded_count = 0
         for loc in upgrade_targets:
             if sp_budget >= 4:
-                if game_state.attempt_upgrade(loc):
+                if self.ledger.upgrade(loc):
                     sp_budget -= 4
                     upgraded_count += 1
         
         if upgraded_count > 0:
-            gamelib.debug_write(f'⬆️  Upgraded {upgraded_count} turrets')
+            self.log.info('⬆️  Upgraded {} turrets', upgraded_count)
         
         return upgraded_count
 
@@ -1383,17 +1674,16 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         if sp_budget < 2:
             return
         
+        candidates = [[x, y] for y in [13, 12, 11] for x in range(4, 24, 3)]
+        
         filled = 0
-        for y in [13, 12, 11]:
-            for x in range(4, 24, 3):
-                if sp_budget >= 2 and not game_state.contains_stationary_unit([x, y]):
-                    if game_state.can_spawn(TURRET, [x, y]):
-                        if game_state.attempt_spawn(TURRET, [x, y]):
-                            sp_budget -= 2
-                            filled += 1
+        for x, y in self._rank_by_path_impact(candidates):
+            if sp_budget >= 2 and self.ledger.spawn(TURRET, [x, y]):
+                sp_budget -= 2
+                filled += 1
         
         if filled > 0:
-            gamelib.debug_write(f'🔧 Filled {filled} defensive gaps')
+            self.log.info('🔧 Filled {} defensive gaps', filled)
 
     def _add_defensive_depth(self, game_state, sp_budget):
         """Add defensive depth"""
@@ -1406,15 +1696,53 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         ]
         
         added = 0
-        for loc in wall_positions:
-            if sp_budget >= 0.5 and not game_state.contains_stationary_unit(loc):
-                if game_state.attempt_spawn(WALL, loc):
-                    sp_budget -= 0.5
-                    added += 1
+        for loc in self._rank_by_path_impact(wall_positions):
+            if sp_budget >= 0.5 and self.ledger.spawn(WALL, loc):
+                sp_budget -= 0.5
+                added += 1
         
         if added > 0:
-            gamelib.debug_write(f'🧱 Added {added} walls for depth')
+            self.log.info('🧱 Added {} walls for depth', added)
+
+    def _rank_by_path_impact(self, candidates):
+        """Order structure placements by how much they lengthen enemy paths
+        
+        Each candidate is tried as a hypothetical block; the path engine
+        repairs its distance fields instead of recomputing them. Placements
+        that cut off our own spawn cells sink to the end. A cell on no
+        current path cannot lengthen or cut one, so it scores 0 untried.
+        """
+        try:
+            finder = self.path_engine.pathfinder
+            base_enemy, base_cut = finder.spawn_distances(1)
+            _, our_cut = finder.spawn_distances(0)
+            blocked = self.board.bitboard()
+            contested = finder.path_mask(1) | finder.path_mask(0)
+            
+            scored = []
+            for i, loc in enumerate(candidates):
+                if self.scheduler.expired():
+                    # Out of time: unscored placements keep their order after the scored ones
+                    scored.extend((0, j, rest) for j, rest in enumerate(candidates[i:], i))
+                    break
+                cell = self.geometry.bit(loc[0], loc[1])
+                if cell & blocked or not cell & contested:
+                    scored.append((0, i, loc))
+                    continue
+                with finder.hypothetical([loc]):
+                    enemy_total, enemy_cut = finder.spawn_distances(1)
+                    _, cut = finder.spawn_distances(0)
+                gain = (enemy_total - base_enemy) + (enemy_cut - base_cut) * self.map_width
+                if cut > our_cut:
+                    gain -= self.map_width * self.map_height
+                scored.append((-gain, i, loc))
+            
+            scored.sort()
+            return [loc for _, _, loc in scored]
+        except Exception:
+            return candidates
 
+    @_timed
     def _upgrade_logic(self, game_state):
         """Smart upgrade logic"""
         try:
@@ -1427,12 +1755,12 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         for loc in [[13,12], [14,12], [10,11], [17,11]]:
             try:
-                if game_state.contains_stationary_unit(loc) and sp >= 2:
-                    if game_state.attempt_upgrade(loc):
-                        sp -= 2
+                if sp >= 2 and self.ledger.upgrade(loc):
+                    sp -= 2
             except Exception:
                 continue
 
+    @_timed
     def _build_economy(self, game_state):
         """Build economic infrastructure"""
         try:
@@ -1450,19 +1778,19 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         built = 0
         for loc in support_positions:
-            if our_sp >= 4 and not game_state.contains_stationary_unit(loc):
-                if game_state.attempt_spawn(SUPPORT, loc):
-                    our_sp -= 4
-                    built += 1
-                    self.metrics['economy_turns'] += 1
-                    
-                    if our_sp >= 2:
-                        game_state.attempt_upgrade(loc)
-                        our_sp -= 2
+            if our_sp >= 4 and self.ledger.spawn(SUPPORT, loc):
+                our_sp -= 4
+                built += 1
+                self.metrics['economy_turns'] += 1
+                
+                if our_sp >= 2:
+                    self.ledger.upgrade(loc)
+                    our_sp -= 2
         
         if built > 0:
-            gamelib.debug_write(f'💰 Built {built} supports')
+            self.log.info('💰 Built {} supports', built)
 
+    @_timed
     def _attack_logic_with_micro(self, game_state):
         """Attack logic with advanced microcontroller integration"""
         try:
@@ -1473,7 +1801,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         if mp < self.thresholds['attack_min_mp']:
             return False
         
-        gamelib.debug_write(f'\n⚔️  ATTACK PHASE ({mp:.1f} MP available)')
+        self.log.info('\n⚔️  ATTACK PHASE ({:.1f} MP available)', mp)
         
         # Score all attack options
         scored = []
@@ -1510,7 +1838,6 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         # Select best attack
         scored.sort(reverse=True, key=lambda x: x[0])
-        _, name, play = scored[0]
         
         # Determine MP allocation based on strategy
         if self.metrics['momentum_score'] > 1.0 or self.metrics['win_probability'] > 0.6:
@@ -1520,21 +1847,29 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         else:
             allocation = 0.60
         
-        use_mp = max(play['min_mp'], int(mp * allocation))
-        use_mp = min(use_mp, mp)
+        # Plan the leading plays; with a rollout pool several are simulated at once
+        width = self.rollout_candidates if self.rollout_pool is not None else 1
+        candidates = []
+        for _, name, play in scored[:width]:
+            use_mp = max(play['min_mp'], int(mp * allocation))
+            use_mp = min(use_mp, mp)
+            
+            # Route to appropriate microcontroller
+            spawn_plan = self._get_micro_spawn_plan(game_state, name, play, use_mp)
+            candidates.append((name, play, use_mp, spawn_plan))
         
-        gamelib.debug_write(f'[ATTACK] Selected {name} using MP={use_mp}')
+        # Calculate expected damage (simulated against the current board)
+        values = self._evaluate_candidates(game_state, candidates)
+        best = max(range(len(candidates)), key=lambda i: (values[i], -i))
+        name, play, use_mp, spawn_plan = candidates[best]
+        expected_dmg = values[best]
         
-        # Calculate expected damage
-        expected_dmg = self._estimate_attack_damage_from_play(game_state, name, play, use_mp)
+        self.log.info('[ATTACK] Selected {} using MP={}', name, use_mp)
         
         if expected_dmg < self.thresholds['attack_min_ev']:
-            gamelib.debug_write(f'⏸️  Expected damage too low: {expected_dmg:.1f}')
+            self.log.info('⏸️  Expected damage too low: {:.1f}', expected_dmg)
             return False
         
-        # Route to appropriate microcontroller
-        spawn_plan = self._get_micro_spawn_plan(game_state, name, play, use_mp)
-        
         # Execute spawn plan
         if spawn_plan:
             self._execute_spawn_plan(game_state, spawn_plan)
@@ -1546,6 +1881,46 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         return False
 
+    @_timed
+    def _evaluate_candidates(self, game_state, candidates):
+        """Expected damage for each (name, play, use_mp, spawn_plan) candidate"""
+        if self.rollout_pool is None or len(candidates) < 2:
+            # Anytime: the first candidate is always scored, the rest while time allows
+            values = []
+            for name, play, use_mp, plan in candidates:
+                if values and self.scheduler.expired():
+                    values.append(float('-inf'))
+                    continue
+                values.append(self._estimate_attack_damage_from_play(game_state, name, play, use_mp, plan))
+            return values
+        
+        # Plans already simulated on this board come from the transposition cache
+        simulations = self.transpositions['simulations']
+        state = self.board.hashes().state
+        keys = [(state, _plan_key(plan or [])) for _, _, _, plan in candidates]
+        results = [simulations.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            deadline = min(self.rollout_pool.deadline, self.scheduler.time_left())
+            fresh = self.rollout_pool.evaluate(self.board, [candidates[i][3] or [] for i in misses], deadline)
+            for i, result in zip(misses, fresh):
+                if result is not None:
+                    results[i] = simulations.put(keys[i], result)
+        values = []
+        for (name, play, use_mp, plan), result in zip(candidates, results):
+            if result is not None:
+                self.cache['damage'][name] = result
+                values.append(result.value(0))
+            elif plan and self.path_engine.table is not None:
+                # Missed the deadline: fall back to the lookup table
+                values.append(self.path_engine.table.plan_value(plan, _unit_codes()))
+            else:
+                values.append(self._estimate_attack_damage_from_play(game_state, name, play, use_mp))
+        missed = results.count(None)
+        if missed:
+            self.log.warn('[ROLLOUT] {}/{} plans missed the deadline', missed, len(results))
+        return values
+
     def _get_micro_spawn_plan(self, game_state, name, play, use_mp):
         """Get spawn plan from appropriate microcontroller"""
         unit = play.get('unit')
@@ -1575,7 +1950,7 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
                 return self.scout_controller.plan_scout_wave(game_state, use_mp, self.strategy_mode)
         
         except Exception as e:
-            gamelib.debug_write(f'[MICRO] Error creating spawn plan: {e}')
+            self.log.error('[MICRO] Error creating spawn plan: {}', e)
             # Fallback to simple spawn
             return [(SCOUT, [13, 0], use_mp)]
 
@@ -1595,13 +1970,13 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         demos1 = int((mp_per_path * 0.3) / 3)
         
         for loc in path1_locs:
-            if game_state.can_spawn(SCOUT, loc):
+            if self.ledger.can_spawn(SCOUT, loc):
                 plan.append((SCOUT, loc, scouts1 // len(path1_locs)))
                 break
         
         if demos1 > 0:
             for loc in path1_locs:
-                if game_state.can_spawn(DEMOLISHER, loc):
+                if self.ledger.can_spawn(DEMOLISHER, loc):
                     plan.append((DEMOLISHER, loc, demos1))
                     break
         
@@ -1610,13 +1985,13 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         demos2 = int((mp_per_path * 0.3) / 3)
         
         for loc in path2_locs:
-            if game_state.can_spawn(SCOUT, loc):
+            if self.ledger.can_spawn(SCOUT, loc):
                 plan.append((SCOUT, loc, scouts2 // len(path2_locs)))
                 break
         
         if demos2 > 0:
             for loc in path2_locs:
-                if game_state.can_spawn(DEMOLISHER, loc):
+                if self.ledger.can_spawn(DEMOLISHER, loc):
                     plan.append((DEMOLISHER, loc, demos2))
                     break
         
@@ -1637,10 +2012,17 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
             if enemy.get('turrets', 0) < 12:
                 base += 0.2
         
-        # Path danger penalty
+        # Path danger penalty (expected units lost on the best lane, capped)
         try:
-            path_penalty = self.path_engine.estimate_path_danger(game_state, unit)
-            base -= path_penalty * 0.03
+            code = _MOBILE_CODES.get(unit, SCOUT_CODE)
+            table = self.path_engine.table
+            if table is not None:
+                best = table.best_cells(code, table.max_count, 1)
+                losses = table.expected_losses(best[0], code) if best else 10.0
+            else:
+                path_penalty = self.path_engine.estimate_path_danger(game_state, unit)
+                losses = path_penalty / max(1.0, self.unit_specs[code]['hp'])
+            base -= min(10.0, losses) * 0.03
         except:
             pass
         
@@ -1649,57 +2031,44 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         return base
 
-    def _estimate_attack_damage_from_play(self, game_state, name, play, use_mp):
-        """Estimate attack damage"""
-        enemy_str = self.cache['structures']['enemy']
-        
-        if name == 'scout_flood':
-            scouts = int(use_mp * 0.95)
+    def _simulator(self):
+        """This turn's action-phase simulator, built on first use"""
+        if self.simulator is None:
+            self.simulator = ActionSimulator(self.board, self.unit_specs, self.path_engine.pathfinder)
+        return self.simulator
+
+    def _estimate_attack_damage_from_play(self, game_state, name, play, use_mp, spawn_plan=None):
+        """Attack value on the SimResult.value scale: simulated, else from the table, else 0"""
+        if spawn_plan:
             try:
-                path_damage = self.path_engine.estimate_path_danger(game_state, 'scout') * 10
-            except:
-                path_damage = 30
-            scout_hp = scouts * 15
-            damage = max(0, (scout_hp - path_damage) / 8.0)
-            return damage
-        
-        elif name in ['demo_breach', 'surgical_strike']:
-            structures = enemy_str.get('walls', 0) + enemy_str.get('turrets', 0) // 2
-            demos = int((use_mp * 0.65) / 3)
-            damage = min(structures * 0.7, 10) * demos * 0.4
-            return damage
-        
-        elif name == 'interceptor_rush':
-            interceptors = int(use_mp * 0.98)
-            turret_count = enemy_str.get('turrets', 0)
-            damage = (interceptors * 3.5) - (turret_count * 1.5)
-            return max(0, damage)
-        
-        elif name == 'mixed_assault':
-            damage = use_mp * 1.6
-            return damage
-        
-        elif name == 'pincer_attack':
-            damage = use_mp * 1.3
-            return damage
-        
-        return use_mp * 1.0
+                simulations = self.transpositions['simulations']
+                key = (self.board.hashes().state, _plan_key(spawn_plan))
+                result = simulations.get(key)
+                if result is None:
+                    result = simulations.put(key, self._simulator().simulate(spawn_plan))
+                self.cache['damage'][name] = result
+                return result.value(0)
+            except Exception as e:
+                self.log.warn('[SIM] Simulation failed, using the damage table: {}', e)
+        
+        table = self.path_engine.table
+        if table is not None:
+            if spawn_plan:
+                return table.plan_value(spawn_plan, _unit_codes())
+            code = _MOBILE_CODES.get(play.get('unit'), SCOUT_CODE)
+            count = int(use_mp // max(1.0, self.unit_specs[code]['mp_cost']))
+            best = table.best_cells(code, count, 1)
+            return table.value(best[0], code, count) if best else 0.0
+        
+        # Nothing on the SimResult.value scale to go on: don't attack blind
+        return 0.0
 
     def _execute_spawn_plan(self, game_state, spawn_plan):
         """Execute a spawn plan from microcontrollers"""
-        for unit_type, loc, count in spawn_plan:
-            for _ in range(count):
-                try:
-                    if game_state.can_spawn(unit_type, loc):
-                        game_state.attempt_spawn(unit_type, loc)
-                    else:
-                        # Try alternate location
-                        alt = [max(0, loc[0]-1), loc[1]]
-                        if game_state.can_spawn(unit_type, alt):
-                            game_state.attempt_spawn(unit_type, alt)
-                except Exception:
-                    continue
+        # Units that do not fit at their cell try the alternate location
+        return self.ledger.submit(spawn_plan, fallback=lambda loc: [max(0, loc[0]-1), loc[1]])
 
+    @_timed
     def _emergency_logic(self, game_state):
         """Emergency all-in logic"""
         # Recent damage check
@@ -1712,20 +2081,19 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
         
         # Emergency wall spam
         if recent_taken >= self.thresholds['emergency_hp_loss']:
-            gamelib.debug_write('[EMERGENCY] Building quick walls')
+            self.log.warn('[EMERGENCY] Building quick walls')
             for loc in [[13,12], [14,12], [10,11], [17,11]]:
                 try:
                     if mp <= 0:
                         break
-                    if game_state.can_spawn(WALL, loc):
-                        game_state.attempt_spawn(WALL, loc)
+                    if self.ledger.spawn(WALL, loc):
                         mp -= 1
                 except Exception:
                     pass
         
         # All-in attack
         if self.metrics['win_probability'] < 0.12 and mp >= self.thresholds['all_in_threshold']:
-            gamelib.debug_write('[ALL-IN] Launching desperate attack')
+            self.log.warn('[ALL-IN] Launching desperate attack')
             try:
                 spawn_plan = self.demolisher_escort.plan_demolisher_wave(game_state, mp, 'press')
                 self._execute_spawn_plan(game_state, spawn_plan)
@@ -1759,86 +2127,2558 @@ pre {{ background: #0a0a0a; padding: 15px; border: 1px solid #00ff00; }}
 
 
 # ═══════════════════════════════════════════════════════════════
-# MICROCONTROLLER SYSTEMS
+# PERSISTENCE WRITER & RECORDER
 # ═══════════════════════════════════════════════════════════════
 
-class PathDynamicsEngine:
-    """Estimates danger/heatmap across map coordinates for spawn planning.
+def _copy_record(record):
+    """Copy of a memory record whose lists the turn thread may still append to"""
+    return {k: list(v)[-MEMORY_LIST_LIMIT:] if isinstance(v, (list, deque)) else
+            dict(v) if isinstance(v, dict) else v for k, v in record.items()}
+
+
+def _bounded_record(record):
+    """Loaded record with its list fields capped at MEMORY_LIST_LIMIT entries"""
+    return {k: deque(v, maxlen=MEMORY_LIST_LIMIT) if isinstance(v, list) and k in ('outcomes', 'damage_variance')
+            else v for k, v in record.items()}
+
+
+def _atomic_write(path, text):
+    """Replace path with text so readers never see a partial file"""
+    with _atomic_open(path) as f:
+        f.write(text)
+
+
+@contextmanager
+def _atomic_open(path, newline=None, mode='w'):
+    """Open a temp file next to path and move it into place on success"""
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tmp, mode, newline=newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# Counters that sum across games; other scalars keep the newest value
+_ADDITIVE_FIELDS = {'attempts', 'successes', 'total_damage', 'frequency'}
+_ADDITIVE_MAPS = {'unit_composition'}
+
+
+def _appended(old, new):
+    """Items added to a capped list since old was taken"""
+    for shift in range(len(old) + 1):
+        if old[shift:] == new[:len(old) - shift]:
+            return new[len(old) - shift:]
+    return list(new)
+
+
+def _record_delta(current, baseline):
+    """What this game changed in a record since baseline, or None"""
+    if not baseline:
+        return dict(current) or None  # new record: keep its zero counters too
+    delta = {}
+    for k, v in current.items():
+        old = baseline.get(k)
+        if k in _ADDITIVE_FIELDS and isinstance(v, (int, float)):
+            if v != (old or 0):
+                delta[k] = v - (old or 0)
+        elif k in _ADDITIVE_MAPS and isinstance(v, dict):
+            old = old or {}
+            changed = {kk: vv - old.get(kk, 0) for kk, vv in v.items() if vv != old.get(kk, 0)}
+            if changed:
+                delta[k] = changed
+        elif isinstance(v, list):
+            added = _appended(old or [], v)
+            if added:
+                delta[k] = added
+        elif v != old:
+            delta[k] = v
+    return delta or None
+
+
+def _merge_delta(record, delta):
+    """Fold one game's delta into a record in place"""
+    for k, v in delta.items():
+        if k in _ADDITIVE_FIELDS and isinstance(v, (int, float)):
+            record[k] = record.get(k, 0) + v
+        elif k in _ADDITIVE_MAPS and isinstance(v, dict):
+            merged = dict(record.get(k) or {})
+            for kk, vv in v.items():
+                merged[kk] = merged.get(kk, 0) + vv
+            record[k] = merged
+        elif isinstance(v, list):
+            record[k] = (list(record.get(k) or []) + v)[-MEMORY_LIST_LIMIT:]
+        else:
+            record[k] = v
     
-    Tries to call game_state.find_path_to_edge if available; otherwise uses
-    a column turret density heuristic.
+    # Averages follow the merged counters
+    count = record.get('attempts', record.get('frequency'))
+    if count and 'total_damage' in record:
+        record['avg_damage'] = record['total_damage'] / count
+    return record
+
+
+class MemoryStore:
+    """Append-only SQLite store of learning records, shared by parallel games.
+    
+    Rows are either full records or deltas: what one game changed since
+    it loaded. Loading folds a key's rows in order, so counters from N
+    concurrent games add up instead of the last writer winning. WAL mode
+    lets readers and the tiny append transactions overlap. Compaction
+    folds each key back into a single full row.
     """
 
-    def __init__(self, strategy):
-        self.s = strategy
-        self.heatmap = None
+    COMPACT_RATIO = 4
 
-    def update_heatmap(self, game_state):
-        """Build heatmap using available API"""
-        try:
-            if hasattr(game_state, 'find_path_to_edge'):
-                self.heatmap = self._simulate_paths(game_state)
-                return
-        except Exception:
-            pass
-        
-        # Fallback to column density
-        self.heatmap = self._column_turret_density(game_state)
+    def __init__(self, path, busy_timeout_ms=5000):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=busy_timeout_ms / 1000.0, check_same_thread=False,
+                                  isolation_level=None)
+        self.db.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+        self.db.execute('PRAGMA journal_mode = WAL')
+        self.db.execute('PRAGMA synchronous = NORMAL')
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL, key TEXT NOT NULL, opponent TEXT NOT NULL,
+                data TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS records_lookup ON records (kind, key, opponent, seq);
+            CREATE INDEX IF NOT EXISTS records_opponent ON records (opponent, seq);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+        """)
+        columns = [row[1] for row in self.db.execute('PRAGMA table_info(records)')]
+        if 'delta' not in columns:
+            self.db.execute('ALTER TABLE records ADD COLUMN delta INTEGER NOT NULL DEFAULT 0')
+        self.baseline = {}  # (kind, key, opponent) -> record as this game last saw it
 
-    def _simulate_paths(self, game_state):
-        """Attempt to use simulation API"""
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the lock up front"""
+        self.db.execute('BEGIN IMMEDIATE')
         try:
-            sim = game_state.find_path_to_edge()
-            if isinstance(sim, dict):
-                return sim
-        except Exception:
-            pass
-        return None
+            yield
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
 
-    def _column_turret_density(self, game_state):
-        """Calculate turret density per column"""
-        width = self.s.map_width
-        height = self.s.map_height
-        density = {x: 0 for x in range(width)}
-        
+    @staticmethod
+    def _fold(rows):
+        """{(kind, key, opponent): record} from rows ordered by seq"""
+        folded = {}
+        for kind, key, opponent, delta, data in rows:
+            record = json.loads(data)
+            ident = (kind, key, opponent)
+            if delta and ident in folded:
+                _merge_delta(folded[ident], record)
+            else:
+                folded[ident] = record
+        return folded
+
+    def load(self, opponent):
+        """Merged records for one opponent as {kind: {key: record}}"""
+        rows = self.db.execute("""
+            SELECT kind, key, opponent, delta, data FROM records WHERE opponent = ? ORDER BY seq
+        """, (opponent,)).fetchall()
+        out = defaultdict(dict)
+        for (kind, key, opp), record in self._fold(rows).items():
+            out[kind][key] = record
+            self.baseline[(kind, key, opp)] = json.loads(json.dumps(record))
+        return out
+
+    def append(self, opponent, records):
+        """Append this game's delta for every record that changed since the last save"""
+        rows, seen = [], {}
+        for kind, items in records.items():
+            for key, record in items.items():
+                record = json.loads(json.dumps(record))
+                ident = (kind, str(key), opponent)
+                delta = _record_delta(record, self.baseline.get(ident, {}))
+                if delta is not None:
+                    rows.append((kind, str(key), opponent, 1, json.dumps(delta, sort_keys=True)))
+                    seen[ident] = record
+        if rows:
+            with self._transaction():
+                self.db.executemany('INSERT INTO records (kind, key, opponent, delta, data) '
+                                    'VALUES (?, ?, ?, ?, ?)', rows)
+            self.baseline.update(seen)
+        return len(rows)
+
+    def compact(self, force=False):
+        """Fold each key's rows into one full row when history outgrows the live set"""
+        total, live = self.db.execute("""
+            SELECT COUNT(*), (SELECT COUNT(*) FROM (SELECT 1 FROM records GROUP BY kind, key, opponent))
+            FROM records
+        """).fetchone()
+        if not force and total <= live * self.COMPACT_RATIO:
+            return 0
+        with self._transaction():
+            rows = self.db.execute('SELECT kind, key, opponent, delta, data FROM records ORDER BY seq').fetchall()
+            self.db.execute('DELETE FROM records')
+            self.db.executemany('INSERT INTO records (kind, key, opponent, delta, data) VALUES (?, ?, ?, 0, ?)',
+                                [(kind, key, opp, json.dumps(record, sort_keys=True))
+                                 for (kind, key, opp), record in self._fold(rows).items()])
+        return total - live
+
+    def migrate_json(self, path, opponent):
+        """One-time import of the legacy JSON memory file"""
+        if self._migrated() or not os.path.exists(path):
+            return False
+        with open(path, 'r') as f:
+            data = json.load(f)
+        with self._transaction():
+            if self._migrated():  # another writer got here first
+                return False
+            self.db.executemany('INSERT INTO records (kind, key, opponent, delta, data) VALUES (?, ?, ?, 0, ?)',
+                                [(kind, str(key), opponent, json.dumps(record, sort_keys=True))
+                                 for kind in ('attack_history', 'breach_analytics')
+                                 for key, record in data.get(kind, {}).items()])
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_json', ?)", (path,))
+        return True
+
+    def _migrated(self):
+        return self.db.execute("SELECT value FROM meta WHERE name = 'migrated_json'").fetchone() is not None
+
+    def close(self):
         try:
-            for x in range(width):
-                for y in range(height // 2, height):
-                    if game_state.contains_stationary_unit([x, y]):
-                        for u in game_state.game_map[[x, y]]:
-                            if getattr(u, 'player_index', None) == 1 and getattr(u, 'unit_type', None) == TURRET:
-                                # Weight by upgrade status
-                                density[x] += (2 if getattr(u, 'upgraded', False) else 1)
-        except Exception:
-            pass
-        
-        return density
+            self.compact()
+        finally:
+            self.db.close()
 
-    def estimate_path_danger(self, game_state, unit_type='scout'):
-        """Returns scalar danger estimate: higher = more dangerous"""
+
+class MemoryWriter:
+    """Write-behind saver for strategy memory.
+    
+    The turn thread submits snapshots; one daemon thread writes them.
+    Requests that arrive while a write is running coalesce into the newest
+    snapshot, so at most one save is in flight and one is queued.
+    """
+
+    def __init__(self, write, log):
+        self._write = write
+        self.log = log
+        self._cond = threading.Condition()
+        self._pending = None
+        self._busy = False
+        self._closed = False
+        self.writes = 0
+        self.coalesced = 0
+        self._thread = threading.Thread(target=self._run, name='memory-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot):
+        """Queue snapshot, replacing any save that has not started yet"""
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = snapshot
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until every submitted snapshot is on disk"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def close(self, timeout=10.0):
+        """Finish outstanding saves and stop the thread"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                snapshot, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self._write(snapshot)
+                self.writes += 1
+            except Exception as e:
+                self.log.error('[MEM] Background save failed: {}', e)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+
+class GameRecorder:
+    """Captures the config and every raw turn_state of a game as JSON lines.
+    
+    Enabled with recordPath / ALGO_RECORD (a file, or a directory that
+    gets one file per game); replay_bench.py replays the recordings.
+    """
+
+    def __init__(self, path):
+        if os.path.isdir(path):
+            path = os.path.join(path, f'game_{time.strftime("%Y%m%d_%H%M%S")}_{os.getpid()}.jsonl')
+        self.path = path
+        self.file = open(path, 'w')
+
+    def _write(self, entry):
+        self.file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self.file.flush()
+
+    def record_config(self, config):
+        self._write({'type': 'config', 'config': config})
+
+    def record_turn(self, turn_state):
+        state = turn_state if isinstance(turn_state, str) else json.dumps(turn_state)
+        self._write({'type': 'turn', 'state': state})
+
+    def close(self):
+        self.file.close()
+
+
+# ═══════════════════════════════════════════════════════════════
+# TURN SCHEDULER
+# ═══════════════════════════════════════════════════════════════
+
+class TurnScheduler:
+    """Wall-clock budget for the stages of one on_turn call.
+    
+    Every stage gets a share of the turn budget. A non-essential stage is
+    skipped when the time left cannot cover its recent cost. Anytime loops
+    poll expired() and keep their best result so far, and time_left()
+    caps blocking waits such as rollout collection.
+    """
+
+    SHARES = {'heatmap': 0.10, 'analysis': 0.15, 'execution': 0.55, 'record': 0.05, 'save': 0.10}
+
+    def __init__(self, budget=2.0, reserve=None, shares=None, timings=None):
+        self.budget = budget
+        self.timings = timings
+        self.reserve = budget * 0.1 if reserve is None else reserve
+        self.shares = dict(self.SHARES, **(shares or {}))
+        self.cost = {}  # EMA of each stage's duration, seconds
+        self.skipped = []
+        self.started = time.monotonic()
+        self.stage_end = float('inf')
+
+    def begin(self):
+        """Start the clock for a new turn"""
+        self.started = time.monotonic()
+        self.stage_end = float('inf')
+        self.skipped = []
+
+    def remaining(self):
+        """Seconds left before the turn must be submitted"""
+        return self.budget - self.reserve - (time.monotonic() - self.started)
+
+    def time_left(self):
+        """Seconds left in the current stage"""
+        return max(0.0, min(self.stage_end - time.monotonic(), self.remaining()))
+
+    def expired(self):
+        return self.time_left() <= 0.0
+
+    def run(self, name, fn, *args, essential=False):
+        """Run one stage within its budget; returns None when skipped"""
+        left = self.remaining()
+        if not essential and left < self.cost.get(name, 0.0):
+            self.skipped.append(name)
+            return None
+        
+        start = time.monotonic()
+        outer = self.stage_end
+        self.stage_end = min(outer, start + max(0.0, min(left, self.budget * self.shares.get(name, 0.1))))
         try:
-            if isinstance(self.heatmap, dict) and len(self.heatmap) > 0:
-                # Check if heatmap is per-coordinate or per-column
-                if all(isinstance(k, tuple) for k in self.heatmap.keys()):
-                    # Per-coord heatmap
-                    vals = []
-                    for (x, y), v in self.heatmap.items():
-                        if x in self.s.preferred_columns:
-                            vals.append(v)
-                    return sum(vals) / max(1, len(vals))
-                else:
-                    # Per-column density
-                    density = sum(self.heatmap.get(c, 0) for c in self.s.preferred_columns)
-                    
-                    # Unit modifiers
-                    if unit_type == 'scout':
-                        return density
-                    elif unit_type == 'demolisher':
-                        return density * 0.5
-                    elif unit_type == 'interceptor':
-                        return density * 0.2
-                    
-                    return density
+            return fn(*args)
+        finally:
+            spent = time.monotonic() - start
+            self.cost[name] = spent if name not in self.cost else 0.7 * self.cost[name] + 0.3 * spent
+            if self.timings is not None:
+                self.timings.add('stage.' + name, spent)
+            self.stage_end = outer
+
+
+# ═══════════════════════════════════════════════════════════════
+# BOARD INDEX
+# ═══════════════════════════════════════════════════════════════
+
+WALL_CODE, SUPPORT_CODE, TURRET_CODE = 0, 1, 2
+SCOUT_CODE, DEMOLISHER_CODE, INTERCEPTOR_CODE = 3, 4, 5
+
+
+REMOVE_INDEX = 6  # Position of the removal list in p1Units/p2Units
+UPGRADE_INDEX = 7  # Position of the upgrade list in p1Units/p2Units
+
+
+def _structure_codes():
+    """Map structure shorthands to compact integer codes"""
+    return {WALL: WALL_CODE, SUPPORT: SUPPORT_CODE, TURRET: TURRET_CODE}
+
+
+_UNIT_DEFAULTS = {
+    WALL_CODE: {'startHealth': 60, 'cost1': 1, 'upgrade': {'startHealth': 120}},
+    SUPPORT_CODE: {'startHealth': 30, 'cost1': 4, 'shieldPerUnit': 3, 'shieldRange': 3.5,
+                   'upgrade': {'shieldPerUnit': 4, 'shieldRange': 7}},
+    TURRET_CODE: {'startHealth': 75, 'cost1': 2, 'attackDamageWalker': 6, 'attackRange': 2.5,
+                  'upgrade': {'attackDamageWalker': 16, 'attackRange': 3.5}},
+    SCOUT_CODE: {'startHealth': 15, 'cost2': 1, 'speed': 1, 'attackDamageWalker': 2,
+                 'attackDamageTower': 2, 'attackRange': 3.5},
+    DEMOLISHER_CODE: {'startHealth': 5, 'cost2': 3, 'speed': 0.5, 'attackDamageWalker': 8,
+                      'attackDamageTower': 8, 'attackRange': 4.5},
+    INTERCEPTOR_CODE: {'startHealth': 40, 'cost2': 1, 'speed': 0.25, 'attackDamageWalker': 20,
+                       'attackDamageTower': 0, 'attackRange': 4.5},
+}
+
+_UNIT_FIELDS = {
+    'hp': 'startHealth', 'damage': 'attackDamageWalker', 'tower_damage': 'attackDamageTower',
+    'range': 'attackRange', 'shield': 'shieldPerUnit', 'shield_range': 'shieldRange',
+    'speed': 'speed', 'sp_cost': 'cost1', 'mp_cost': 'cost2'
+}
+
+
+def _unit_specs(config):
+    """Base and upgraded stats per unit code, from unitInformation with defaults"""
+    info = config.get('unitInformation', []) if isinstance(config, dict) else []
+    specs = {}
+    for code, defaults in _UNIT_DEFAULTS.items():
+        unit = dict(defaults)
+        if code < len(info):
+            unit.update(info[code])
+        upgrade = dict(unit)
+        upgrade.update(unit.get('upgrade') or {})
+        spec = {}
+        for key, field in _UNIT_FIELDS.items():
+            spec[key] = float(unit.get(field, 0) or 0)
+            spec['upgraded_' + key] = float(upgrade.get(field, 0) or 0)
+        specs[code] = spec
+    return specs
+
+
+_DEFAULT_SPECS = {}
+
+
+def _default_specs():
+    """Unit specs from the built-in defaults, for callers without a config"""
+    if not _DEFAULT_SPECS:
+        _DEFAULT_SPECS.update(_unit_specs({}))
+    return _DEFAULT_SPECS
+
+
+def _pack_bits(mask):
+    """Int bitboard of a boolean [x, y] array: bit x * height + y is cell (x, y)"""
+    flat = np.ascontiguousarray(mask, dtype=bool).ravel()
+    return int.from_bytes(np.packbits(flat, bitorder='little').tobytes(), 'little')
+
+
+# int.bit_count is Python 3.10+
+_popcount = getattr(int, 'bit_count', None) or (lambda bits: bin(bits).count('1'))
+
+
+class UnitRecord:
+    """One structure with every field present; built once per turn by BoardIndex.records.
+    range is the attack range, or the shield range for supports"""
+
+    __slots__ = ('owner', 'code', 'unit_type', 'x', 'y', 'hp', 'max_hp', 'upgraded', 'damage', 'range', 'shield')
+
+    def __init__(self, owner, code, unit_type, x, y, hp, max_hp, upgraded, damage, range, shield):
+        self.owner = owner
+        self.code = code
+        self.unit_type = unit_type
+        self.x = x
+        self.y = y
+        self.hp = hp
+        self.max_hp = max_hp
+        self.upgraded = upgraded
+        self.damage = damage
+        self.range = range
+        self.shield = shield
+
+
+ZOBRIST_SEED = 0x7E5A1
+_ZOBRIST = {}
+
+
+def _zobrist_keys(width, height):
+    """Random 64-bit keys, fixed per map size: (per cell, per [owner, code, upgraded, cell])"""
+    keys = _ZOBRIST.get((width, height))
+    if keys is None:
+        rng = np.random.default_rng(ZOBRIST_SEED)
+        top = np.iinfo(np.uint64).max
+        cells = rng.integers(0, top, size=width * height, dtype=np.uint64, endpoint=True)
+        units = rng.integers(0, top, size=(2, 3, 2, width * height), dtype=np.uint64, endpoint=True)
+        keys = _ZOBRIST[(width, height)] = (cells, units)
+    return keys
+
+
+def _layout_hash(blocked):
+    """Zobrist hash of a blocked-cell [x, y] mask, as BoardHash.layout"""
+    cells = _zobrist_keys(*blocked.shape)[0]
+    return int(np.bitwise_xor.reduce(cells[blocked.ravel()]))
+
+
+class BoardHash:
+    """Zobrist hashes of a board, toggled one structure at a time.
+    
+    layout covers which cells are occupied (all pathing sees), structures
+    adds owner, type and upgrade per cell (all damage fields see), and
+    state adds hp (all a simulation sees). Placing and removing a
+    structure are the same XOR, so BoardTracker keeps them current from
+    board events instead of rehashing the board.
+    """
+
+    __slots__ = ('width', 'height', 'layout', 'structures', 'state')
+
+    def __init__(self, width=28, height=28, layout=0, structures=0, state=0):
+        self.width = width
+        self.height = height
+        self.layout = layout
+        self.structures = structures
+        self.state = state
+
+    @classmethod
+    def of(cls, board):
+        hashes = cls(board.width, board.height)
+        for record in board.records():
+            hashes.toggle(record)
+        return hashes
+
+    def copy(self):
+        return BoardHash(self.width, self.height, self.layout, self.structures, self.state)
+
+    def toggle(self, record):
+        """XOR a structure's UnitRecord in or out"""
+        cells, units = _zobrist_keys(self.width, self.height)
+        c = record.x * self.height + record.y
+        unit = int(units[record.owner, record.code, int(record.upgraded), c])
+        self.layout ^= int(cells[c])
+        self.structures ^= unit
+        self.state ^= hash((unit, record.hp))
+
+
+class TranspositionCache:
+    """LRU of results keyed by board hash; outlives the per-turn caches"""
+
+    def __init__(self, size=256):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Cached value for key, or None"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return value
+
+
+class BoardIndex:
+    """Columnar per-turn snapshot of every structure on the board.
+    
+    Built once per turn in a single pass over the units; every analyzer
+    reads these arrays instead of probing game_state cell by cell.
+    Arrays are indexed [x, y]; empty cells have owner/unit_type -1.
+    """
+
+    def __init__(self, width=28, height=28):
+        self.width = width
+        self.height = height
+        shape = (width, height)
+        self.owner = np.full(shape, -1, dtype=np.int8)
+        self.unit_type = np.full(shape, -1, dtype=np.int8)
+        self.hp = np.zeros(shape, dtype=np.float32)
+        self.max_hp = np.zeros(shape, dtype=np.float32)
+        self.damage = np.zeros(shape, dtype=np.float32)
+        self.upgraded = np.zeros(shape, dtype=bool)
+        self._records = None  # (specs, [UnitRecord], {(x, y): UnitRecord})
+        self._bitboards = {}  # (player, code) -> int bitboard
+        self._hashes = None  # BoardHash, set by BoardTracker or on first use
+
+    @classmethod
+    def from_game_state(cls, game_state, width=28, height=28):
+        """Index all stationary units held by a gamelib GameState"""
+        board = cls(width, height)
+        codes = _structure_codes()
+        game_map = game_state.game_map
+        for loc in game_map:
+            for unit in game_map[loc]:
+                code = codes.get(unit.unit_type)
+                if code is None:
+                    continue
+                x, y = loc
+                board.owner[x, y] = unit.player_index
+                board.unit_type[x, y] = code
+                board.hp[x, y] = unit.health
+                board.max_hp[x, y] = unit.max_health
+                board.damage[x, y] = unit.damage_i
+                board.upgraded[x, y] = unit.upgraded
+        return board
+
+    @classmethod
+    def from_turn_state(cls, state, specs, width=28, height=28):
+        """Index structures straight from the parsed turn_state JSON"""
+        board = cls(width, height)
+        for player, key in ((0, 'p1Units'), (1, 'p2Units')):
+            groups = state.get(key) or []
+            for code in (WALL_CODE, SUPPORT_CODE, TURRET_CODE):
+                if code >= len(groups) or not groups[code]:
+                    continue
+                units = np.array([u[:3] for u in groups[code]], dtype=np.float32)
+                xs = units[:, 0].astype(np.intp)
+                ys = units[:, 1].astype(np.intp)
+                board.owner[xs, ys] = player
+                board.unit_type[xs, ys] = code
+                board.hp[xs, ys] = units[:, 2]
+                board.max_hp[xs, ys] = specs[code]['hp']
+                board.damage[xs, ys] = specs[code]['damage']
+            
+            if len(groups) > UPGRADE_INDEX and groups[UPGRADE_INDEX]:
+                ups = np.array([u[:2] for u in groups[UPGRADE_INDEX]], dtype=np.intp)
+                xs, ys = ups[:, 0], ups[:, 1]
+                types = board.unit_type[xs, ys]
+                for code in (WALL_CODE, SUPPORT_CODE, TURRET_CODE):
+                    hit = types == code
+                    board.upgraded[xs[hit], ys[hit]] = True
+                    board.max_hp[xs[hit], ys[hit]] = specs[code]['upgraded_hp']
+                    board.damage[xs[hit], ys[hit]] = specs[code]['upgraded_damage']
+        return board
+
+    _BYTE_FIELDS = (('owner', np.int8), ('unit_type', np.int8), ('hp', np.float32),
+                    ('max_hp', np.float32), ('damage', np.float32), ('upgraded', np.bool_))
+
+    def to_bytes(self):
+        """Compact buffer of the board: a width/height header then each array"""
+        header = np.array([self.width, self.height], dtype=np.uint16).tobytes()
+        return header + b''.join(np.ascontiguousarray(getattr(self, name)).tobytes()
+                                 for name, _ in self._BYTE_FIELDS)
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """Rebuild a board from to_bytes output"""
+        width, height = np.frombuffer(blob, dtype=np.uint16, count=2).tolist()
+        board = cls(width, height)
+        offset, cells = 4, width * height
+        for name, dtype in cls._BYTE_FIELDS:
+            size = cells * np.dtype(dtype).itemsize
+            array = np.frombuffer(blob, dtype=dtype, count=cells, offset=offset)
+            setattr(board, name, array.reshape(width, height).copy())
+            offset += size
+        return board
+
+    def diff(self, previous):
+        """Structure events relative to an earlier board index
+        
+        Returns (kind, player, code, x, y) tuples with kind one of
+        'added', 'removed', 'damaged' or 'upgraded'. A cell whose occupant
+        changed owner or type, or was evidently rebuilt (lost its upgrade
+        or regained health), yields a removal followed by an addition.
+        """
+        occupied = self.owner >= 0
+        was_occupied = previous.owner >= 0
+        same = occupied & was_occupied & (self.owner == previous.owner) & (self.unit_type == previous.unit_type)
+        rebuilt = (previous.upgraded & ~self.upgraded) | ((self.hp > previous.hp) & (self.upgraded == previous.upgraded))
+        same &= ~rebuilt
+        
+        events = []
+        for x, y in zip(*np.nonzero(was_occupied & ~same)):
+            events.append(('removed', int(previous.owner[x, y]), int(previous.unit_type[x, y]), int(x), int(y)))
+        for x, y in zip(*np.nonzero(occupied & ~same)):
+            events.append(('added', int(self.owner[x, y]), int(self.unit_type[x, y]), int(x), int(y)))
+        for x, y in zip(*np.nonzero(same & self.upgraded & ~previous.upgraded)):
+            events.append(('upgraded', int(self.owner[x, y]), int(self.unit_type[x, y]), int(x), int(y)))
+        for x, y in zip(*np.nonzero(same & (self.hp < previous.hp))):
+            events.append(('damaged', int(self.owner[x, y]), int(self.unit_type[x, y]), int(x), int(y)))
+        return events
+
+    def player_mask(self, player, code=None):
+        """Boolean mask of cells holding the player's structures on their half"""
+        mask = self.owner == player
+        half = self.height // 2
+        if player == 1:
+            mask[:, :half] = False
+        else:
+            mask[:, half:] = False
+        if code is not None:
+            mask &= self.unit_type == code
+        return mask
+
+    def bitboard(self, player=None, code=None):
+        """Int bitboard of the cells player_mask selects; player None means every structure"""
+        key = (player, code)
+        bits = self._bitboards.get(key)
+        if bits is None:
+            if player is None:
+                mask = self.owner >= 0
+                if code is not None:
+                    mask &= self.unit_type == code
+            else:
+                mask = self.player_mask(player, code)
+            bits = self._bitboards[key] = _pack_bits(mask)
+        return bits
+
+    def hashes(self):
+        """This board's BoardHash"""
+        if self._hashes is None:
+            self._hashes = BoardHash.of(self)
+        return self._hashes
+
+    def column_counts(self, player, unit_type=None, weighted=False):
+        """Per-column structure counts, optionally weighting upgrades x2"""
+        code = None if unit_type is None else _structure_codes()[unit_type]
+        mask = self.player_mask(player, code)
+        if weighted:
+            return (np.where(self.upgraded, 2, 1) * mask).sum(axis=1)
+        return mask.sum(axis=1)
+
+    def records(self, specs=None):
+        """UnitRecord per structure in (x, y) order, built on first use and cached"""
+        if self._records is not None and (specs is None or self._records[0] is specs):
+            return self._records[1]
+        specs = specs or _default_specs()
+        shorthand = {code: name for name, code in _structure_codes().items()}
+        xs, ys = np.nonzero(self.owner >= 0)
+        columns = zip(xs.tolist(), ys.tolist(), self.owner[xs, ys].tolist(), self.unit_type[xs, ys].tolist(),
+                      self.hp[xs, ys].tolist(), self.max_hp[xs, ys].tolist(),
+                      self.upgraded[xs, ys].tolist(), self.damage[xs, ys].tolist())
+        records = []
+        for x, y, owner, code, hp, max_hp, upgraded, damage in columns:
+            spec = specs[code]
+            prefix = 'upgraded_' if upgraded else ''
+            reach = spec[prefix + ('shield_range' if code == SUPPORT_CODE else 'range')]
+            records.append(UnitRecord(owner, code, shorthand.get(code), x, y, hp, max_hp, upgraded,
+                                      damage, reach, spec[prefix + 'shield']))
+        self._records = (specs, records, {(r.x, r.y): r for r in records})
+        return records
+
+    def record_map(self, specs=None):
+        """{(x, y): UnitRecord} over the same cached records"""
+        self.records(specs)
+        return self._records[2]
+
+    def damaged_structures(self, player, max_health_pct, unit_types):
+        """Yield (x, y, unit_type) for structures below a health fraction"""
+        codes = _structure_codes()
+        wanted = [codes[t] for t in unit_types if t in codes]
+        shorthand = {code: name for name, code in codes.items()}
+        own_half = np.arange(self.height) < self.height // 2
+        if player != 0:
+            own_half = ~own_half
+        weak = self.hp < max_health_pct * np.maximum(self.max_hp, 1.0)
+        mask = (self.owner == player) & np.isin(self.unit_type, wanted) & own_half[None, :] & weak
+        xs, ys = np.nonzero(mask)
+        for x, y, code in zip(xs.tolist(), ys.tolist(), self.unit_type[xs, ys].tolist()):
+            yield x, y, shorthand[code]
+
+    def summary(self, player):
+        """Structure totals, ratios and positions for one player"""
+        mask = self.player_mask(player)
+        upgraded = mask & self.upgraded
+        turrets = self.player_mask(player, TURRET_CODE)
+        ys = np.nonzero(mask)[1]
+        
+        total = int(mask.sum())
+        health = float(self.hp[mask].sum())
+        max_health = float(self.max_hp[mask].sum())
+        upgraded_count = int(upgraded.sum())
+        firepower = float((self.damage[turrets] * np.where(self.upgraded[turrets], 2, 1)).sum())
+        
+        positions = {}
+        for key, code in (('turrets', TURRET_CODE), ('walls', WALL_CODE), ('supports', SUPPORT_CODE)):
+            xs, cys = np.nonzero(self.player_mask(player, code))
+            positions[key] = [(int(x), int(y), bool(self.upgraded[x, y])) for x, y in zip(xs, cys)]
+        
+        return {
+            'total': total,
+            'health': health,
+            'max_health': max_health,
+            'upgraded': upgraded_count,
+            'turrets': len(positions['turrets']),
+            'walls': len(positions['walls']),
+            'supports': len(positions['supports']),
+            'firepower': firepower,
+            'back': int((ys >= 12).sum()),
+            'mid': int(((ys >= 10) & (ys < 12)).sum()),
+            'front': int((ys < 10).sum()),
+            'health_pct': health / max_health if max_health > 0 else 1.0,
+            'upgrade_ratio': upgraded_count / total if total > 0 else 0.0,
+            'density': total / 28.0 if total > 0 else 0.0,
+            'positions': positions
+        }
+
+
+class StructureAggregates:
+    """Running structure totals for one player, updated per board event"""
+
+    def __init__(self, width=28):
+        self.width = width
+        self.counts = defaultdict(int)
+        self.health = 0.0
+        self.max_health = 0.0
+        self.firepower = 0.0
+        self.positions = {TURRET_CODE: {}, WALL_CODE: {}, SUPPORT_CODE: {}}
+
+    def apply(self, record, sign):
+        """Add (sign=1) or remove (sign=-1) a structure's UnitRecord"""
+        code, x, y, upgraded = record.code, record.x, record.y, record.upgraded
+        weight = 2 if upgraded else 1
+        
+        self.counts['total'] += sign
+        self.counts['upgraded'] += sign * upgraded
+        self.health += sign * record.hp
+        self.max_health += sign * record.max_hp
+        
+        if y >= 12:
+            self.counts['back'] += sign
+        elif y >= 10:
+            self.counts['mid'] += sign
+        else:
+            self.counts['front'] += sign
+        
+        if code == TURRET_CODE:
+            self.firepower += sign * record.damage * weight
+        
+        if sign > 0:
+            self.positions[code][(x, y)] = upgraded
+        else:
+            self.positions[code].pop((x, y), None)
+
+    def summary(self):
+        """Structure totals, ratios and positions in _analyze_structures form"""
+        total = self.counts['total']
+        positions = {
+            key: [(x, y, up) for (x, y), up in sorted(self.positions[code].items())]
+            for key, code in (('turrets', TURRET_CODE), ('walls', WALL_CODE), ('supports', SUPPORT_CODE))
+        }
+        return {
+            'total': total,
+            'health': self.health,
+            'max_health': self.max_health,
+            'upgraded': self.counts['upgraded'],
+            'turrets': len(positions['turrets']),
+            'walls': len(positions['walls']),
+            'supports': len(positions['supports']),
+            'firepower': self.firepower,
+            'back': self.counts['back'],
+            'mid': self.counts['mid'],
+            'front': self.counts['front'],
+            'health_pct': self.health / self.max_health if self.max_health > 0 else 1.0,
+            'upgrade_ratio': self.counts['upgraded'] / total if total > 0 else 0.0,
+            'density': total / 28.0 if total > 0 else 0.0,
+            'positions': positions
+        }
+
+
+class BoardTracker:
+    """Diffs consecutive board indexes and keeps aggregates current in O(changes)"""
+
+    def __init__(self, width=28, height=28, specs=None):
+        self.width = width
+        self.height = height
+        self.specs = specs  # the strategy's unit specs, so records are built once per board
+        self.previous = None
+        self.aggregates = {0: StructureAggregates(width), 1: StructureAggregates(width)}
+
+    def update(self, board):
+        """Apply the diff against last turn's board and return its events"""
+        previous = self.previous if self.previous is not None else BoardIndex(board.width, board.height)
+        events = board.diff(previous)
+        before, after = previous.record_map(self.specs), board.record_map(self.specs)
+        hashes = previous.hashes().copy()
+        refreshed = set()
+        for kind, player, code, x, y in events:
+            if kind == 'removed':
+                changes = ((before[x, y], -1),)
+            elif kind == 'added':
+                changes = ((after[x, y], 1),)
+            elif (x, y) not in refreshed:
+                # Damaged and/or upgraded in place: swap old values for new
+                refreshed.add((x, y))
+                changes = ((before[x, y], -1), (after[x, y], 1))
+            else:
+                continue
+            aggregates = self.aggregates.get(player)
+            for record, sign in changes:
+                hashes.toggle(record)
+                if aggregates is not None:
+                    aggregates.apply(record, sign)
+        if board._hashes is None:
+            board._hashes = hashes
+        self.previous = board
+        return events
+
+
+class RegionSums:
+    """Summed-area tables over one turn's board for O(1) region queries.
+    
+    Holds a 2D prefix sum per (player, channel): 'count' of structures,
+    their 'hp', 'turrets' (upgraded ones count twice) and turret
+    'firepower' (damage, upgrades doubled, as in BoardIndex.summary).
+    add() layers any other per-cell array, such as the enemy damage field
+    under (1, 'danger'). Rectangle bounds are inclusive and clipped to
+    the board.
+    """
+
+    def __init__(self, board):
+        self.width = board.width
+        self.height = board.height
+        self._tables = {}
+        weight = np.where(board.upgraded, 2, 1)
+        for player in (0, 1):
+            mask = board.player_mask(player)
+            turrets = board.player_mask(player, TURRET_CODE)
+            self.add((player, 'count'), mask.astype(np.int64))
+            self.add((player, 'hp'), board.hp * mask)
+            self.add((player, 'turrets'), weight * turrets)
+            self.add((player, 'firepower'), board.damage * weight * turrets)
+
+    def add(self, key, values):
+        """Store the prefix sum of a [x, y] array under key"""
+        values = np.asarray(values)
+        dtype = np.int64 if values.dtype.kind in 'biu' else np.float64
+        table = np.zeros((self.width + 1, self.height + 1), dtype=dtype)
+        np.cumsum(np.cumsum(values, axis=0, dtype=dtype), axis=1, out=table[1:, 1:])
+        self._tables[key] = table
+
+    def __contains__(self, key):
+        return key in self._tables
+
+    def rect(self, key, x0, y0, x1, y1):
+        """Sum of key over cells x0..x1, y0..y1"""
+        x0, y0 = max(int(x0), 0), max(int(y0), 0)
+        x1, y1 = min(int(x1), self.width - 1), min(int(y1), self.height - 1)
+        if x0 > x1 or y0 > y1:
+            return 0
+        t = self._tables[key]
+        return (t[x1 + 1, y1 + 1] - t[x0, y1 + 1] - t[x1 + 1, y0] + t[x0, y0]).item()
+
+    def band(self, key, x0, x1):
+        """Sum of key over the full-height columns x0..x1"""
+        return self.rect(key, x0, 0, x1, self.height - 1)
+
+    def columns(self, key):
+        """Per-column totals of key"""
+        t = self._tables[key]
+        return t[1:, -1] - t[:-1, -1]
+
+
+_MOBILE_CODES = {'scout': SCOUT_CODE, 'demolisher': DEMOLISHER_CODE, 'interceptor': INTERCEPTOR_CODE}
+
+
+_RANGE_OFFSETS = {}
+
+
+def _range_offsets(attack_range):
+    """(dx, dy) arrays of every cell within attack_range of the origin"""
+    key = round(float(attack_range), 3)
+    if key not in _RANGE_OFFSETS:
+        reach = key + 0.51
+        r = int(math.ceil(reach))
+        dx, dy = np.mgrid[-r:r + 1, -r:r + 1]
+        keep = dx * dx + dy * dy < reach * reach
+        _RANGE_OFFSETS[key] = (dx[keep], dy[keep])
+    return _RANGE_OFFSETS[key]
+
+
+def _unit_codes():
+    """Map every unit shorthand to its integer code"""
+    return {WALL: WALL_CODE, SUPPORT: SUPPORT_CODE, TURRET: TURRET_CODE,
+            SCOUT: SCOUT_CODE, DEMOLISHER: DEMOLISHER_CODE, INTERCEPTOR: INTERCEPTOR_CODE}
+
+
+class DamageField:
+    """Per-cell turret damage per frame, accumulated with precomputed range masks.
+    
+    A cell is in range of a turret when its distance is below range + 0.51,
+    matching gamelib's get_locations_in_range.
+    """
+
+    def __init__(self, width=28, height=28, geometry=None):
+        self.width = width
+        self.height = height
+        self.geometry = geometry or MapGeometry.get(width, height)
+
+    def offsets(self, attack_range):
+        """(dx, dy) arrays of every cell within attack_range of the origin"""
+        return _range_offsets(attack_range)
+
+    def build(self, board, player, specs):
+        """Damage per frame that player's turrets deal to mobile units at each cell"""
+        w, h = self.width, self.height
+        xs, ys = np.nonzero(board.player_mask(player, TURRET_CODE))
+        field = np.zeros(w * h, dtype=np.float64)
+        if len(xs) == 0:
+            return field.reshape(w, h)
+        
+        spec = specs[TURRET_CODE]
+        ranges = np.where(board.upgraded[xs, ys], spec['upgraded_range'], spec['range'])
+        damage = board.damage[xs, ys]
+        for attack_range in np.unique(ranges):
+            sel = ranges == attack_range
+            cells, counts = self.geometry.gather(xs[sel], ys[sel], attack_range)
+            field += np.bincount(cells, weights=np.repeat(damage[sel], counts), minlength=w * h)
+        return field.reshape(w, h)
+
+
+class ExpectedDamageTable:
+    """Per-turn lookup of attack outcomes for every spawn cell, unit type and count.
+    
+    For each of our edge spawn cells and each mobile unit type, damage is
+    integrated along the cell's real path (turret damage per frame times
+    frames spent per cell), support shields picked up on the way are added
+    to unit health, and the expected survivors, breaches and structure
+    damage are tabulated for every count from 0 to what our MP affords.
+    Stacks are scored independently, so plan totals are optimistic when
+    several stacks share turret fire.
+    """
+
+    CODES = (SCOUT_CODE, DEMOLISHER_CODE, INTERCEPTOR_CODE)
+
+    def __init__(self, cells, max_count):
+        self.cells = cells
+        self.index = {cell: i for i, cell in enumerate(cells)}
+        self.max_count = max_count
+        shape = (len(cells), len(self.CODES), max_count + 1)
+        self.survivors = np.zeros(shape)
+        self.breaches = np.zeros(shape)
+        self.structure_damage = np.zeros(shape)
+        self.kills = np.zeros(shape[:2])
+        self.valid = np.zeros(len(cells), dtype=bool)
+
+    @classmethod
+    def build(cls, board, specs, field, paths, mp, geometry=None):
+        """Vectorized table build from the damage field and spawn paths"""
+        geometry = geometry or MapGeometry.get(board.width, board.height)
+        cells = sorted(paths)
+        costs = [specs[code]['mp_cost'] or 1.0 for code in cls.CODES]
+        table = cls(cells, int(max(0, mp) // min(costs)))
+        if not cells:
+            return table
+        
+        h = board.height
+        live = [paths[c] for c in cells]
+        table.valid[:] = [p is not None for p in live]
+        lengths = np.array([len(p.flat) if p is not None else 0 for p in live])
+        width = max(1, int(lengths.max()))
+        flat = np.zeros((len(cells), width), dtype=np.intp)
+        mask = np.arange(width)[None, :] < lengths[:, None]
+        for i, p in enumerate(live):
+            if p is not None:
+                flat[i, :len(p.flat)] = p.flat
+        reached = np.array([p is not None and p.reached for p in live])
+        
+        # Damage taken per cell of path, and shields from our supports en route
+        field_damage = (field.ravel()[flat] * mask).sum(axis=1)
+        shields = np.zeros(len(cells))
+        for r in board.records(specs):
+            if r.owner != 0 or r.code != SUPPORT_CODE or r.y >= h // 2:
+                continue
+            cover = np.zeros(board.width * h, dtype=bool)
+            cover[geometry.in_range(r.x, r.y, r.range)] = True
+            touched = (cover[flat] & mask).any(axis=1)
+            shields += touched * r.shield
+        
+        # Frames with an enemy structure inside each unit type's reach
+        enemy = board.player_mask(1)
+        counts = np.arange(table.max_count + 1)
+        for t, code in enumerate(cls.CODES):
+            spec = specs[code]
+            frames_per_cell = 1.0 / (spec['speed'] or 1.0)
+            hp = spec['hp'] + shields
+            taken = field_damage * frames_per_cell
+            kills = np.floor(taken / np.maximum(hp, 1e-6))
+            table.kills[:, t] = kills
+            survivors = np.clip(counts[None, :] - kills[:, None], 0, None)
+            table.survivors[:, t] = survivors
+            table.breaches[:, t] = survivors * reached[:, None]
+            
+            if spec['tower_damage'] > 0:
+                reach = geometry.reach_mask(enemy, spec['range'])
+                exposure = (reach.ravel()[flat] & mask).sum(axis=1) * frames_per_cell
+                average_alive = (counts[None, :] + survivors) / 2.0
+                table.structure_damage[:, t] = exposure[:, None] * average_alive * spec['tower_damage']
+        
+        table.survivors[~table.valid] = 0
+        table.breaches[~table.valid] = 0
+        table.structure_damage[~table.valid] = 0
+        return table
+
+    def lookup(self, loc, code, count):
+        """(survivors, breaches, structure damage) for count units of code at loc"""
+        i = self.index.get((int(loc[0]), int(loc[1])))
+        if i is None or not self.valid[i] or code not in self.CODES:
+            return 0.0, 0.0, 0.0
+        t = self.CODES.index(code)
+        n = int(min(max(count, 0), self.max_count))
+        return float(self.survivors[i, t, n]), float(self.breaches[i, t, n]), float(self.structure_damage[i, t, n])
+
+    def value(self, loc, code, count):
+        """Attack score on the SimResult.value scale"""
+        _, breaches, structure = self.lookup(loc, code, count)
+        return 2.0 * breaches + structure / 25.0
+
+    def plan_value(self, plan, codes):
+        """Sum of stack values for a spawn plan"""
+        return sum(self.value(loc, codes.get(unit_type), count) for unit_type, loc, count in plan)
+
+    def expected_losses(self, loc, code):
+        """Units of code expected to die walking the path from loc (inf if unusable)"""
+        i = self.index.get((int(loc[0]), int(loc[1])))
+        if i is None or not self.valid[i] or code not in self.CODES:
+            return float('inf')
+        return float(self.kills[i, self.CODES.index(code)])
+
+    def best_cells(self, code, count, k=1):
+        """The k spawn cells with the highest value for count units of code"""
+        if code not in self.CODES or not self.cells:
+            return []
+        t = self.CODES.index(code)
+        n = int(min(max(count, 0), self.max_count))
+        scores = 2.0 * self.breaches[:, t, n] + self.structure_damage[:, t, n] / 25.0
+        scores = np.where(self.valid, scores, -np.inf)
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [list(self.cells[i]) for i in order if self.valid[i]]
+
+
+class TurnView:
+    """Lightweight game_state built directly from the raw turn_state JSON.
+    
+    Planners read turn info, resources and the board index from here, and
+    spawns, upgrades and removals queue on the view's own build and deploy
+    stacks. The full gamelib.GameState is only constructed when code asks
+    for an API only it provides (game_map, find_path_to_edge, ...).
+    """
+
+    def __init__(self, config, turn_state, specs, width=28, height=28, geometry=None):
+        self.config = config
+        self._raw = turn_state
+        state = json.loads(turn_state) if isinstance(turn_state, (str, bytes)) else turn_state
+        self.state = state
+        self.specs = specs
+        self.geometry = geometry or MapGeometry.get(width, height)
+        
+        turn_info = state.get('turnInfo', [0, 0])
+        self.turn_number = int(turn_info[1])
+        p1 = state.get('p1Stats', [30, 0, 0, 0])
+        p2 = state.get('p2Stats', [30, 0, 0, 0])
+        self.my_health = int(p1[0])
+        self.enemy_health = int(p2[0])
+        self._resources = [[float(p1[1]), float(p1[2])], [float(p2[1]), float(p2[2])]]
+        
+        self.board = BoardIndex.from_turn_state(state, specs, width, height)
+        self._legacy = None
+        self._suppress_warnings = False
+        self.legacy_factory = None
+        self.command_sink = None  # Optional (build, deploy) -> None, replacing send_command
+        
+        # Command queues and what they have changed on the board so far
+        info = config.get('unitInformation', []) if isinstance(config, dict) else []
+        self._shorthands = [unit.get('shorthand') for unit in info]
+        self._upgrade_shorthand = self._shorthand(UPGRADE_INDEX, 'UP')
+        self._remove_shorthand = self._shorthand(REMOVE_INDEX, 'RM')
+        self._build_stack = []
+        self._deploy_stack = []
+        self._structures = self.board.bitboard()
+        self._units = self._structures
+        for key in ('p1Units', 'p2Units'):
+            for group in (state.get(key) or [])[SCOUT_CODE:INTERCEPTOR_CODE + 1]:
+                for unit in group:
+                    self._units |= self.geometry.bit(int(unit[0]), int(unit[1]))
+        self._placed = {}  # (x, y) -> code of our structures placed this turn
+        self._upgraded = set()
+
+    def _shorthand(self, index, default):
+        return self._shorthands[index] if index < len(self._shorthands) else default
+
+    @property
+    def legacy(self):
+        """The full gamelib.GameState, built on first access with this turn's commands replayed"""
+        if self._legacy is None:
+            if self.legacy_factory is not None:
+                legacy = self.legacy_factory(self)
+            else:
+                raw = self._raw if isinstance(self._raw, str) else json.dumps(self._raw)
+                legacy = gamelib.GameState(self.config, raw)
+            legacy.suppress_warnings(True)
+            for unit_type, x, y in self._build_stack:
+                if unit_type == self._upgrade_shorthand:
+                    legacy.attempt_upgrade([x, y])
+                elif unit_type == self._remove_shorthand:
+                    legacy.attempt_remove([x, y])
+                else:
+                    legacy.attempt_spawn(unit_type, [x, y])
+            for unit_type, x, y in self._deploy_stack:
+                legacy.attempt_spawn(unit_type, [x, y])
+            legacy.suppress_warnings(self._suppress_warnings)
+            self._legacy = legacy
+        return self._legacy
+
+    def get_resource(self, resource_type, player_index=0):
+        """Current SP/MP for a player, net of this turn's spending"""
+        if self._legacy is not None:
+            return self._legacy.get_resource(resource_type, player_index)
+        return self._resources[player_index][resource_type]
+
+    def suppress_warnings(self, suppress):
+        self._suppress_warnings = suppress
+        if self._legacy is not None:
+            self._legacy.suppress_warnings(suppress)
+
+    def contains_stationary_unit(self, location):
+        """Whether a structure stands at location, counting this turn's builds"""
+        if self._legacy is not None:
+            return self._legacy.contains_stationary_unit(location)
+        return bool(self._structures & self.geometry.bit(int(location[0]), int(location[1])))
+
+    # ─────────────── Commands (gamelib semantics) ───────────────
+    def number_affordable(self, unit_type):
+        if self._legacy is not None:
+            return self._legacy.number_affordable(unit_type)
+        spec = self.specs[_unit_codes()[unit_type]]
+        sp, mp = self._resources[0]
+        counts = [math.floor(have / cost) for have, cost in
+                  ((sp, spec['sp_cost']), (mp, spec['mp_cost'])) if cost > 0]
+        return min(counts) if counts else 0
+
+    def can_spawn(self, unit_type, location, num=1):
+        if self._legacy is not None:
+            return self._legacy.can_spawn(unit_type, location, num)
+        code = _unit_codes().get(unit_type)
+        cell = self.geometry.bit(int(location[0]), int(location[1]))
+        if code is None or not cell & self.geometry.territory_bits:
+            return False
+        stationary = code <= TURRET_CODE
+        if cell & (self._units if stationary else self._structures):
+            return False
+        if stationary and num != 1:
+            return False
+        if not stationary and not cell & self.geometry.bottom_edge_bits:
+            return False
+        return self.number_affordable(unit_type) >= num
+
+    def attempt_spawn(self, unit_type, locations, num=1):
+        """Queue up to num units at each location; returns how many were queued"""
+        if self._legacy is not None:
+            return self._legacy.attempt_spawn(unit_type, locations, num)
+        if locations and isinstance(locations[0], int):
+            locations = [locations]
+        spawned = 0
+        for location in locations:
+            for _ in range(num):
+                if not self.can_spawn(unit_type, location, 1):
+                    break
+                x, y = int(location[0]), int(location[1])
+                code = _unit_codes()[unit_type]
+                self._resources[0][SP] -= self.specs[code]['sp_cost']
+                self._resources[0][MP] -= self.specs[code]['mp_cost']
+                cell = self.geometry.bit(x, y)
+                self._units |= cell
+                if code <= TURRET_CODE:
+                    self._structures |= cell
+                    self._placed[(x, y)] = code
+                    self._build_stack.append((unit_type, x, y))
+                else:
+                    self._deploy_stack.append((unit_type, x, y))
+                spawned += 1
+        return spawned
+
+    def _our_structure(self, x, y):
+        """Code of our structure at (x, y), or None"""
+        code = self._placed.get((x, y))
+        if code is None and 0 <= x < self.board.width and 0 <= y < self.board.height \
+                and self.board.owner[x, y] == 0:
+            code = int(self.board.unit_type[x, y])
+        return code
+
+    def attempt_upgrade(self, locations):
+        """Queue upgrades of our structures; returns how many were queued"""
+        if self._legacy is not None:
+            return self._legacy.attempt_upgrade(locations)
+        if locations and isinstance(locations[0], int):
+            locations = [locations]
+        upgraded = 0
+        for location in locations:
+            x, y = int(location[0]), int(location[1])
+            code = self._our_structure(x, y)
+            if code is None or (x, y) in self._upgraded or ((x, y) not in self._placed and self.board.upgraded[x, y]):
+                continue
+            spec = self.specs[code]
+            resources = self._resources[0]
+            if resources[SP] >= spec['upgraded_sp_cost'] and resources[MP] >= spec['upgraded_mp_cost']:
+                resources[SP] -= spec['upgraded_sp_cost']
+                resources[MP] -= spec['upgraded_mp_cost']
+                self._upgraded.add((x, y))
+                self._build_stack.append((self._upgrade_shorthand, x, y))
+                upgraded += 1
+        return upgraded
+
+    def attempt_remove(self, locations):
+        """Queue removals of our structures; returns how many were queued"""
+        if self._legacy is not None:
+            return self._legacy.attempt_remove(locations)
+        if locations and isinstance(locations[0], int):
+            locations = [locations]
+        removed = 0
+        for location in locations:
+            x, y = int(location[0]), int(location[1])
+            if self._our_structure(x, y) is not None:
+                self._build_stack.append((self._remove_shorthand, x, y))
+                removed += 1
+        return removed
+
+    def submit_turn(self):
+        """Send the build and deploy stacks, to command_sink when one is set"""
+        source = self._legacy if self._legacy is not None else self
+        if self.command_sink is not None:
+            self.command_sink(list(source._build_stack), list(source._deploy_stack))
+        elif self._legacy is not None:
+            self._legacy.submit_turn()
+        else:
+            gamelib.util.send_command(json.dumps(self._build_stack))
+            gamelib.util.send_command(json.dumps(self._deploy_stack))
+
+    def find_path_to_edge(self, start_location, target_edge=None):
+        return self.legacy.find_path_to_edge(start_location, target_edge)
+
+    def __getattr__(self, name):
+        # Anything else (game_map, get_target, ...)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.legacy, name)
+
+
+# ═══════════════════════════════════════════════════════════════
+# MAP GEOMETRY
+# ═══════════════════════════════════════════════════════════════
+
+GEOMETRY_VERSION = 1
+_GEOMETRY = {}  # in-process memo by map key
+
+
+def _csr_rows(indptr, indices, rows):
+    """Concatenated indices of the given CSR rows, and each row's length"""
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(int(counts.sum()))
+    return indices[offsets], counts
+
+
+class MapGeometry:
+    """Immutable lookup tables for one map, built once per game and cached on disk.
+    
+    Arena, territory, edges and per-range neighbourhoods, as CSR arrays of
+    flat cell indices (x * height + y) and as int bitboards over them.
+    """
+
+    MANHATTAN_RADII = (2,)
+
+    def __init__(self, width=28, height=28, ranges=(), arrays=None):
+        self.width = width
+        self.height = height
+        self.half = height // 2
+        self._ranges = {}
+        self._manhattan = {}
+        if arrays is not None:
+            self.arena = arrays['arena']
+            for name in arrays.files:
+                kind, _, key = name.partition('_')
+                if kind in ('r', 'm') and not key.endswith('indices'):
+                    continue
+                if kind == 'r':
+                    value = float(key[:-len('.indices')])
+                    self._ranges[value] = (arrays[f'r_{value}.indptr'], arrays[name])
+                elif kind == 'm':
+                    radius = int(key[:-len('.indices')])
+                    self._manhattan[radius] = (arrays[f'm_{radius}.indptr'], arrays[name])
+        else:
+            xs, ys = np.meshgrid(np.arange(width), np.arange(height), indexing='ij')
+            half = self.half
+            self.arena = np.where(ys < half, (half - 1 - ys <= xs) & (xs <= half + ys),
+                                  (ys - half <= xs) & (xs <= width - 1 + half - ys))
+        self.arena.setflags(write=False)
+        self.arena_flat = self.arena.ravel().tolist()
+        
+        territory = self.arena.copy()
+        territory[:, self.half:] = False
+        self.territory = frozenset(zip(*(a.tolist() for a in np.nonzero(territory))))
+        self.territory_bits = _pack_bits(territory)
+        self._masks = {}
+        
+        # Neighbor order matches gamelib: up, down, right, left
+        self.neighbors = []
+        for x in range(width):
+            for y in range(height):
+                cells = []
+                for nx, ny in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+                    if 0 <= nx < width and 0 <= ny < height and self.arena_flat[nx * height + ny]:
+                        cells.append((nx * height + ny, nx, ny))
+                self.neighbors.append(tuple(cells))
+        
+        top, half = height - 1, width // 2
+        self.edges = {
+            TOP_RIGHT: [(half + i, top - i) for i in range(half)],
+            TOP_LEFT: [(half - 1 - i, top - i) for i in range(half)],
+            BOTTOM_LEFT: [(half - 1 - i, i) for i in range(half)],
+            BOTTOM_RIGHT: [(half + i, i) for i in range(half)],
+        }
+        # Our spawnable edge cells: bottom-left then bottom-right
+        self.bottom_edges = [list(c) for c in self.edges[BOTTOM_LEFT] + self.edges[BOTTOM_RIGHT]]
+        self.bottom_edge_set = frozenset(self.edges[BOTTOM_LEFT] + self.edges[BOTTOM_RIGHT])
+        self.bottom_edge_bits = 0
+        for x, y in self.bottom_edge_set:
+            self.bottom_edge_bits |= 1 << (x * height + y)
+        
+        for value in ranges:
+            self.range_table(value)
+        for radius in self.MANHATTAN_RADII:
+            self.manhattan_table(radius)
+
+    # ─────────────── Construction / cache ───────────────
+    @staticmethod
+    def key(width, height, ranges):
+        blob = json.dumps([GEOMETRY_VERSION, width, height, sorted(ranges)])
+        return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def config_ranges(specs):
+        """Every positive attack/shield range, base and upgraded, in the unit specs"""
+        ranges = set()
+        for spec in specs.values():
+            for field in ('range', 'upgraded_range', 'shield_range', 'upgraded_shield_range'):
+                if spec.get(field, 0) > 0:
+                    ranges.add(round(float(spec[field]), 3))
+        return sorted(ranges)
+
+    @classmethod
+    def get(cls, width=28, height=28, ranges=(), cache_path=None):
+        """Shared geometry for a map: from the in-process memo, the disk cache, or built"""
+        ranges = sorted(round(float(r), 3) for r in ranges)
+        key = cls.key(width, height, ranges)
+        geometry = _GEOMETRY.get(key)
+        if geometry is not None:
+            return geometry
+        path = cache_path.format(key) if cache_path else None
+        if path and os.path.exists(path):
+            try:
+                with np.load(path) as arrays:
+                    geometry = cls(width, height, arrays=arrays)
+            except Exception:
+                geometry = None
+        if geometry is None:
+            geometry = cls(width, height, ranges)
+            if path:
+                try:
+                    geometry.save(path)
+                except Exception:
+                    pass
+        _GEOMETRY[key] = geometry
+        return geometry
+
+    def save(self, path):
+        arrays = {'arena': self.arena}
+        for value, (indptr, indices) in self._ranges.items():
+            arrays[f'r_{value}.indptr'], arrays[f'r_{value}.indices'] = indptr, indices
+        for radius, (indptr, indices) in self._manhattan.items():
+            arrays[f'm_{radius}.indptr'], arrays[f'm_{radius}.indices'] = indptr, indices
+        with _atomic_open(path, mode='wb') as f:
+            np.savez(f, **arrays)
+
+    def _neighbourhoods(self, dx, dy):
+        """CSR table: row c lists the board cells at c + (dx, dy)"""
+        w, h = self.width, self.height
+        xs, ys = np.meshgrid(np.arange(w), np.arange(h), indexing='ij')
+        cx = xs.ravel()[:, None] + dx[None, :]
+        cy = ys.ravel()[:, None] + dy[None, :]
+        inside = (cx >= 0) & (cx < w) & (cy >= 0) & (cy < h)
+        indptr = np.zeros(w * h + 1, dtype=np.intp)
+        np.cumsum(inside.sum(axis=1), out=indptr[1:])
+        indices = (cx * h + cy)[inside].astype(np.intp)
+        indptr.setflags(write=False)
+        indices.setflags(write=False)
+        return indptr, indices
+
+    # ─────────────── Lookups ───────────────
+    def range_table(self, attack_range):
+        """CSR (indptr, indices) of the cells within attack_range of every cell"""
+        key = round(float(attack_range), 3)
+        table = self._ranges.get(key)
+        if table is None:
+            table = self._ranges[key] = self._neighbourhoods(*_range_offsets(key))
+        return table
+
+    def manhattan_table(self, radius):
+        """CSR (indptr, indices) of the cells within Manhattan distance radius"""
+        table = self._manhattan.get(radius)
+        if table is None:
+            r = int(radius)
+            dx, dy = np.mgrid[-r:r + 1, -r:r + 1]
+            keep = np.abs(dx) + np.abs(dy) <= r
+            table = self._manhattan[radius] = self._neighbourhoods(dx[keep], dy[keep])
+        return table
+
+    def in_range(self, x, y, attack_range):
+        """Flat indices of the cells within attack_range of (x, y)"""
+        indptr, indices = self.range_table(attack_range)
+        c = x * self.height + y
+        return indices[indptr[c]:indptr[c + 1]]
+
+    def near(self, x, y, radius):
+        """Flat indices of the cells within Manhattan radius of (x, y)"""
+        indptr, indices = self.manhattan_table(radius)
+        c = x * self.height + y
+        return indices[indptr[c]:indptr[c + 1]]
+
+    def gather(self, xs, ys, attack_range):
+        """Cells in range of every (x, y), concatenated, with the count per source"""
+        indptr, indices = self.range_table(attack_range)
+        return _csr_rows(indptr, indices, np.asarray(xs, dtype=np.intp) * self.height + np.asarray(ys, dtype=np.intp))
+
+    # ─────────────── Bitboards ───────────────
+    def bit(self, x, y):
+        """Bitboard bit of cell (x, y), or 0 off the board"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return 1 << (x * self.height + y)
+        return 0
+
+    def cells_mask(self, flat):
+        """Bitboard of an array of flat cell indices"""
+        mask = np.zeros(self.width * self.height, dtype=bool)
+        mask[flat] = True
+        return _pack_bits(mask)
+
+    def near_mask(self, x, y, radius):
+        """Bitboard of the cells within Manhattan radius of (x, y)"""
+        masks = self._masks.get(('m', radius))
+        if masks is None:
+            masks = self._masks[('m', radius)] = self._row_masks(*self.manhattan_table(radius))
+        return masks[x * self.height + y]
+
+    def _row_masks(self, indptr, indices):
+        """One bitboard per CSR row"""
+        n = self.width * self.height
+        rows = np.zeros((n, n), dtype=bool)
+        rows[np.repeat(np.arange(n), np.diff(indptr)), indices] = True
+        packed = np.packbits(rows, axis=1, bitorder='little')
+        return [int.from_bytes(row.tobytes(), 'little') for row in packed]
+
+    def reach_mask(self, occupied, attack_range):
+        """Cells from which something in occupied lies within attack_range"""
+        xs, ys = np.nonzero(occupied)
+        reach = np.zeros(self.width * self.height, dtype=bool)
+        if len(xs):
+            reach[self.gather(xs, ys, attack_range)[0]] = True
+        return reach.reshape(self.width, self.height)
+
+
+# ═══════════════════════════════════════════════════════════════
+# SPAWN LEDGER
+# ═══════════════════════════════════════════════════════════════
+
+class SpawnLedger:
+    """Per-turn mirror of our SP/MP, occupied cells and spawn edges.
+    
+    Feasibility checks are bit tests on geometry bitboards; spawns go to
+    gamelib as one attempt_spawn per (unit type, location) with a count.
+    """
+
+    def __init__(self, game_state, board, specs, geometry):
+        self.game_state = game_state
+        self.specs = specs
+        self.codes = _unit_codes()
+        self.territory = geometry.territory_bits
+        self.bit = geometry.bit
+        self.sp = float(game_state.get_resource(SP))
+        self.mp = float(game_state.get_resource(MP))
+        self.occupied = board.bitboard()
+        ours = (board.owner == 0) & ~board.upgraded
+        xs, ys = np.nonzero(ours)
+        self.upgradable = dict(zip(zip(xs.tolist(), ys.tolist()), board.unit_type[ours].tolist()))
+        self.edges = geometry.bottom_edge_bits
+        self.calls = 0  # gamelib spawn/upgrade calls made this turn
+
+    def affordable(self, unit_type):
+        """How many unit_type the remaining SP/MP pay for"""
+        spec = self.specs[self.codes[unit_type]]
+        counts = [math.floor(have / cost + 1e-9) for have, cost in
+                  ((self.sp, spec['sp_cost']), (self.mp, spec['mp_cost'])) if cost > 0]
+        return min(counts) if counts else 0
+
+    def can_spawn(self, unit_type, location, num=1):
+        """Same answer as GameState.can_spawn, from the ledger"""
+        x, y = int(location[0]), int(location[1])
+        code = self.codes.get(unit_type)
+        cell = self.bit(x, y)
+        if code is None or cell & self.occupied or not cell & self.territory:
+            return False
+        if code <= TURRET_CODE:
+            if num != 1:
+                return False
+        elif not cell & self.edges:
+            return False
+        return self.affordable(unit_type) >= num
+
+    def spawn(self, unit_type, location, num=1):
+        """Place up to num units (fractional counts round down); returns how many landed"""
+        code = self.codes.get(unit_type)
+        if code is None:
+            return 0
+        stationary = code <= TURRET_CODE
+        num = 1 if stationary else min(int(num), self.affordable(unit_type))
+        if num < 1 or not self.can_spawn(unit_type, location, num):
+            return 0
+        x, y = int(location[0]), int(location[1])
+        self.calls += 1
+        try:
+            placed = int(self.game_state.attempt_spawn(unit_type, [x, y], num) or 0)
+        except Exception:
+            placed = 0
+        spec = self.specs[code]
+        self.sp -= spec['sp_cost'] * placed
+        self.mp -= spec['mp_cost'] * placed
+        if stationary and placed:
+            self.occupied |= self.bit(x, y)
+            self.upgradable[(x, y)] = code
+        if placed < num:
+            self._resync(x, y)
+        return placed
+
+    def submit(self, plan, fallback=None):
+        """Spawn a [(unit_type, location, count)] plan, one call per distinct
+        type and location; shortfalls retry at fallback(location) if given"""
+        merged = OrderedDict()
+        for unit_type, loc, count in plan:
+            key = (unit_type, int(loc[0]), int(loc[1]))
+            merged[key] = merged.get(key, 0) + int(count)
+        placed = 0
+        for (unit_type, x, y), count in merged.items():
+            landed = self.spawn(unit_type, [x, y], count)
+            if landed < count and fallback is not None:
+                landed += self.spawn(unit_type, fallback([x, y]), count - landed)
+            placed += landed
+        return placed
+
+    def can_upgrade(self, location):
+        key = (int(location[0]), int(location[1]))
+        code = self.upgradable.get(key)
+        if code is None:
+            return False
+        spec = self.specs[code]
+        return self.sp + 1e-9 >= spec['upgraded_sp_cost'] and self.mp + 1e-9 >= spec['upgraded_mp_cost']
+
+    def upgrade(self, location):
+        """Upgrade our structure at location if the ledger says it can; returns success"""
+        if not self.can_upgrade(location):
+            return False
+        x, y = int(location[0]), int(location[1])
+        self.calls += 1
+        try:
+            done = bool(self.game_state.attempt_upgrade([x, y]))
+        except Exception:
+            done = False
+        code = self.upgradable.pop((x, y))
+        if done:
+            self.sp -= self.specs[code]['upgraded_sp_cost']
+            self.mp -= self.specs[code]['upgraded_mp_cost']
+        else:
+            self._resync(x, y)
+        return done
+
+    def _resync(self, x, y):
+        """Re-read resources and a cell after gamelib refused what the ledger allowed"""
+        try:
+            self.sp = float(self.game_state.get_resource(SP))
+            self.mp = float(self.game_state.get_resource(MP))
+            if self.game_state.contains_stationary_unit([x, y]):
+                self.occupied |= self.bit(x, y)
+        except Exception:
+            pass
+
+
+# ═══════════════════════════════════════════════════════════════
+# PATHING ENGINE
+# ═══════════════════════════════════════════════════════════════
+
+TOP_RIGHT, TOP_LEFT, BOTTOM_LEFT, BOTTOM_RIGHT = 0, 1, 2, 3
+HORIZONTAL, VERTICAL = 1, 2
+
+
+class Path:
+    """A mobile unit's route from a start cell toward its target edge"""
+
+    __slots__ = ('start', 'target', 'cells', 'flat', 'reached')
+
+    def __init__(self, start, target, cells, height):
+        self.start = start
+        self.target = target
+        self.cells = cells
+        self.flat = np.array([x * height + y for x, y in cells], dtype=np.intp)
+        self.reached = False
+
+
+class PathFinder:
+    """Terminal pathing rules for every edge spawn cell in one batched pass.
+    
+    Mirrors gamelib's ShortestPathFinder: a BFS distance field grown from
+    the target edge (or, when the edge is unreachable, from the most ideal
+    reachable cell) and a greedy walk that prefers alternating direction.
+    One field per target edge serves every start cell, and results are
+    cached by the layout's Zobrist hash so unchanged walls cost nothing.
+    """
+
+    def __init__(self, width=28, height=28, cache_size=32, geometry=None):
+        self.geometry = geometry or MapGeometry.get(width, height)
+        self.width = width
+        self.height = height
+        self.half = width // 2
+        self.cache_size = cache_size
+        self.repair_limit = 12
+        self._cache = OrderedDict()
+        self._layout = None
+        self._blocked = None
+        self._blocked_array = None
+        
+        self.in_arena = self.geometry.arena_flat
+        self.neighbors = self.geometry.neighbors
+        self.edges = self.geometry.edges
+        self.edge_sets = {edge: set(cells) for edge, cells in self.edges.items()}
+        self.edge_seeds = {edge: {x * height + y for x, y in cells} for edge, cells in self.edges.items()}
+
+    def target_edge(self, start):
+        """The edge a unit spawned at start paths toward"""
+        x, y = start
+        if y < self.half:
+            return TOP_RIGHT if x < self.half else TOP_LEFT
+        return BOTTOM_RIGHT if x < self.half else BOTTOM_LEFT
+
+    def spawn_cells(self, player):
+        """Edge cells a player can deploy mobile units on"""
+        if player == 0:
+            return self.edges[BOTTOM_LEFT] + self.edges[BOTTOM_RIGHT]
+        return self.edges[TOP_LEFT] + self.edges[TOP_RIGHT]
+
+    # ─────────────── Layout / cache ───────────────
+    def set_board(self, board):
+        """Point the finder at a board's structure layout"""
+        self.set_blocked(board.owner >= 0, board.hashes().layout)
+
+    def set_blocked(self, blocked, layout=None):
+        """Switch to a blocked-cell layout, repairing fields when few cells changed
+        
+        layout is the mask's Zobrist hash when the caller tracks it.
+        """
+        if layout is None:
+            layout = _layout_hash(blocked)
+        if layout == self._layout:
+            return
+        previous = self._cache.get(self._layout)
+        old_blocked = self._blocked
+        old_array = self._blocked_array
+        self._layout = layout
+        self._blocked_array = blocked
+        self._blocked = blocked.ravel().tolist()
+        if layout in self._cache:
+            self._cache.move_to_end(layout)
+            return
+        
+        entry = {'fields': {}, 'paths': {}}
+        if previous is not None and old_blocked is not None:
+            changed = np.flatnonzero(old_array.ravel() != blocked.ravel())
+            if len(changed) <= self.repair_limit:
+                for key, field in previous['fields'].items():
+                    if isinstance(key, int):
+                        entry['fields'][key] = self._repair(list(field), key, changed, old_blocked)
+        self._cache[layout] = entry
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @contextmanager
+    def hypothetical(self, blocked_cells=(), freed_cells=()):
+        """Temporarily place/remove structures; fields are repaired, not rebuilt"""
+        saved, saved_layout = self._blocked_array, self._layout
+        cells = _zobrist_keys(self.width, self.height)[0]
+        trial = saved.copy()
+        layout = saved_layout
+        for state, changed in ((True, blocked_cells), (False, freed_cells)):
+            for x, y in changed:
+                if trial[x, y] != state:
+                    trial[x, y] = state
+                    layout ^= int(cells[x * self.height + y])
+        self.set_blocked(trial, layout)
+        try:
+            yield self
+        finally:
+            self.set_blocked(saved, saved_layout)
+
+    @property
+    def _entry(self):
+        return self._cache[self._layout]
+
+    def all_paths(self, player=0):
+        """Paths for every spawn cell of a player (None where blocked)"""
+        return {start: self.path(start) for start in self.spawn_cells(player)}
+
+    def spawn_distances(self, player):
+        """Total edge distance over a player's open spawn cells, and how many are cut off"""
+        h = self.height
+        total = 0
+        cut_off = 0
+        for x, y in self.spawn_cells(player):
+            idx = x * h + y
+            if self._blocked[idx]:
+                continue
+            d = self._edge_field(self.target_edge((x, y)))[idx]
+            if d < 0:
+                cut_off += 1
+            else:
+                total += d
+        return total, cut_off
+
+    def path_mask(self, player):
+        """Bitboard of the cells on a player's paths that reach their edge
+        
+        Paths descend the BFS field, so they are shortest: blocking a cell
+        outside this mask leaves spawn_distances(player) unchanged.
+        """
+        masks = self._entry.setdefault('masks', {})
+        if player not in masks:
+            paths = (self.path(start) for start in self.spawn_cells(player))
+            flats = [p.flat for p in paths if p is not None and p.reached]
+            masks[player] = self.geometry.cells_mask(np.concatenate(flats)) if flats else 0
+        return masks[player]
+
+    def path(self, start, target_edge=None):
+        """Path from start to its target edge under the current layout"""
+        start = (int(start[0]), int(start[1]))
+        if target_edge is None:
+            target_edge = self.target_edge(start)
+        paths = self._entry['paths']
+        key = (start, target_edge)
+        if key not in paths:
+            paths[key] = self._compute_path(start, target_edge)
+        return paths[key]
+
+    # ─────────────── Core pathing ───────────────
+    def _compute_path(self, start, edge):
+        h = self.height
+        idx = start[0] * h + start[1]
+        if not (0 <= start[0] < self.width and 0 <= start[1] < h) or not self.in_arena[idx] or self._blocked[idx]:
+            return None
+        
+        dist = self._edge_field(edge)
+        reached = True
+        if dist[idx] < 0:
+            # Edge unreachable: head for the most ideal cell of our component
+            reached = False
+            dist = self._ideal_field(self._most_ideal(idx, edge))
+        
+        path = Path(start, edge, self._walk(start, dist, edge), h)
+        path.reached = reached
+        return path
+
+    def _bfs(self, seeds):
+        dist = [-1] * (self.width * self.height)
+        blocked = self._blocked
+        queue = deque()
+        for idx in seeds:
+            dist[idx] = 0
+            queue.append(idx)
+        neighbors = self.neighbors
+        while queue:
+            cur = queue.popleft()
+            if blocked[cur]:
+                continue
+            nd = dist[cur] + 1
+            for nidx, _, _ in neighbors[cur]:
+                if dist[nidx] < 0 and not blocked[nidx]:
+                    dist[nidx] = nd
+                    queue.append(nidx)
+        return dist
+
+    def _repair(self, dist, edge, changed, old_blocked):
+        """Repair an edge distance field after cells flipped blocked state
+        
+        Newly blocked cells invalidate only the cells whose shortest route
+        ran through them, which are then re-grown from their intact
+        boundary; newly freed cells push shorter distances outward. Both
+        touch just the affected region (D*-Lite style, unit edge costs).
+        """
+        seeds = self.edge_seeds[edge]
+        neighbors = self.neighbors
+        blocked = list(old_blocked)
+        new_blocked = self._blocked
+        added = [int(i) for i in changed if new_blocked[i]]
+        freed = [int(i) for i in changed if not new_blocked[i]]
+        
+        # Phase 1: apply new blocks and invalidate unsupported dependents
+        heap = []
+        for idx in added:
+            blocked[idx] = True
+            old = dist[idx]
+            dist[idx] = 0 if idx in seeds else -1
+            if old >= 0:
+                heapq.heappush(heap, (old, idx))
+        
+        invalid = set()
+        while heap:
+            du, u = heapq.heappop(heap)
+            for v, _, _ in neighbors[u]:
+                if blocked[v] or v in invalid or dist[v] != du + 1 or v in seeds:
+                    continue
+                supported = False
+                for w, _, _ in neighbors[v]:
+                    if not blocked[w] and w not in invalid and dist[w] == du:
+                        supported = True
+                        break
+                if not supported:
+                    invalid.add(v)
+                    dist[v] = -1
+                    heapq.heappush(heap, (du + 1, v))
+        
+        # Re-grow the invalidated region from its intact boundary
+        for v in invalid:
+            best = -1
+            for w, _, _ in neighbors[v]:
+                if not blocked[w] and w not in invalid and dist[w] >= 0 and (best < 0 or dist[w] < best):
+                    best = dist[w]
+            if best >= 0:
+                heapq.heappush(heap, (best + 1, v))
+        self._relax(dist, heap, blocked)
+        
+        # Phase 2: freed cells lower distances outward
+        for idx in freed:
+            blocked[idx] = False
+            if idx in seeds:
+                heapq.heappush(heap, (0, idx))
+                dist[idx] = -1
+                continue
+            dist[idx] = -1
+            best = -1
+            for w, _, _ in neighbors[idx]:
+                if not blocked[w] and dist[w] >= 0 and (best < 0 or dist[w] < best):
+                    best = dist[w]
+            if best >= 0:
+                heapq.heappush(heap, (best + 1, idx))
+        self._relax(dist, heap, blocked)
+        return dist
+
+    def _relax(self, dist, heap, blocked):
+        """Propagate tentative distances in the heap until settled"""
+        neighbors = self.neighbors
+        while heap:
+            d, v = heapq.heappop(heap)
+            if 0 <= dist[v] <= d:
+                continue
+            dist[v] = d
+            for n, _, _ in neighbors[v]:
+                if not blocked[n] and (dist[n] < 0 or dist[n] > d + 1):
+                    heapq.heappush(heap, (d + 1, n))
+
+    def _edge_field(self, edge):
+        fields = self._entry['fields']
+        if edge not in fields:
+            fields[edge] = self._bfs([x * self.height + y for x, y in self.edges[edge]])
+        return fields[edge]
+
+    def _ideal_field(self, ideal):
+        fields = self._entry['fields']
+        key = ('ideal', ideal)
+        if key not in fields:
+            fields[key] = self._bfs([ideal])
+        return fields[key]
+
+    def _direction(self, edge):
+        x, y = self.edges[edge][0]
+        return (1 if x >= self.half else -1, 1 if y >= self.half else -1)
+
+    def _most_ideal(self, start_idx, edge):
+        """Cell of start's component furthest toward the target edge"""
+        dx, dy = self._direction(edge)
+        h = self.height
+        top = self.height - 1
+        right = self.width - 1
+        
+        def idealness(idx):
+            x, y = divmod(idx, h)
+            return (h * y if dy == 1 else h * (top - y)) + (x if dx == 1 else right - x)
+        
+        seen = {start_idx}
+        queue = deque([start_idx])
+        best, best_score = start_idx, idealness(start_idx)
+        blocked = self._blocked
+        while queue:
+            cur = queue.popleft()
+            for nidx, _, _ in self.neighbors[cur]:
+                if nidx in seen or blocked[nidx]:
+                    continue
+                seen.add(nidx)
+                score = idealness(nidx)
+                if score > best_score:
+                    best, best_score = nidx, score
+                queue.append(nidx)
+        return best
+
+    def _walk(self, start, dist, edge):
+        """Greedy descent of the distance field with gamelib's tie-breaks"""
+        h = self.height
+        direction = self._direction(edge)
+        blocked = self._blocked
+        cells = [start]
+        cx, cy = start
+        move = 0
+        limit = self.width * self.height
+        while dist[cx * h + cy] != 0 and len(cells) <= limit:
+            best = (cx, cy)
+            best_len = dist[cx * h + cy]
+            for nidx, nx, ny in self.neighbors[cx * h + cy]:
+                if blocked[nidx]:
+                    continue
+                nlen = dist[nidx]
+                if nlen > best_len:
+                    continue
+                if nlen == best_len and not self._better_direction((cx, cy), (nx, ny), best, move, direction):
+                    continue
+                best, best_len = (nx, ny), nlen
+            if best == (cx, cy):
+                break
+            move = VERTICAL if best[0] == cx else HORIZONTAL
+            cx, cy = best
+            cells.append(best)
+        return cells
+
+    @staticmethod
+    def _better_direction(prev_tile, new_tile, prev_best, move, direction):
+        if move == HORIZONTAL and new_tile[0] != prev_best[0]:
+            return prev_tile[1] != new_tile[1]
+        if move == VERTICAL and new_tile[1] != prev_best[1]:
+            return prev_tile[0] != new_tile[0]
+        if move == 0:
+            return prev_tile[1] != new_tile[1]
+        
+        # Both candidate moves lie on the same axis
+        if new_tile[1] == prev_best[1]:
+            return (direction[0] == 1 and new_tile[0] > prev_best[0]) or \
+                   (direction[0] == -1 and new_tile[0] < prev_best[0])
+        if new_tile[0] == prev_best[0]:
+            return (direction[1] == 1 and new_tile[1] > prev_best[1]) or \
+                   (direction[1] == -1 and new_tile[1] < prev_best[1])
+        return True
+
+
+# ═══════════════════════════════════════════════════════════════
+# ACTION PHASE SIMULATOR
+# ═══════════════════════════════════════════════════════════════
+
+def _plan_key(plan):
+    """Hashable form of a [(unit_type, location, count)] spawn plan"""
+    return tuple((unit_type, int(loc[0]), int(loc[1]), count) for unit_type, loc, count in plan)
+
+
+class SimResult:
+    """Outcome of one simulated action phase, indexed by player"""
+
+    __slots__ = ('breaches', 'structure_damage', 'destroyed', 'survivors', 'frames', 'structure_hp')
+
+    def __init__(self):
+        self.breaches = [0, 0]
+        self.structure_damage = [0.0, 0.0]
+        self.destroyed = []  # (owner, code, x, y) of structures lost
+        self.survivors = [0, 0]
+        self.frames = 0
+        self.structure_hp = {}  # (x, y) -> health left, for structures that took damage
+
+    def value(self, player=0):
+        """Single attack score: breaches dominate, structure damage adds"""
+        return 2.0 * self.breaches[player] + self.structure_damage[player] / 25.0
+
+
+class _SimGroup:
+    """Identical mobile units moving together (same type, spawn and timing)"""
+
+    __slots__ = ('player', 'code', 'hps', 'path', 'step', 'progress', 'target', 'moved',
+                 'shielded', 'start_hp', 'speed', 'damage', 'tower_damage', 'reach2', 'x', 'y')
+
+
+class ActionSimulator:
+    """Deterministic frame-by-frame action phase for scoring spawn plans.
+    
+    Built once per turn from the board index. Each frame applies support
+    shields, moves units along Terminal paths (re-pathing when structures
+    fall), resolves breaches and self-destructs, then lets turrets and
+    mobile units attack using the engine's targeting priorities.
+    """
+
+    MAX_FRAMES = 500
+    SELF_DESTRUCT_RANGE = 1.5
+    SELF_DESTRUCT_MIN_MOVES = 5
+
+    def __init__(self, board, specs, pathfinder):
+        self.board = board
+        self.specs = specs
+        self.pathfinder = pathfinder
+        self.h = board.height
+        self.half_x = (board.width - 1) / 2.0
+        self.codes = _unit_codes()
+        geometry = pathfinder.geometry
+        
+        # Static structure table
+        records = board.records(specs)
+        self.sx = [r.x for r in records]
+        self.sy = [r.y for r in records]
+        self.s_owner = [r.owner for r in records]
+        self.s_code = [r.code for r in records]
+        self.s_hp = [r.hp for r in records]
+        self.s_damage = [r.damage for r in records]
+        self.s_index = {(x, y): i for i, (x, y) in enumerate(zip(self.sx, self.sy))}
+        
+        # Per-cell lists of turrets that can fire on it / supports that shield it
+        self.turret_cover = defaultdict(list)
+        self.support_cover = defaultdict(list)
+        for i, r in enumerate(records):
+            if r.code == TURRET_CODE and r.damage > 0:
+                cover = self.turret_cover
+            elif r.code == SUPPORT_CODE:
+                cover = self.support_cover
+            else:
+                continue
+            for c in geometry.in_range(r.x, r.y, r.range).tolist():
+                cover[c].append(i)
+        self.s_reach2 = []
+        for r in records:
+            reach = specs[r.code]['upgraded_range' if r.upgraded else 'range'] + 0.51
+            self.s_reach2.append(reach * reach)
+        self.s_shield = [r.shield if r.code == SUPPORT_CODE else 0.0 for r in records]
+        self._structures_in_range = {}
+
+    # ─────────────── Setup ───────────────
+    def _spawn(self, plan, player, blocked):
+        groups = []
+        spawnable = set(self.pathfinder.spawn_cells(player))
+        for unit_type, loc, count in plan or []:
+            code = self.codes.get(unit_type)
+            count = int(count)
+            loc = (int(loc[0]), int(loc[1]))
+            if code is None or code < SCOUT_CODE or count <= 0 or loc not in spawnable or blocked[loc]:
+                continue
+            path = self.pathfinder.path(loc)
+            if path is None:
+                continue
+            spec = self.specs[code]
+            g = _SimGroup()
+            g.player, g.code = player, code
+            g.start_hp = spec['hp']
+            g.hps = [spec['hp']] * count
+            g.path, g.step, g.progress, g.moved = path, 0, 0.0, 0
+            g.target = path.target
+            g.shielded = set()
+            g.speed = spec['speed'] or 1.0
+            g.damage, g.tower_damage = spec['damage'], spec['tower_damage']
+            reach = spec['range'] + 0.51
+            g.reach2 = reach * reach
+            g.x, g.y = loc
+            groups.append(g)
+        return groups
+
+    def _structure_targets(self, x, y, player, reach2):
+        """Enemy structure ids within reach of (x, y), nearest first"""
+        key = (x, y, player, reach2)
+        if key not in self._structures_in_range:
+            found = []
+            for i, (sx, sy, owner) in enumerate(zip(self.sx, self.sy, self.s_owner)):
+                d2 = (sx - x) ** 2 + (sy - y) ** 2
+                if owner != player and d2 < reach2:
+                    found.append((d2, i))
+            found.sort()
+            self._structures_in_range[key] = found
+        return self._structures_in_range[key]
+
+    # ─────────────── Targeting ───────────────
+    def _priority(self, x, y, hp, attacker_player, d2):
+        """Engine target order: nearest, weakest, deepest into attacker's side, nearest an edge"""
+        depth = y if attacker_player == 0 else -y
+        return (d2, hp, depth, -abs(self.half_x - x))
+
+    def _pick_group(self, x, y, player, groups, reach2):
+        best, best_key = None, None
+        for g in groups:
+            if g.player == player or not g.hps:
+                continue
+            d2 = (g.x - x) ** 2 + (g.y - y) ** 2
+            if d2 >= reach2:
+                continue
+            key = self._priority(g.x, g.y, g.hps[0], player, d2)
+            if best_key is None or key < best_key:
+                best, best_key = g, key
+        return best
+
+    def _pick_structure(self, x, y, player, reach2, hp):
+        best, best_key = None, None
+        for d2, i in self._structure_targets(x, y, player, reach2):
+            if hp[i] <= 0:
+                continue
+            if best_key is not None and d2 > best_key[0]:
+                break
+            key = self._priority(self.sx[i], self.sy[i], hp[i], player, d2)
+            if best_key is None or key < best_key:
+                best, best_key = i, key
+        return best
+
+    # ─────────────── Simulation ───────────────
+    def simulate(self, plan, enemy_plan=None):
+        """Run the action phase for our plan (and optionally the enemy's)"""
+        result = SimResult()
+        finder = self.pathfinder
+        saved, saved_layout = finder._blocked_array, finder._layout
+        blocked = self.board.owner >= 0
+        layout = self.board.hashes().layout
+        cells = _zobrist_keys(self.board.width, self.board.height)[0]
+        hp = list(self.s_hp)
+        h = self.h
+        
+        try:
+            groups = self._spawn(plan, 0, blocked) + self._spawn(enemy_plan, 1, blocked)
+            layout_dirty = False
+            fallen = []
+            frame = 0
+            while groups and frame < self.MAX_FRAMES:
+                frame += 1
+                
+                # 1. Support shields, once per support per unit
+                for g in groups:
+                    for i in self.support_cover.get(g.x * h + g.y, ()):
+                        if hp[i] > 0 and self.s_owner[i] == g.player and i not in g.shielded:
+                            g.shielded.add(i)
+                            g.hps = [v + self.s_shield[i] for v in g.hps]
+                
+                # 2. Movement, re-pathing first if the layout changed
+                if layout_dirty:
+                    finder.set_blocked(blocked, layout)
+                    for g in groups:
+                        path = finder.path((g.x, g.y), g.target)
+                        if path is not None:
+                            g.path, g.step = path, 0
+                    layout_dirty = False
+                for g in groups:
+                    g.progress += g.speed
+                    if g.progress >= 1.0:
+                        g.progress -= 1.0
+                        if g.step < len(g.path.cells) - 1:
+                            g.step += 1
+                            g.moved += 1
+                            g.x, g.y = g.path.cells[g.step]
+                
+                # 3. Breaches and self-destructs at the end of a path
+                for g in groups:
+                    if g.step < len(g.path.cells) - 1 or not g.hps:
+                        continue
+                    if g.path.reached:
+                        result.breaches[g.player] += len(g.hps)
+                    elif g.moved >= self.SELF_DESTRUCT_MIN_MOVES:
+                        reach = self.SELF_DESTRUCT_RANGE + 0.51
+                        for _ in g.hps:
+                            for d2, i in self._structure_targets(g.x, g.y, g.player, reach * reach):
+                                if hp[i] > 0:
+                                    dealt = min(hp[i], g.start_hp)
+                                    hp[i] -= dealt
+                                    result.structure_damage[g.player] += dealt
+                                    if hp[i] <= 0:
+                                        fallen.append(i)
+                    g.hps = []
+                
+                # 4. Attacks: turrets on mobiles, mobiles on mobiles then structures
+                firing = set()
+                for g in groups:
+                    if g.hps:
+                        firing.update(self.turret_cover.get(g.x * h + g.y, ()))
+                for i in sorted(firing):
+                    if hp[i] <= 0:
+                        continue
+                    target = self._pick_group(self.sx[i], self.sy[i], self.s_owner[i], groups, self.s_reach2[i])
+                    if target is not None:
+                        target.hps[0] -= self.s_damage[i]
+                        if target.hps[0] <= 0:
+                            target.hps.pop(0)
+                
+                for g in groups:
+                    for _ in range(len(g.hps)):
+                        target = self._pick_group(g.x, g.y, g.player, groups, g.reach2) if g.damage > 0 else None
+                        if target is not None:
+                            target.hps[0] -= g.damage
+                            if target.hps[0] <= 0:
+                                target.hps.pop(0)
+                            continue
+                        if g.tower_damage <= 0:
+                            break
+                        i = self._pick_structure(g.x, g.y, g.player, g.reach2, hp)
+                        if i is None:
+                            break
+                        dealt = min(hp[i], g.tower_damage)
+                        hp[i] -= dealt
+                        result.structure_damage[g.player] += dealt
+                        if hp[i] <= 0:
+                            fallen.append(i)
+                
+                # 5. Clear the dead; fallen structures open new paths
+                if fallen:
+                    blocked = blocked.copy()
+                    for i in fallen:
+                        blocked[self.sx[i], self.sy[i]] = False
+                        layout ^= int(cells[self.sx[i] * h + self.sy[i]])
+                        result.destroyed.append((self.s_owner[i], self.s_code[i], self.sx[i], self.sy[i]))
+                    fallen = []
+                    layout_dirty = True
+                groups = [g for g in groups if g.hps]
+            
+            result.frames = frame
+            for g in groups:
+                result.survivors[g.player] += len(g.hps)
+            result.structure_hp = {(self.sx[i], self.sy[i]): max(0.0, v)
+                                   for i, v in enumerate(hp) if v != self.s_hp[i]}
+        finally:
+            if saved is not None:
+                finder.set_blocked(saved, saved_layout)
+        return result
+
+
+# ═══════════════════════════════════════════════════════════════
+# ROLLOUT POOL
+# ═══════════════════════════════════════════════════════════════
+
+_ROLLOUT_WORKER = {}
+
+
+def _rollout_worker_init(shorthands, specs, width, height, batch):
+    """Worker process setup: unit shorthands and a long-lived path finder"""
+    global WALL, SUPPORT, TURRET, SCOUT, DEMOLISHER, INTERCEPTOR
+    WALL, SUPPORT, TURRET, SCOUT, DEMOLISHER, INTERCEPTOR = shorthands
+    _ROLLOUT_WORKER.update(specs=specs, pathfinder=PathFinder(width, height),
+                           key=None, simulator=None, batch=batch)
+
+
+def _rollout_worker_ping(delay):
+    """No-op task that holds a worker briefly, so warm-up reaches every worker"""
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _rollout_worker_run(batch, key, blob, plan):
+    """Simulate one plan; the simulator is rebuilt only when the board changes
+    
+    Jobs from a batch the parent has stopped waiting for return None at once.
+    """
+    state = _ROLLOUT_WORKER
+    if state['batch'].value != batch:
+        return None
+    if state['key'] != key:
+        board = BoardIndex.from_bytes(blob)
+        state['pathfinder'].set_board(board)
+        state['simulator'] = ActionSimulator(board, state['specs'], state['pathfinder'])
+        state['key'] = key
+    return state['simulator'].simulate(plan)
+
+
+class RolloutPool:
+    """Persistent worker processes that simulate candidate spawn plans.
+    
+    Created once per game. Each turn the board goes out as a compact
+    BoardIndex byte buffer alongside every plan; workers keep their path
+    finder and simulator between tasks, rebuilding them only when the
+    board's state hash changes. evaluate() returns whatever finished
+    before the deadline and leaves the rest as None; jobs tagged with an
+    older batch are skipped by the workers instead of delaying the next.
+    """
+
+    WARM_TIMEOUT = 30.0
+
+    def __init__(self, workers, specs, width=28, height=28, deadline=0.3):
+        self.workers = workers
+        self.deadline = deadline
+        self.pool = None
+        self.batches = 0
+        self.stale = 0  # jobs abandoned at a deadline
+        if workers <= 0:
+            return
+        shorthands = (WALL, SUPPORT, TURRET, SCOUT, DEMOLISHER, INTERCEPTOR)
+        context = multiprocessing.get_context('spawn')
+        self.batch = context.Value('q', 0, lock=False)
+        self.pool = context.Pool(workers, initializer=_rollout_worker_init,
+                                 initargs=(shorthands, specs, width, height, self.batch))
+
+    def warm(self, timeout=None):
+        """Block until the workers have started, so the first turn doesn't pay for spawning"""
+        if not self.enabled:
+            return 0
+        pids = self.pool.map_async(_rollout_worker_ping, [0.05] * self.workers, chunksize=1)
+        return len(set(pids.get(self.WARM_TIMEOUT if timeout is None else timeout)))
+
+    @property
+    def enabled(self):
+        return self.pool is not None
+
+    def evaluate(self, board, plans, deadline=None):
+        """Simulated results for plans, None where a worker missed the deadline"""
+        if not self.enabled or not plans:
+            return [None] * len(plans)
+        key = board.hashes().state
+        blob = board.to_bytes()
+        self.batches += 1
+        batch = self.batch.value = self.batches
+        pending = [self.pool.apply_async(_rollout_worker_run, (batch, key, blob, plan))
+                   for plan in plans]
+        
+        stop = time.monotonic() + (self.deadline if deadline is None else deadline)
+        results = []
+        for job in pending:
+            try:
+                results.append(job.get(max(0.0, stop - time.monotonic())))
+            except Exception:
+                results.append(None)
+        
+        # Retire the batch: anything still queued is dropped by the workers
+        self.batch.value = 0
+        self.stale += sum(not job.ready() for job in pending)
+        return results
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+
+# ═══════════════════════════════════════════════════════════════
+# MICROCONTROLLER SYSTEMS
+# ═══════════════════════════════════════════════════════════════
+
+class PathDynamicsEngine:
+    """Estimates danger/heatmap across map coordinates for spawn planning.
+    
+    Keeps a per-cell turret damage field and real Terminal paths for every
+    edge spawn cell, plus the column turret density heuristic as a
+    fallback heatmap.
+    """
+
+    def __init__(self, strategy):
+        self.s = strategy
+        self.heatmap = None
+        self.damage_field = DamageField(strategy.map_width, strategy.map_height, strategy.geometry)
+        self.field = None
+        self.pathfinder = PathFinder(strategy.map_width, strategy.map_height, geometry=strategy.geometry)
+        self.paths = {}
+        self.table = None
+
+    @_timed
+    def update_heatmap(self, game_state):
+        """Build damage field, spawn paths and column heatmap"""
+        board = self.s.board
+        fields = self.s.transpositions['fields']
+        try:
+            key = (board.hashes().structures, 1)
+            self.field = fields.get(key)
+            if self.field is None:
+                self.field = fields.put(key, self.damage_field.build(board, 1, self.s.unit_specs))
+        except Exception:
+            self.field = None
+        
+        try:
+            self.pathfinder.set_board(self.s.board)
+            self.paths = self.pathfinder.all_paths(0)
+        except Exception:
+            self.paths = {}
+        
+        tables = self.s.transpositions['tables']
+        try:
+            mp = game_state.get_resource(MP)
+            key = (board.hashes().structures, mp)
+            self.table = tables.get(key)
+            if self.table is None:
+                self.table = ExpectedDamageTable.build(board, self.s.unit_specs, self.field,
+                                                       self.paths, mp, self.s.geometry)
+                if self.table.cells:
+                    tables.put(key, self.table)
+        except Exception:
+            self.table = None
+        
+        if self.field is not None and self.s.regions is not None:
+            self.s.regions.add((1, 'danger'), self.field)
+        self.heatmap = self._column_turret_density(game_state)
+
+    def _column_turret_density(self, game_state):
+        """Calculate turret density per column"""
+        try:
+            density = self.s.regions.columns((1, 'turrets'))
+            return {x: int(v) for x, v in enumerate(density)}
+        except Exception:
+            return {x: 0 for x in range(self.s.map_width)}
+
+    def path_from(self, loc):
+        """Cached path for a spawn location, or None if blocked/unknown"""
+        key = (int(loc[0]), int(loc[1]))
+        if key in self.paths:
+            return self.paths[key]
+        try:
+            return self.pathfinder.path(key)
+        except Exception:
+            return None
+
+    def lane_danger(self, loc, unit_type='scout'):
+        """Expected damage taken by a unit walking the path from loc"""
+        if self.field is None:
+            return 0.0
+        code = _MOBILE_CODES.get(unit_type, SCOUT_CODE)
+        speed = self.s.unit_specs[code]['speed'] or 1.0
+        path = self.path_from(loc)
+        if path is not None:
+            return float(self.field.ravel()[path.flat].sum()) / speed
+        
+        # Not a valid start cell: fall back to the straight column lane
+        x = min(max(int(loc[0]), 0), self.field.shape[0] - 1)
+        regions = self.s.regions
+        if regions is not None and (1, 'danger') in regions:
+            return float(regions.band((1, 'danger'), x, x)) / speed
+        return float(self.field[x].sum()) / speed
+
+    def expected_losses(self, loc, unit_type='scout'):
+        """Units expected to die walking the path from loc, via this turn's table"""
+        code = _MOBILE_CODES.get(unit_type, SCOUT_CODE)
+        if self.table is not None:
+            losses = self.table.expected_losses(loc, code)
+            if losses != float('inf'):
+                return losses
+        return self.lane_danger(loc, unit_type) / max(1.0, self.s.unit_specs[code]['hp'])
+
+    def estimate_path_danger(self, game_state, unit_type='scout'):
+        """Returns scalar danger estimate: higher = more dangerous
+        
+        With a damage field this is the expected damage (HP) a unit takes
+        along the preferred spawn paths; otherwise a column density count.
+        """
+        try:
+            if self.field is not None:
+                vals = [self.lane_danger([c, 0], unit_type) for c in self.s.preferred_columns]
+                return sum(vals) / max(1, len(vals))
+            
+            if isinstance(self.heatmap, dict) and len(self.heatmap) > 0:
+                density = sum(self.heatmap.get(c, 0) for c in self.s.preferred_columns)
+                
+                # Unit modifiers
+                if unit_type == 'scout':
+                    return density
+                elif unit_type == 'demolisher':
+                    return density * 0.5
+                elif unit_type == 'interceptor':
+                    return density * 0.2
+                
+                return density
         except Exception:
             pass
         
@@ -1854,6 +4694,7 @@ class ScoutSwarmController:
         self.s = strategy
         self.engine = engine
 
+    @_timed
     def plan_scout_wave(self, game_state, mp_amount, strategy_mode):
         """Plan scout wave with adaptive column selection"""
         plan = []
@@ -1863,9 +4704,7 @@ class ScoutSwarmController:
         scored_points = []
         for p in pts:
             try:
-                column = p[0]
-                col_danger = self.engine.heatmap.get(column, 0) if isinstance(self.engine.heatmap, dict) else 0
-                scored_points.append((col_danger, p))
+                scored_points.append((self.engine.expected_losses(p, 'scout'), p))
             except:
                 scored_points.append((0, p))
         
@@ -1917,6 +4756,7 @@ class DemolisherEscortController:
         self.s = strategy
         self.engine = engine
 
+    @_timed
     def plan_demolisher_wave(self, game_state, mp_amount, strategy_mode):
         """Plan demolisher wave with escorts"""
         plan = []
@@ -1931,7 +4771,8 @@ class DemolisherEscortController:
         chosen = []
         for c in cols:
             try:
-                danger = self.engine.estimate_path_danger(game_state, 'demolisher')
+                # Expected demolishers lost crossing this column
+                danger = self.engine.expected_losses([c, 0], 'demolisher')
                 if strategy_mode == 'defensive' and danger > 6:
                     continue
                 chosen.append(c)
@@ -1963,17 +4804,9 @@ class DemolisherEscortController:
 
     def _rank_columns_by_structures(self, game_state):
         """Rank columns by enemy structure count"""
-        cols = []
         try:
-            for x in range(self.s.map_width):
-                count = 0
-                for y in range(self.s.map_height // 2, self.s.map_height):
-                    if game_state.contains_stationary_unit([x, y]):
-                        for u in game_state.game_map[[x, y]]:
-                            if getattr(u, 'player_index', None) == 1:
-                                count += 1
-                cols.append((count, x))
-            cols.sort(reverse=True)
+            counts = self.s.regions.columns((1, 'count'))
+            cols = sorted(((int(c), x) for x, c in enumerate(counts)), reverse=True)
             return [c[1] for c in cols]
         except Exception:
             return [13, 14, 12, 15, 10, 17]
@@ -1986,14 +4819,16 @@ class InterceptorController:
         self.s = strategy
         self.engine = engine
 
+    @_timed
     def plan_interceptors(self, game_state, mp_amount):
         """Plan offensive interceptor wave"""
         plan = []
-        safest_col = self._find_safest_column(game_state)
+        safest = self._find_safest_spawn(game_state)
         count = max(1, mp_amount)
-        plan.append((INTERCEPTOR, [safest_col, 0], count))
+        plan.append((INTERCEPTOR, safest, count))
         return plan
 
+    @_timed
     def plan_defensive_interceptors(self, game_state, mp_amount):
         """Plan defensive interceptor deployment"""
         plan = []
@@ -2007,17 +4842,17 @@ class InterceptorController:
         
         return plan
 
-    def _find_safest_column(self, game_state):
-        """Find column with lowest danger"""
+    def _find_safest_spawn(self, game_state):
+        """Find the edge spawn location whose lane has the lowest danger"""
         min_danger = 999
-        best = 13
+        best = [13, 0]
         
         try:
-            for x in range(self.s.map_width):
-                danger = self.engine.heatmap.get(x, 0) if isinstance(self.engine.heatmap, dict) else 0
+            for loc in self.s.geometry.bottom_edges:
+                danger = self.engine.expected_losses(loc, 'interceptor')
                 if danger < min_danger:
                     min_danger = danger
-                    best = x
+                    best = loc
         except:
             pass
         
@@ -2027,3 +4862,4 @@ class InterceptorController:
 if __name__ == "__main__":
     algo = AlgoStrategy()
     algo.start()
+    algo.on_game_end()
@@ -0,0 +1,187 @@
+"""Offline replay benchmark for AlgoStrategy.
+
+Replays games recorded with ALGO_RECORD (one JSON line for the config,
+then one per turn_state) through on_game_start/on_turn against the stub
+gamelib, and reports per-turn latency, total CPU time and peak memory.
+
+    ALGO_RECORD=recordings/ <engine run command>   # record live games
+    python replay_bench.py recordings/ --repeat 3
+    python replay_bench.py recordings/ --save baseline.json
+    python replay_bench.py recordings/ --baseline baseline.json --tolerance 0.15
+
+With --baseline the exit status is 1 when p95 turn latency regressed by
+more than the tolerance, so it can gate a deploy.
+"""
+import argparse
+import gc
+import glob
+import importlib
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def install_stub():
+    """Make `import gamelib` resolve to gamelib_stub"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sys.modules['gamelib'] = importlib.import_module('gamelib_stub')
+
+
+def load_recording(path):
+    """(config, [turn_state, ...]) from a recording file"""
+    config, turns = None, []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get('type') == 'config':
+                config = entry['config']
+            elif entry.get('type') == 'turn':
+                turns.append(entry['state'])
+    if config is None:
+        raise ValueError(f'{path} has no config line')
+    return config, turns
+
+
+def find_recordings(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.jsonl'))))
+        else:
+            files.append(path)
+    return files
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+def replay(algo_module, config, turns):
+    """Run one recorded game; returns (start_ms, [turn_ms], cpu_s)"""
+    cpu = time.process_time()
+    start = time.perf_counter()
+    algo = algo_module.AlgoStrategy()
+    algo.on_game_start(json.loads(json.dumps(config)))
+    start_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for state in turns:
+        tick = time.perf_counter()
+        algo.on_turn(state)
+        latencies.append((time.perf_counter() - tick) * 1000)
+    if hasattr(algo, 'on_game_end'):
+        algo.on_game_end()
+    return start_ms, latencies, time.process_time() - cpu
+
+
+def summarize(latencies):
+    return {
+        'turns': len(latencies),
+        'mean_ms': round(sum(latencies) / max(1, len(latencies)), 3),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'max_ms': round(max(latencies, default=0.0), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded games through AlgoStrategy and time them')
+    parser.add_argument('recordings', nargs='+', help='recording files or directories of *.jsonl')
+    parser.add_argument('--module', default='realpython_algo', help='module that defines AlgoStrategy')
+    parser.add_argument('--repeat', type=int, default=1, help='replays of each recording')
+    parser.add_argument('--trace-memory', action='store_true', help='track Python peak memory with tracemalloc (slower)')
+    parser.add_argument('--real-gamelib', action='store_true', help='use the installed gamelib instead of the stub')
+    parser.add_argument('--log-level', default='off', help='ALGO_LOG_LEVEL for the replayed algo')
+    parser.add_argument('--csv', help='write every turn latency to this CSV')
+    parser.add_argument('--save', help='write the summary JSON here')
+    parser.add_argument('--baseline', help='summary JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed p95 slowdown vs baseline')
+    args = parser.parse_args(argv)
+    if args.trace_memory and args.baseline:
+        parser.error('--trace-memory slows every turn; compare against a baseline without it')
+
+    # Replays must not touch shared memory files or spawn workers
+    os.environ.setdefault('NO_PERSIST', '1')
+    os.environ.setdefault('TIMING_REPORT', '0')
+    os.environ.setdefault('ROLLOUT_WORKERS', '0')
+    os.environ['ALGO_LOG_LEVEL'] = args.log_level
+    os.environ.pop('ALGO_RECORD', None)
+    if not args.real_gamelib:
+        install_stub()
+    algo_module = importlib.import_module(args.module)
+
+    files = find_recordings(args.recordings)
+    if not files:
+        parser.error('no recordings found')
+
+    if args.trace_memory:
+        tracemalloc.start()
+    all_latencies, rows, cpu_total, start_times = [], [], 0.0, []
+    for path in files:
+        config, turns = load_recording(path)
+        for run in range(args.repeat):
+            gc.collect()
+            start_ms, latencies, cpu = replay(algo_module, config, turns)
+            start_times.append(start_ms)
+            cpu_total += cpu
+            all_latencies.extend(latencies)
+            rows.extend((os.path.basename(path), run, turn, ms) for turn, ms in enumerate(latencies))
+            stats = summarize(latencies)
+            print(f'{os.path.basename(path)} #{run}: {stats["turns"]} turns, '
+                  f'p50 {stats["p50_ms"]:.2f}ms p95 {stats["p95_ms"]:.2f}ms max {stats["max_ms"]:.2f}ms, '
+                  f'cpu {cpu:.2f}s, start {start_ms:.1f}ms')
+
+    summary = summarize(all_latencies)
+    summary.update({
+        'games': len(files) * args.repeat,
+        'cpu_s': round(cpu_total, 3),
+        'start_p50_ms': round(percentile(start_times, 0.50), 3),
+        'peak_rss_mb': None if peak_rss_mb() is None else round(peak_rss_mb(), 1),
+    })
+    if args.trace_memory:
+        summary['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024.0 * 1024.0), 2)
+        tracemalloc.stop()
+    print(json.dumps(summary, indent=2))
+
+    if args.csv:
+        with open(args.csv, 'w') as f:
+            f.write('recording,run,turn,ms\n')
+            f.writelines(f'{name},{run},{turn},{ms:.4f}\n' for name, run, turn, ms in rows)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        limit = baseline['p95_ms'] * (1.0 + args.tolerance)
+        if summary['p95_ms'] > limit:
+            print(f'REGRESSION: p95 {summary["p95_ms"]:.2f}ms > {limit:.2f}ms '
+                  f'(baseline {baseline["p95_ms"]:.2f}ms +{args.tolerance:.0%})')
+            return 1
+        print(f'OK: p95 {summary["p95_ms"]:.2f}ms within {limit:.2f}ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Shared fixtures: import the algo against gamelib_stub when gamelib is missing"""
+import copy
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+try:
+    import gamelib  # noqa: F401
+except ImportError:
+    sys.modules['gamelib'] = importlib.import_module('gamelib_stub')
+
+import local_engine  # noqa: E402
+import realpython_algo  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def strategy():
+    """An AlgoStrategy after on_game_start, which also binds the unit shorthands"""
+    algo = realpython_algo.AlgoStrategy()
+    config = copy.deepcopy(local_engine.DEFAULT_CONFIG)
+    config.update(local_engine.SELF_PLAY_OVERRIDES)
+    algo.on_game_start(config)
+    yield algo
+    algo.on_game_end()
+
+
+@pytest.fixture
+def specs(strategy):
+    return strategy.unit_specs
+
+
+def place(board, player, code, x, y, hp=None, upgraded=False, specs=None):
+    """Put a structure on a BoardIndex the way from_turn_state would"""
+    spec = (specs or realpython_algo._default_specs())[code]
+    prefix = 'upgraded_' if upgraded else ''
+    board.owner[x, y] = player
+    board.unit_type[x, y] = code
+    board.max_hp[x, y] = spec[prefix + 'hp']
+    board.hp[x, y] = spec[prefix + 'hp'] if hp is None else hp
+    board.damage[x, y] = spec[prefix + 'damage']
+    board.upgraded[x, y] = upgraded
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import realpython_algo as algo
+from realpython_algo import SUPPORT_CODE, TURRET_CODE, WALL_CODE, BoardIndex, BoardTracker
+
+from conftest import place
+
+
+def random_board(rng, specs, count=60):
+    board = BoardIndex()
+    arena = algo.MapGeometry.get(28, 28).arena
+    cells = np.argwhere(arena)
+    for x, y in cells[rng.choice(len(cells), count, replace=False)]:
+        code = int(rng.choice((WALL_CODE, SUPPORT_CODE, TURRET_CODE)))
+        upgraded = bool(rng.random() < 0.3)
+        place(board, int(y >= 14), code, int(x), int(y), upgraded=upgraded, specs=specs)
+        board.hp[x, y] *= rng.uniform(0.1, 1.0)
+    return board
+
+
+def test_tracker_builds_records_with_the_strategy_specs(strategy, specs):
+    tracker = strategy.board_tracker
+    assert tracker.specs is specs
+    board = random_board(np.random.default_rng(0), specs)
+    tracker.update(board)
+    records = board.records(specs)
+    assert board._records[0] is specs
+    assert board.records(specs) is records
+
+
+@pytest.mark.parametrize('player', [0, 1])
+def test_damaged_structures_matches_records(strategy, specs, player):
+    board = random_board(np.random.default_rng(player), specs)
+    types = [algo.TURRET, algo.WALL]
+    expected = [(r.x, r.y, r.unit_type) for r in board.records(specs)
+                if r.owner == player and r.unit_type in types and (r.y < 14) == (player == 0)
+                and r.hp / max(1.0, r.max_hp) < 0.4]
+    assert expected
+    assert list(board.damaged_structures(player, 0.4, types)) == expected
+
+
+def _mutate(rng, board, specs):
+    """Next turn's board: some structures removed, damaged, upgraded or added"""
+    board = BoardIndex.from_bytes(board.to_bytes())
+    arena = algo.MapGeometry.get(28, 28).arena
+    occupied = np.argwhere(board.owner >= 0)
+    for x, y in occupied[rng.random(len(occupied)) < 0.1]:
+        board.owner[x, y] = board.unit_type[x, y] = -1
+        board.hp[x, y] = board.max_hp[x, y] = board.damage[x, y] = 0
+        board.upgraded[x, y] = False
+    for x, y in occupied[rng.random(len(occupied)) < 0.2]:
+        if board.owner[x, y] >= 0:
+            board.hp[x, y] = max(1.0, board.hp[x, y] - rng.uniform(1, 20))
+    for x, y in occupied[rng.random(len(occupied)) < 0.05]:
+        if board.owner[x, y] >= 0 and not board.upgraded[x, y]:
+            place(board, int(board.owner[x, y]), int(board.unit_type[x, y]), x, y, upgraded=True, specs=specs)
+    empty = np.argwhere(arena & (board.owner < 0))
+    for x, y in empty[rng.choice(len(empty), 8, replace=False)]:
+        place(board, int(y >= 14), int(rng.choice((WALL_CODE, SUPPORT_CODE, TURRET_CODE))), x, y, specs=specs)
+    return board
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_incremental_hash_matches_full_rehash(specs, seed):
+    rng = np.random.default_rng(seed)
+    tracker = BoardTracker(specs=specs)
+    board = random_board(rng, specs)
+    kinds = set()
+    for _ in range(30):
+        kinds.update(kind for kind, *_ in tracker.update(board))
+        incremental = board.hashes()
+        scratch = algo.BoardHash.of(BoardIndex.from_bytes(board.to_bytes()))
+        assert (incremental.layout, incremental.structures, incremental.state) == \
+            (scratch.layout, scratch.structures, scratch.state)
+        assert incremental.layout == algo._layout_hash(board.owner >= 0)
+        board = _mutate(rng, board, specs)
+    assert kinds == {'added', 'removed', 'damaged', 'upgraded'}
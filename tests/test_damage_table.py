@@ -0,0 +1,36 @@
+import pytest
+
+import realpython_algo as algo
+from realpython_algo import SCOUT_CODE, TURRET_CODE, ActionSimulator, BoardIndex, DamageField, \
+    ExpectedDamageTable, PathFinder
+
+from conftest import place
+
+
+def build_table(board, specs, mp=10):
+    finder = PathFinder()
+    finder.set_board(board)
+    field = DamageField().build(board, 1, specs)
+    return ExpectedDamageTable.build(board, specs, field, finder.all_paths(0), mp)
+
+
+def test_open_lane_matches_simulated_value(strategy, specs):
+    table = build_table(BoardIndex(), specs)
+    assert table.lookup([13, 0], SCOUT_CODE, 10) == (10.0, 10.0, 0.0)
+    assert table.value([13, 0], SCOUT_CODE, 10) == 20.0
+
+
+@pytest.mark.parametrize('turrets, upgraded', [(((24, 14),), True), (((24, 14),), False),
+                                               (((23, 15),), True), (((24, 14), (21, 16)), False)])
+def test_table_value_tracks_the_simulator(strategy, specs, turrets, upgraded):
+    """Within two breaches of the simulated value, and the same attack decision"""
+    board = BoardIndex()
+    for x, y in turrets:
+        place(board, 1, TURRET_CODE, x, y, upgraded=upgraded, specs=specs)
+    table = build_table(board, specs).value([13, 0], SCOUT_CODE, 10)
+    finder = PathFinder()
+    finder.set_board(board)
+    simulated = ActionSimulator(board, specs, finder).simulate([(algo.SCOUT, [13, 0], 10)]).value(0)
+    assert table == pytest.approx(simulated, abs=4.0)
+    threshold = strategy.thresholds['attack_min_ev']
+    assert (table >= threshold) == (simulated >= threshold)
@@ -0,0 +1,41 @@
+import json
+
+from realpython_algo import MemoryStore
+
+
+def test_migrate_json_skips_the_file_once_migrated(tmp_path):
+    legacy = tmp_path / 'strategy_memory.json'
+    legacy.write_text(json.dumps({'attack_history': {'scout_flood': {'attempts': 3, 'successes': 1}}}))
+    store = MemoryStore(str(tmp_path / 'memory.db'))
+    assert store.migrate_json(str(legacy), 'opp')
+    assert store.load('opp')['attack_history']['scout_flood']['attempts'] == 3
+    
+    # Later startups must not read the file at all
+    legacy.write_text('not json')
+    assert not MemoryStore(str(tmp_path / 'memory.db')).migrate_json(str(legacy), 'opp')
+    store.close()
+
+
+def test_concurrent_writers_keep_both_games(tmp_path):
+    path = str(tmp_path / 'memory.db')
+    seed = MemoryStore(path)
+    seed.append('opp', {'attack_history': {'scout_flood': {'attempts': 2, 'successes': 1}}})
+    seed.close()
+    
+    # Both games load the same history before either saves
+    first, second = MemoryStore(path), MemoryStore(path)
+    a, b = first.load('opp'), second.load('opp')
+    a['attack_history']['scout_flood']['attempts'] += 1
+    a['breach_analytics'] = {'[13, 27]': {'count': 1}}
+    b['attack_history']['scout_flood']['attempts'] += 2
+    b['attack_history']['scout_flood']['successes'] += 1
+    b['attack_history']['demo_breach'] = {'attempts': 1, 'successes': 0}
+    first.append('opp', a)
+    second.append('opp', b)
+    first.close()
+    second.close()
+    
+    merged = MemoryStore(path).load('opp')
+    assert merged['attack_history']['scout_flood'] == {'attempts': 5, 'successes': 2}
+    assert merged['attack_history']['demo_breach'] == {'attempts': 1, 'successes': 0}
+    assert merged['breach_analytics'] == {'[13, 27]': {'count': 1}}
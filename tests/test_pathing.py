@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from realpython_algo import BOTTOM_LEFT, BOTTOM_RIGHT, TOP_LEFT, TOP_RIGHT, PathFinder
+
+EDGES = (TOP_RIGHT, TOP_LEFT, BOTTOM_LEFT, BOTTOM_RIGHT)
+
+
+def _paths(finder):
+    return {start: finder.path(start) for player in (0, 1) for start in finder.spawn_cells(player)}
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_repair_matches_full_rebuild(seed):
+    rng = np.random.default_rng(seed)
+    finder = PathFinder()
+    arena = finder.geometry.arena
+    cells = np.argwhere(arena)
+    blocked = (rng.random(arena.shape) < 0.2) & arena
+    finder.set_blocked(blocked)
+    for edge in EDGES:
+        finder._edge_field(edge)
+    
+    for _ in range(40):
+        flips = cells[rng.choice(len(cells), rng.integers(1, finder.repair_limit + 1), replace=False)]
+        blocked = blocked.copy()
+        blocked[flips[:, 0], flips[:, 1]] ^= True
+        finder.set_blocked(blocked)
+        rebuilt = PathFinder()
+        rebuilt.set_blocked(blocked)
+        for edge in EDGES:
+            assert edge in finder._entry['fields'], 'field was not carried over by repair'
+            assert finder._edge_field(edge) == rebuilt._edge_field(edge)
+        
+        repaired_paths, rebuilt_paths = _paths(finder), _paths(rebuilt)
+        for start, path in rebuilt_paths.items():
+            other = repaired_paths[start]
+            assert (path is None) == (other is None)
+            if path is not None:
+                assert other.cells == path.cells and other.reached == path.reached
+
+
+def test_hypothetical_restores_layout():
+    finder = PathFinder()
+    blocked = finder.geometry.arena.copy()
+    blocked[:, 15:] = False
+    blocked[:, :14] = False
+    blocked[13, 14] = False
+    finder.set_blocked(blocked)
+    before = finder.spawn_distances(0)
+    with finder.hypothetical([(13, 14)]):
+        assert finder.spawn_distances(0)[1] > before[1]
+    assert finder.spawn_distances(0) == before
+    assert np.array_equal(finder._blocked_array, blocked)
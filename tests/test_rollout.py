@@ -0,0 +1,86 @@
+import copy
+import multiprocessing
+import sys
+
+import pytest
+
+import local_engine
+
+import realpython_algo as algo
+from realpython_algo import TURRET_CODE, BoardIndex, RolloutPool
+
+from conftest import place
+
+
+@pytest.fixture
+def worker_path(tmp_path, monkeypatch):
+    """Let spawned workers import the algo when gamelib is only the stub"""
+    if getattr(sys.modules['gamelib'], '__name__', '') == 'gamelib_stub':
+        package = tmp_path / 'gamelib'
+        package.mkdir()
+        (package / '__init__.py').write_text('import sys\nimport gamelib_stub\nsys.modules[__name__] = gamelib_stub\n')
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+
+@pytest.fixture
+def pool(strategy, specs, worker_path):
+    pool = RolloutPool(2, specs, deadline=30.0)
+    yield pool
+    pool.close()
+
+
+def plans():
+    return [[(algo.SCOUT, [13, 0], 10)], [(algo.SCOUT, [14, 0], 6)], [(algo.DEMOLISHER, [12, 1], 4)]]
+
+
+def test_pool_results_match_in_process_simulation(pool, specs):
+    assert pool.warm() == 2
+    board = BoardIndex()
+    place(board, 1, TURRET_CODE, 24, 14, upgraded=True, specs=specs)
+    finder = algo.PathFinder()
+    finder.set_board(board)
+    simulator = algo.ActionSimulator(board, specs, finder)
+    expected = [simulator.simulate(plan) for plan in plans()]
+    results = pool.evaluate(board, plans())
+    assert [(r.breaches, r.structure_damage) for r in results] == \
+        [(r.breaches, r.structure_damage) for r in expected]
+
+
+def test_missed_deadline_returns_none(pool, specs):
+    pool.warm()
+    board = BoardIndex()
+    place(board, 1, TURRET_CODE, 24, 14, specs=specs)
+    late = pool.evaluate(board, plans() * 20, deadline=0.0)
+    assert late.count(None) > 0 and pool.stale > 0
+    
+    fresh = pool.evaluate(board, plans(), deadline=5.0)
+    assert all(result is not None for result in fresh)
+    assert pool.batch.value == 0
+
+
+def test_workers_skip_jobs_from_retired_batches(strategy, specs):
+    batch = multiprocessing.Value('q', 0, lock=False)
+    shorthands = (algo.WALL, algo.SUPPORT, algo.TURRET, algo.SCOUT, algo.DEMOLISHER, algo.INTERCEPTOR)
+    algo._rollout_worker_init(shorthands, specs, 28, 28, batch)
+    board = BoardIndex()
+    key, blob = board.hashes().state, board.to_bytes()
+    batch.value = 2
+    assert algo._rollout_worker_run(1, key, blob, plans()[0]) is None
+    assert algo._rollout_worker_run(2, key, blob, plans()[0]).breaches == [10, 0]
+    batch.value = 0
+    assert algo._rollout_worker_run(2, key, blob, plans()[0]) is None
+
+
+def test_game_start_warms_the_pool_for_the_first_turn(worker_path):
+    config = copy.deepcopy(local_engine.DEFAULT_CONFIG)
+    config.update(local_engine.SELF_PLAY_OVERRIDES, rolloutWorkers=2)
+    strategy = algo.AlgoStrategy()
+    strategy.on_game_start(config)
+    try:
+        pool = strategy.rollout_pool
+        assert pool is not None and pool.workers == 2
+        results = pool.evaluate(BoardIndex(), plans(), deadline=pool.deadline)
+        assert all(result is not None for result in results)
+    finally:
+        strategy.on_game_end()
+    assert strategy.rollout_pool is None
@@ -0,0 +1,70 @@
+import pytest
+
+import realpython_algo as algo
+from realpython_algo import TURRET_CODE, ActionSimulator, BoardIndex, PathFinder
+
+from conftest import place
+
+
+def simulate(board, specs, plan):
+    finder = PathFinder()
+    finder.set_board(board)
+    return ActionSimulator(board, specs, finder).simulate(plan)
+
+
+def test_open_lane_scouts_all_breach(strategy, specs):
+    result = simulate(BoardIndex(), specs, [(algo.SCOUT, [13, 0], 10)])
+    assert result.breaches == [10, 0]
+    assert result.structure_damage == [0.0, 0.0]
+    assert result.destroyed == []
+
+
+def test_turrets_on_the_lane_cost_scouts(strategy, specs):
+    board = BoardIndex()
+    for x, y in ((23, 14), (24, 14), (22, 15), (23, 15), (24, 15), (21, 16)):
+        place(board, 1, TURRET_CODE, x, y, upgraded=True, specs=specs)
+    open_lane = simulate(BoardIndex(), specs, [(algo.SCOUT, [13, 0], 10)])
+    defended = simulate(board, specs, [(algo.SCOUT, [13, 0], 10)])
+    assert defended.breaches[0] < open_lane.breaches[0]
+    assert defended.value(0) < open_lane.value(0)
+
+
+def test_simulation_is_deterministic_and_leaves_the_finder_alone(strategy, specs):
+    board = BoardIndex()
+    place(board, 1, TURRET_CODE, 13, 16, specs=specs)
+    finder = PathFinder()
+    finder.set_board(board)
+    layout = finder._layout
+    simulator = ActionSimulator(board, specs, finder)
+    plan = [(algo.DEMOLISHER, [13, 0], 3), (algo.SCOUT, [14, 0], 5)]
+    first, second = simulator.simulate(plan), simulator.simulate(plan)
+    assert (first.breaches, first.structure_damage, first.destroyed) == \
+        (second.breaches, second.structure_damage, second.destroyed)
+    assert finder._layout == layout
+
+
+@pytest.mark.parametrize('turrets', [(), ((24, 14),)])
+def test_breaching_lanes_clear_every_attack_threshold(strategy, specs, turrets):
+    """attack_min_ev is on the SimResult.value scale, so partial breaches clear it"""
+    board = BoardIndex()
+    for x, y in turrets:
+        place(board, 1, TURRET_CODE, x, y, upgraded=True, specs=specs)
+    result = simulate(board, specs, [(algo.SCOUT, [13, 0], 10)])
+    assert result.breaches[0] > 0
+    value = result.value(0)
+    assert value >= strategy.thresholds['attack_min_ev']
+    for mode, overrides in strategy.mode_thresholds.items():
+        assert value >= overrides['attack_min_ev'], mode
+
+
+@pytest.mark.parametrize('name', ['scout_flood', 'demo_breach', 'interceptor_rush', 'mixed_assault', 'pincer_attack'])
+def test_no_simulator_or_table_means_no_attack(strategy, monkeypatch, name):
+    def broken():
+        raise RuntimeError('simulator unavailable')
+    
+    monkeypatch.setattr(strategy, '_simulator', broken)
+    monkeypatch.setattr(strategy, 'board', BoardIndex())
+    monkeypatch.setattr(strategy.path_engine, 'table', None)
+    plan = [(algo.SCOUT, [13, 0], 20)]
+    value = strategy._estimate_attack_damage_from_play(None, name, {'unit': algo.SCOUT}, 20, plan)
+    assert value < min(overrides['attack_min_ev'] for overrides in strategy.mode_thresholds.values())
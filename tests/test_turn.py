@@ -0,0 +1,53 @@
+import copy
+
+import local_engine
+import realpython_algo
+
+
+def test_turn_is_submitted_when_the_view_cannot_be_built(strategy):
+    sent = []
+    strategy.command_sink = lambda build, deploy: sent.append((build, deploy))
+    try:
+        strategy.on_turn('{"turnInfo": ')
+    finally:
+        strategy.command_sink = None
+    assert sent == [([], [])]
+
+
+def test_each_strategy_logs_to_its_own_buffer():
+    first, second = realpython_algo.AlgoStrategy(), realpython_algo.AlgoStrategy()
+    assert first.log is not second.log
+    first.log.set_level('off')
+    second.log.set_level('info')
+    second.log.info('second only')
+    assert 'second only' in second.log.buffer
+    assert 'second only' not in first.log.buffer
+
+
+def test_memory_writer_reports_failures_to_its_log():
+    log = realpython_algo.TurnLog('error')
+    
+    def fail(snapshot):
+        raise OSError('disk full')
+    
+    writer = realpython_algo.MemoryWriter(fail, log)
+    writer.submit({})
+    writer.close()
+    assert any('disk full' in line for line in log.buffer)
+
+
+def test_headless_game_start_logs_nothing(monkeypatch):
+    written = []
+    monkeypatch.setattr(realpython_algo.gamelib, 'debug_write', written.append)
+    config = copy.deepcopy(local_engine.DEFAULT_CONFIG)
+    config.update(local_engine.SELF_PLAY_OVERRIDES)
+    assert config['logLevel'] == 'off'
+    algo = realpython_algo.AlgoStrategy()
+    algo.on_game_start(config)
+    try:
+        assert algo.log.buffer == []
+        algo.log.flush()
+        assert written == []
+    finally:
+        algo.on_game_end()
+    assert written == []
@@ -0,0 +1,274 @@
+"""Parallel self-play tournament for AlgoStrategy settings.
+
+Every pair of entrants plays --games games per side, fanned out over a
+process pool with one game per task, so throughput grows with the
+number of cores. An entrant is a name plus config overrides for
+on_game_start (forcedOpening, thresholdOverrides, ...). The default
+entrants are the four openings of _init_strategy_library.
+
+    python tournament.py --games 20                      # openings round robin
+    python tournament.py --vary attack_min_ev=2,3,4      # one threshold, three values
+    python tournament.py --entrants entrants.json --out results.json
+    python tournament.py --games 50 --write-rates opening_win_rates.json
+
+Games run on local_engine.py by default. --engine-cmd runs any other
+engine instead: the command is formatted with {p1}, {p2} (paths to each
+entrant's overrides JSON, for the algo's ALGO_OVERRIDES) and {seed},
+and must print the engine's final JSON line (endStats.winner 1 or 2).
+
+Scores count a draw as half a win and come with 95% Wilson intervals.
+--write-rates stores each opening's score, which AlgoStrategy loads
+from OPENING_RATES_FILE in place of its hard-coded win_rate values.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+OPENINGS = ('fortress_control', 'aggressive_tempo', 'economic_control', 'adaptive_pressure')
+
+# One engine thread per game; the pool supplies the parallelism
+_SINGLE_THREAD_ENV = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def wilson_interval(score, games, z=1.96):
+    """95% Wilson score interval for score successes out of games"""
+    if games <= 0:
+        return 0.0, 1.0
+    p = score / games
+    denom = 1.0 + z * z / games
+    centre = (p + z * z / (2 * games)) / denom
+    spread = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def opening_entrants():
+    return [{'name': name, 'overrides': {'forcedOpening': name}} for name in OPENINGS]
+
+
+def vary_entrants(spec):
+    """Entrants from 'key=v1,v2,...' over one threshold"""
+    key, _, values = spec.partition('=')
+    if not values:
+        raise ValueError(f'--vary expects key=v1,v2,... not {spec!r}')
+    return [{'name': f'{key}={value}', 'overrides': {'thresholdOverrides': {key: float(value)}}}
+            for value in values.split(',')]
+
+
+def schedule(entrants, games, seed):
+    """One task per game: every pair plays `games` games on each side"""
+    tasks = []
+    for a, b in itertools.combinations(range(len(entrants)), 2):
+        for _ in range(games):
+            for swap in (False, True):
+                p1, p2 = (b, a) if swap else (a, b)
+                tasks.append({'id': len(tasks), 'pair': (a, b), 'players': (p1, p2),
+                              'overrides': (entrants[p1]['overrides'], entrants[p2]['overrides']),
+                              'seed': seed + len(tasks)})
+    return tasks
+
+
+# ─────────────── Workers ───────────────
+_WORKER = {}
+
+
+def engine_options(engine_cmd=None, config=None, max_turns=100, module='realpython_algo'):
+    return {'cmd': engine_cmd, 'config': config, 'max_turns': max_turns, 'module': module}
+
+
+def make_pool(workers, engine):
+    """Process pool of game workers; tasks are dicts with 'overrides' and 'seed'"""
+    for name in _SINGLE_THREAD_ENV:
+        os.environ.setdefault(name, '1')
+    os.environ.setdefault('ALGO_LOG_LEVEL', 'off')
+    return ProcessPoolExecutor(workers, initializer=_worker_init, initargs=(engine,))
+
+
+def _worker_init(engine):
+    os.environ.setdefault('ALGO_LOG_LEVEL', 'off')
+    _WORKER['engine'] = engine
+    if engine['cmd'] is None:
+        import local_engine  # imported once per worker, not once per game
+        _WORKER['local_engine'] = local_engine
+
+
+def _play(task):
+    """Play one scheduled game; side is the winning player (0, 1) or None"""
+    engine = _WORKER['engine']
+    started = time.perf_counter()
+    health = None
+    try:
+        if engine['cmd'] is None:
+            result = _WORKER['local_engine'].play_game(
+                config=engine['config'], seed=task['seed'], max_turns=engine['max_turns'],
+                algo_module=engine['module'], overrides=task['overrides'])
+            side, turns, health = result.winner, result.turns, list(result.health)
+        else:
+            side, turns = _play_external(engine['cmd'], task['overrides'], task['seed'])
+        error = None
+    except Exception as e:
+        side, turns, error = None, 0, f'{type(e).__name__}: {e}'
+    winner = None if side is None or 'players' not in task else task['players'][side]
+    return dict(task, side=side, winner=winner, turns=turns, health=health, error=error,
+                seconds=time.perf_counter() - started)
+
+
+def _play_external(cmd, overrides, seed):
+    """Run an external engine command; returns (winning side 0/1 or None, turns)"""
+    with tempfile.TemporaryDirectory(prefix='tournament-') as workdir:
+        paths = []
+        for name, player_overrides in zip(('p1', 'p2'), overrides):
+            paths.append(os.path.join(workdir, f'{name}.json'))
+            with open(paths[-1], 'w') as f:
+                json.dump(dict(player_overrides, noPersistence=True, timingReport=False), f)
+        command = cmd.format(p1=shlex.quote(paths[0]), p2=shlex.quote(paths[1]), seed=seed)
+        output = subprocess.run(command, shell=True, check=True, capture_output=True, text=True).stdout
+    for line in reversed(output.splitlines()):
+        try:
+            final = json.loads(line)
+        except ValueError:
+            continue
+        stats = final.get('endStats', final)
+        winner = stats.get('winner')
+        turns = stats.get('turns', 0)
+        return (int(winner) - 1 if winner in (1, 2) else None), turns
+    raise RuntimeError('engine printed no JSON result')
+
+
+# ─────────────── Aggregation ───────────────
+def aggregate(entrants, results):
+    """Per-entrant and per-pair scores with Wilson intervals"""
+    def tally():
+        return {'games': 0, 'wins': 0, 'losses': 0, 'draws': 0}
+
+    totals = [tally() for _ in entrants]
+    pairs = {}
+    for result in results:
+        if result['error']:
+            continue
+        a, b = result['pair']
+        pair = pairs.setdefault((a, b), tally())
+        pair['games'] += 1
+        for index in (a, b):
+            totals[index]['games'] += 1
+        if result['winner'] is None:
+            pair['draws'] += 1
+            totals[a]['draws'] += 1
+            totals[b]['draws'] += 1
+        else:
+            loser = b if result['winner'] == a else a
+            totals[result['winner']]['wins'] += 1
+            totals[loser]['losses'] += 1
+            pair['wins' if result['winner'] == a else 'losses'] += 1
+
+    def scored(stats):
+        score = stats['wins'] + 0.5 * stats['draws']
+        rate = score / stats['games'] if stats['games'] else 0.0
+        low, high = wilson_interval(score, stats['games'])
+        return dict(stats, win_rate=round(rate, 4), ci=[round(low, 4), round(high, 4)])
+
+    return {
+        'entrants': [dict(scored(stats), name=entrant['name'], overrides=entrant['overrides'])
+                     for entrant, stats in zip(entrants, totals)],
+        'pairs': [dict(scored(stats), first=entrants[a]['name'], second=entrants[b]['name'])
+                  for (a, b), stats in sorted(pairs.items())],
+        'errors': sum(1 for result in results if result['error']),
+    }
+
+
+def opening_rates(summary):
+    """{'openings': {name: stats}} for entrants that differ only in their forced opening"""
+    openings = {}
+    for entrant in summary['entrants']:
+        overrides = entrant['overrides']
+        if set(overrides) == {'forcedOpening'} and entrant['games']:
+            openings[overrides['forcedOpening']] = {key: entrant[key] for key in ('win_rate', 'games', 'ci')}
+    return {'openings': openings, 'generated': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def run_tournament(entrants, games=10, seed=0, workers=None, max_turns=100, config=None,
+                   module='realpython_algo', engine_cmd=None, progress=None):
+    """Play the round robin over a process pool and return the aggregated summary"""
+    engine = engine_options(engine_cmd, config, max_turns, module)
+    tasks = schedule(entrants, games, seed)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    started = time.perf_counter()
+    results = []
+    with make_pool(workers, engine) as pool:
+        for result in pool.map(_play, tasks, chunksize=max(1, len(tasks) // (workers * 8))):
+            results.append(result)
+            if progress:
+                progress(result, len(results), len(tasks))
+    elapsed = time.perf_counter() - started
+    summary = aggregate(entrants, results)
+    summary.update(workers=workers, seconds=round(elapsed, 2),
+                   games_per_hour=round(len(results) / max(elapsed, 1e-9) * 3600))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Round-robin self-play tournament over a process pool')
+    parser.add_argument('--games', type=int, default=10, help='games per pair and side')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='processes (default: all cores)')
+    parser.add_argument('--max-turns', type=int, default=100)
+    parser.add_argument('--config', help='game config JSON for the local engine')
+    parser.add_argument('--module', default='realpython_algo', help='module that defines AlgoStrategy')
+    parser.add_argument('--entrants', help='JSON list of {"name": ..., "overrides": {...}}')
+    parser.add_argument('--vary', help='threshold sweep as key=v1,v2,...')
+    parser.add_argument('--engine-cmd', help='external engine command with {p1} {p2} {seed} placeholders')
+    parser.add_argument('--out', help='write the full summary JSON here')
+    parser.add_argument('--write-rates', metavar='PATH', help='write opening win rates for AlgoStrategy')
+    args = parser.parse_args(argv)
+
+    if args.entrants:
+        with open(args.entrants) as f:
+            entrants = json.load(f)
+    elif args.vary:
+        entrants = vary_entrants(args.vary)
+    else:
+        entrants = opening_entrants()
+    if len(entrants) < 2:
+        parser.error('a tournament needs at least two entrants')
+    config = None
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+
+    def progress(result, done, total):
+        if result['error']:
+            print(f'game {result["id"]} failed: {result["error"]}', file=sys.stderr)
+        if done % max(1, total // 20) == 0 or done == total:
+            print(f'{done}/{total} games', file=sys.stderr)
+
+    summary = run_tournament(entrants, args.games, args.seed, args.workers, args.max_turns,
+                             config, args.module, args.engine_cmd, progress)
+
+    width = max(len(entrant['name']) for entrant in summary['entrants'])
+    for entrant in sorted(summary['entrants'], key=lambda e: -e['win_rate']):
+        print(f'{entrant["name"]:<{width}}  {entrant["win_rate"]:6.1%}  '
+              f'[{entrant["ci"][0]:.1%}, {entrant["ci"][1]:.1%}]  '
+              f'{entrant["wins"]}W {entrant["losses"]}L {entrant["draws"]}D')
+    print(f'{sum(p["games"] for p in summary["pairs"])} games on {summary["workers"]} workers '
+          f'in {summary["seconds"]:.1f}s ({summary["games_per_hour"]} games/hour), {summary["errors"]} errors')
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(summary, f, indent=2)
+    if args.write_rates:
+        with open(args.write_rates, 'w') as f:
+            json.dump(opening_rates(summary), f, indent=2)
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""Offline tuning of AlgoStrategy's decision thresholds by self-play.
+
+A diagonal evolution strategy (CMA-ES without the covariance matrix)
+searches the tunable entries of `thresholds` and the per-mode values
+`_adapt_thresholds` applies. Each generation samples antithetic
+candidate pairs around the mean. Every candidate, and the mean itself,
+plays --games games per side against a fixed reference profile. All of
+a generation's games go to one process pool at once. Every candidate
+uses the same seeds, so they are compared on the same games.
+
+Finished games are appended to a cache keyed by the candidate's
+parameter vector, the reference and the seed. A repeated vector reuses
+its games, as does a rerun of the tuner. The profile is rewritten after
+every generation together with the search state. --resume continues
+from that state, and AlgoStrategy loads the same file as its tuned
+profile (THRESHOLD_PROFILE_FILE).
+
+    python tune_thresholds.py --generations 10 --population 8 --games 4
+    python tune_thresholds.py --resume --generations 10
+    python tune_thresholds.py --params press.attack_min_ev,balanced.attack_min_ev
+
+Fitness is the candidate's score (wins plus half the draws, per game)
+plus MARGIN_WEIGHT times the mean end-of-game health difference as a
+fraction of starting HP, which separates candidates that draw.
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import tournament
+
+PROFILE_FILE = 'tuned_thresholds.json'
+CACHE_FILE = 'tune_cache.jsonl'
+MARGIN_WEIGHT = 0.1
+MODES = ('desperate', 'defensive', 'press', 'balanced')
+
+# name: (low, high, step); 'mode.key' names address mode_thresholds
+SPACE = {
+    'upgrade_sp_guard': (2, 12, 1),
+    'emergency_hp_loss': (1, 8, 1),
+    'all_in_threshold': (10, 40, 1),
+}
+for _mode in MODES:
+    SPACE[f'{_mode}.defense_sp_ratio'] = (0.40, 0.95, 0.01)
+    SPACE[f'{_mode}.attack_min_mp'] = (4, 16, 1)
+    # SimResult.value scale (2 per breach): half a breach up to five breaches
+    SPACE[f'{_mode}.attack_min_ev'] = (1.0, 10.0, 0.25)
+
+
+def default_values(module='realpython_algo'):
+    """Current hand-picked values of every SPACE parameter"""
+    import local_engine  # noqa: F401 -- installs the gamelib stub when gamelib is missing
+    algo = importlib.import_module(module).AlgoStrategy()
+    values = {}
+    for name in SPACE:
+        mode, _, key = name.rpartition('.')
+        values[name] = algo.mode_thresholds[mode][key] if mode else algo.thresholds[key]
+    return values
+
+
+def to_profile(values):
+    """AlgoStrategy thresholdProfile dict for parameter values"""
+    profile = {'thresholds': {}, 'modes': {}}
+    for name, value in values.items():
+        mode, _, key = name.rpartition('.')
+        if mode:
+            profile['modes'].setdefault(mode, {})[key] = value
+        else:
+            profile['thresholds'][key] = value
+    return profile
+
+
+def decode(point, params, base):
+    """Normalized point in [0, 1]^d to parameter values snapped to their step"""
+    values = dict(base)
+    for name, z in zip(params, point):
+        low, high, step = SPACE[name]
+        value = low + min(1.0, max(0.0, z)) * (high - low)
+        value = round(round(value / step) * step, 6)
+        values[name] = int(value) if isinstance(step, int) else value
+    return values
+
+
+def encode(values, params):
+    return [(values[name] - SPACE[name][0]) / (SPACE[name][1] - SPACE[name][0]) for name in params]
+
+
+def vector_key(values):
+    return json.dumps(sorted(values.items()), separators=(',', ':'))
+
+
+def context_key(reference, engine):
+    """Games are only reused against the same reference profile and engine settings"""
+    blob = json.dumps([reference, engine], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+# ─────────────── Game cache ───────────────
+class GameCache:
+    """Finished games by (context, candidate vector, seed, side), appended to a JSONL file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.games = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted run
+                    self.games[(entry['context'], entry['candidate'], entry['seed'], entry['side'])] = \
+                        (entry['score'], entry['margin'])
+
+    def get(self, key):
+        return self.games.get(key)
+
+    def add(self, entries):
+        for key, outcome in entries:
+            self.games[key] = outcome
+        if self.path and entries:
+            with open(self.path, 'a') as f:
+                for (context, candidate, seed, side), (score, margin) in entries:
+                    f.write(json.dumps({'context': context, 'candidate': candidate, 'seed': seed,
+                                        'side': side, 'score': score, 'margin': margin}) + '\n')
+
+
+class Evaluator:
+    """Plays candidates against the reference on a shared pool, skipping cached games"""
+
+    def __init__(self, pool, cache, reference, engine, games, seed, starting_hp):
+        self.pool = pool
+        self.cache = cache
+        self.reference = reference
+        self.context = context_key(reference, engine)
+        self.seeds = [seed + i for i in range(games)]
+        self.starting_hp = starting_hp
+        self.played = 0
+
+    def fitness(self, candidates):
+        """[(fitness, games)] for a list of parameter dicts; one pool batch for all misses"""
+        tasks, pending = [], set()
+        for values in candidates:
+            candidate = vector_key(values)
+            overrides = {'thresholdProfile': to_profile(values)}
+            for seed in self.seeds:
+                for side in (0, 1):
+                    key = (self.context, candidate, seed, side)
+                    if self.cache.get(key) is not None or key in pending:
+                        continue
+                    pending.add(key)
+                    players = (overrides, self.reference) if side == 0 else (self.reference, overrides)
+                    tasks.append({'key': key, 'overrides': players, 'seed': seed})
+
+        finished = []
+        for result in self.pool.map(tournament._play, tasks, chunksize=max(1, len(tasks) // 64)):
+            if result['error']:
+                print(f'game failed: {result["error"]}', file=sys.stderr)
+                continue
+            side = result['key'][3]
+            score = 0.5 if result['side'] is None else float(result['side'] == side)
+            margin = 0.0
+            if result['health']:
+                margin = (result['health'][side] - result['health'][1 - side]) / self.starting_hp
+            finished.append((tuple(result['key']), (score, round(margin, 4))))
+        self.cache.add(finished)
+        self.played += len(finished)
+
+        scored = []
+        for values in candidates:
+            candidate = vector_key(values)
+            outcomes = [self.cache.get((self.context, candidate, seed, side))
+                        for seed in self.seeds for side in (0, 1)]
+            outcomes = [o for o in outcomes if o is not None]
+            if not outcomes:
+                scored.append((-math.inf, 0))
+                continue
+            score = sum(o[0] for o in outcomes) / len(outcomes)
+            margin = sum(o[1] for o in outcomes) / len(outcomes)
+            scored.append((score + MARGIN_WEIGHT * margin, len(outcomes)))
+        return scored
+
+
+# ─────────────── Search ───────────────
+def recombination_weights(mu):
+    raw = [math.log(mu + 0.5) - math.log(i + 1) for i in range(mu)]
+    total = sum(raw)
+    return [w / total for w in raw]
+
+
+def search(evaluator, params, base, mean, sigma, generations, population, rng, on_generation, first=0):
+    """Diagonal ES over normalized params; calls on_generation(state) after each generation"""
+    mu = max(1, population // 2)
+    weights = recombination_weights(mu)
+    state = None
+    for generation in range(first, first + generations):
+        points = []
+        for _ in range(max(1, population // 2)):
+            eps = [rng.gauss(0.0, 1.0) for _ in params]
+            for sign in (1.0, -1.0):
+                points.append([min(1.0, max(0.0, m + sign * s * e)) for m, s, e in zip(mean, sigma, eps)])
+        candidates = [decode(point, params, base) for point in points]
+        mean_values = decode(mean, params, base)
+        results = evaluator.fitness(candidates + [mean_values])
+        mean_fitness, mean_games = results[-1]
+
+        ranked = sorted(range(len(candidates)), key=lambda i: -results[i][0])[:mu]
+        # Recombine the snapped points so the mean moves to values that were actually played
+        selected = [encode(candidates[i], params) for i in ranked]
+        new_mean = [sum(w * x[d] for w, x in zip(weights, selected)) for d in range(len(params))]
+        spread = [math.sqrt(sum(w * (x[d] - mean[d]) ** 2 for w, x in zip(weights, selected)))
+                  for d in range(len(params))]
+        sigma = [min(0.5, max(0.02, 0.7 * s + 0.3 * sp)) for s, sp in zip(sigma, spread)]
+        mean = new_mean
+
+        state = {
+            'generation': generation,
+            'values': mean_values,
+            'fitness': mean_fitness,
+            'games': mean_games,
+            'best': {'values': candidates[ranked[0]], 'fitness': results[ranked[0]][0]},
+            'mean': dict(zip(params, mean)),
+            'sigma': dict(zip(params, sigma)),
+        }
+        on_generation(state)
+    return state
+
+
+def write_profile(path, state, params, reference_name, played):
+    """Tuned profile for AlgoStrategy plus the search state for --resume"""
+    profile = to_profile(state['values'])
+    profile.update({
+        'games': state['games'],
+        'fitness': round(state['fitness'], 4),
+        'reference': reference_name,
+        'generated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'search': {'params': params, 'mean': state['mean'], 'sigma': state['sigma'],
+                   'generation': state['generation'], 'games_played': played},
+    })
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tune AlgoStrategy thresholds with parallel self-play')
+    parser.add_argument('--generations', type=int, default=10)
+    parser.add_argument('--population', type=int, default=8, help='candidates per generation (antithetic pairs)')
+    parser.add_argument('--games', type=int, default=4, help='games per candidate and side')
+    parser.add_argument('--sigma', type=float, default=0.15, help='initial step size in normalized units')
+    parser.add_argument('--params', help='comma-separated subset of the search space')
+    parser.add_argument('--reference', help='profile JSON to play against (default: hand-picked values)')
+    parser.add_argument('--out', default=PROFILE_FILE)
+    parser.add_argument('--cache', default=CACHE_FILE, help='finished-game cache (empty string disables)')
+    parser.add_argument('--resume', action='store_true', help='warm-start the search from --out')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='processes (default: all cores)')
+    parser.add_argument('--max-turns', type=int, default=100)
+    parser.add_argument('--config', help='game config JSON for the local engine')
+    parser.add_argument('--module', default='realpython_algo', help='module that defines AlgoStrategy')
+    parser.add_argument('--engine-cmd', help='external engine command, as for tournament.py')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('ALGO_LOG_LEVEL', 'off')
+    params = args.params.split(',') if args.params else list(SPACE)
+    unknown = [name for name in params if name not in SPACE]
+    if unknown:
+        parser.error(f'unknown parameters: {", ".join(unknown)} (choose from {", ".join(SPACE)})')
+
+    base = default_values(args.module)
+    reference, reference_name = to_profile(base), 'defaults'
+    if args.reference:
+        with open(args.reference) as f:
+            loaded = json.load(f)
+        reference = {'thresholds': loaded.get('thresholds', {}), 'modes': loaded.get('modes', {})}
+        reference_name = args.reference
+
+    mean = encode(base, params)
+    sigma = [args.sigma] * len(params)
+    first = 0
+    if args.resume and os.path.exists(args.out):
+        with open(args.out) as f:
+            previous = json.load(f).get('search', {})
+        mean = [previous.get('mean', {}).get(name, m) for name, m in zip(params, mean)]
+        sigma = [previous.get('sigma', {}).get(name, s) for name, s in zip(params, sigma)]
+        first = previous.get('generation', -1) + 1
+        print(f'resuming from generation {previous.get("generation", "?")} of {args.out}', file=sys.stderr)
+
+    config = None
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    starting_hp = float((config or {}).get('resources', {}).get('startingHP', 30.0))
+    engine = tournament.engine_options(args.engine_cmd, config, args.max_turns, args.module)
+    cache = GameCache(args.cache or None)
+    workers = args.workers or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    with tournament.make_pool(workers, engine) as pool:
+        evaluator = Evaluator(pool, cache, {'thresholdProfile': reference}, engine, args.games,
+                              args.seed, starting_hp)
+
+        def report(state):
+            write_profile(args.out, state, params, reference_name, evaluator.played)
+            elapsed = time.perf_counter() - started
+            print(f'gen {state["generation"]}: mean fitness {state["fitness"]:.3f} over {state["games"]} games, '
+                  f'best candidate {state["best"]["fitness"]:.3f}, {evaluator.played} games played '
+                  f'({len(cache.games)} cached) in {elapsed:.0f}s', file=sys.stderr)
+
+        state = search(evaluator, params, base, mean, sigma, args.generations, args.population,
+                       random.Random(args.seed + first), report, first)
+
+    if state:
+        print(json.dumps(to_profile(state['values']), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())